@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Expense
+from .models import Expense, Merchant, MerchantAlias
 
 
 @admin.register(Expense)
@@ -8,12 +8,13 @@ class ExpenseAdmin(admin.ModelAdmin):
     list_filter = ('category', 'payment_mode', 'date', 'created_at')
     search_fields = ('user__email', 'merchant', 'notes', 'sms_raw_text')
     readonly_fields = ('created_at', 'updated_at')
+    raw_id_fields = ('canonical_merchant',)
     date_hierarchy = 'date'
     ordering = ('-date',)
     
     fieldsets = (
         ('Basic Information', {
-            'fields': ('user', 'amount', 'merchant', 'category', 'payment_mode')
+            'fields': ('user', 'amount', 'merchant', 'canonical_merchant', 'category', 'payment_mode')
         }),
         ('Date & Time', {
             'fields': ('date',)
@@ -26,3 +27,17 @@ class ExpenseAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+
+class MerchantAliasInline(admin.TabularInline):
+    model = MerchantAlias
+    extra = 1
+
+
+@admin.register(Merchant)
+class MerchantAdmin(admin.ModelAdmin):
+    list_display = ('name', 'normalized_name', 'default_category', 'created_at')
+    list_filter = ('default_category',)
+    search_fields = ('name', 'normalized_name', 'aliases__alias')
+    readonly_fields = ('created_at', 'updated_at')
+    inlines = [MerchantAliasInline]
@@ -5,3 +5,13 @@ class ExpensesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'expenses'
     verbose_name = 'Expenses'
+    
+    def ready(self):
+        """Rebuild the merchant matcher whenever merchants or aliases change"""
+        from django.db.models.signals import post_save, post_delete
+        from .models import Merchant, MerchantAlias
+        from .merchants import invalidate_merchant_matcher
+        
+        for model in (Merchant, MerchantAlias):
+            post_save.connect(invalidate_merchant_matcher, sender=model)
+            post_delete.connect(invalidate_merchant_matcher, sender=model)
@@ -0,0 +1,158 @@
+"""
+Async variants of the summary endpoints for the ASGI deployment
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractMonth
+from django.http import HttpResponseNotAllowed
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+
+from expensesense_backend.db_router import areplica_reads_for
+from ml_model.async_views import json_response
+from users.authentication import aauthenticate
+from .models import Expense
+from .serializers import ExpenseSummaryResponseSerializer
+
+
+async def authenticate_or_401(request):
+    """
+    Returns:
+        tuple: (user, None) or (None, 401 response)
+    """
+    try:
+        user = await aauthenticate(request)
+    except AuthenticationFailed as e:
+        return None, json_response({'detail': e.detail}, status.HTTP_401_UNAUTHORIZED)
+    
+    if user is None:
+        return None, json_response(
+            {'detail': 'Authentication credentials were not provided.'},
+            status.HTTP_401_UNAUTHORIZED
+        )
+    
+    return user, None
+
+
+async def monthly_summary_async(request):
+    """
+    GET /expenses/async/summary/monthly/
+    
+    Same contract as GET /expenses/summary/monthly/
+    Query params: month (1-12), year (YYYY)
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    
+    user, error = await authenticate_or_401(request)
+    if error:
+        return error
+    
+    month = request.GET.get('month')
+    year = request.GET.get('year')
+    
+    now = timezone.now()
+    
+    if month and year:
+        try:
+            month = int(month)
+            year = int(year)
+        except ValueError:
+            return json_response(
+                {'error': 'Invalid month or year format'},
+                status.HTTP_400_BAD_REQUEST
+            )
+    else:
+        month = now.month
+        year = now.year
+    
+    expenses = Expense.objects.filter(user_id=user.id, date__year=year, date__month=month)
+    
+    with await areplica_reads_for(user.id):
+        totals = await expenses.aaggregate(total=Sum('amount'), count=Count('id'))
+        total_amount = totals['total'] or Decimal('0.00')
+        
+        category_summary = [
+            item async for item in expenses.values('category').annotate(
+                total=Sum('amount'),
+                count=Count('id')
+            ).order_by('-total')
+        ]
+    
+    # Calculate percentages
+    by_category = []
+    for item in category_summary:
+        percentage = (item['total'] / total_amount * 100) if total_amount > 0 else 0
+        by_category.append({
+            'category': item['category'],
+            'total': item['total'],
+            'count': item['count'],
+            'percentage': round(percentage, 2)
+        })
+    
+    response_data = {
+        'month': datetime(year, month, 1).strftime('%B'),
+        'year': year,
+        'total_amount': total_amount,
+        'total_expenses': totals['count'],
+        'by_category': by_category
+    }
+    
+    return json_response(ExpenseSummaryResponseSerializer(response_data).data)
+
+
+async def yearly_summary_async(request):
+    """
+    GET /expenses/async/summary/yearly/
+    
+    Same contract as GET /expenses/summary/yearly/, computed with one
+    grouped query instead of one pair of queries per month
+    Query params: year (YYYY)
+    """
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    
+    user, error = await authenticate_or_401(request)
+    if error:
+        return error
+    
+    year = request.GET.get('year')
+    
+    if year:
+        try:
+            year = int(year)
+        except ValueError:
+            return json_response({'error': 'Invalid year format'}, status.HTTP_400_BAD_REQUEST)
+    else:
+        year = timezone.now().year
+    
+    expenses = Expense.objects.filter(user_id=user.id, date__year=year)
+    
+    with await areplica_reads_for(user.id):
+        by_month = {
+            item['month']: item async for item in expenses.annotate(
+                month=ExtractMonth('date')
+            ).values('month').annotate(
+                total=Sum('amount'),
+                count=Count('id')
+            ).order_by()
+        }
+    
+    monthly_data = []
+    for month in range(1, 13):
+        item = by_month.get(month, {})
+        monthly_data.append({
+            'month': datetime(year, month, 1).strftime('%B'),
+            'total': item.get('total') or Decimal('0.00'),
+            'count': item.get('count', 0)
+        })
+    
+    return json_response({
+        'year': year,
+        'total_amount': sum((item['total'] for item in monthly_data), Decimal('0.00')),
+        'total_expenses': sum(item['count'] for item in monthly_data),
+        'monthly_breakdown': monthly_data
+    })
@@ -0,0 +1,143 @@
+"""
+Query parameter filters for expense list and summary endpoints
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .models import Expense
+
+
+def parse_list_param(params, name, choices):
+    """
+    Parse a comma separated multi-value param, e.g. category=food,bills
+    
+    Returns:
+        list or None: Validated values, None when the param is absent
+    """
+    raw = params.get(name)
+    if not raw:
+        return None
+    
+    values = [value.strip() for value in raw.split(',') if value.strip()]
+    valid = {code for code, _ in choices}
+    invalid = [value for value in values if value not in valid]
+    
+    if invalid:
+        raise ValidationError({name: f"Invalid value(s): {', '.join(invalid)}"})
+    
+    return values
+
+
+def parse_date_param(params, name, end_of_day=False):
+    """
+    Parse a YYYY-MM-DD or ISO 8601 datetime param into an aware datetime
+    
+    A bare date means the start of that day. With end_of_day set it means
+    the start of the next day, and is_exclusive is returned True so the
+    caller can filter with date__lt and cover the whole day.
+    
+    Returns:
+        tuple: (datetime or None, is_exclusive)
+    """
+    raw = params.get(name)
+    if not raw:
+        return None, False
+    
+    is_exclusive = False
+    
+    try:
+        # Dates first: parse_datetime also accepts a bare date, as midnight
+        day = parse_date(raw)
+        if day is not None:
+            if end_of_day:
+                day += timedelta(days=1)
+                is_exclusive = True
+            value = datetime.combine(day, time.min)
+        else:
+            value = parse_datetime(raw)
+            if value is None:
+                raise ValueError
+    except (ValueError, OverflowError):
+        # OverflowError: the day after 9999-12-31
+        raise ValidationError({name: 'Invalid date format, use YYYY-MM-DD or ISO 8601'})
+    
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    
+    return value, is_exclusive
+
+
+def parse_amount_param(params, name):
+    """Parse a decimal amount param"""
+    raw = params.get(name)
+    if not raw:
+        return None
+    
+    try:
+        value = Decimal(raw)
+    except InvalidOperation:
+        raise ValidationError({name: 'Invalid amount format'})
+    
+    if not value.is_finite():
+        raise ValidationError({name: 'Invalid amount format'})
+    
+    return value
+
+
+def filter_by_date_range(queryset, params):
+    """
+    Apply start_date/end_date params
+    
+    end_date is inclusive: a bare date covers that whole day.
+    """
+    start_date, _ = parse_date_param(params, 'start_date')
+    end_date, end_exclusive = parse_date_param(params, 'end_date', end_of_day=True)
+    
+    if start_date and end_date and start_date > end_date:
+        raise ValidationError({'end_date': 'end_date must not be before start_date'})
+    
+    if start_date:
+        queryset = queryset.filter(date__gte=start_date)
+    if end_date:
+        if end_exclusive:
+            queryset = queryset.filter(date__lt=end_date)
+        else:
+            queryset = queryset.filter(date__lte=end_date)
+    
+    return queryset
+
+
+def filter_expenses(queryset, params):
+    """
+    Apply all list filters from query params
+    
+    Query params:
+        start_date, end_date: YYYY-MM-DD or ISO 8601 datetime
+        category, payment_mode: single value or comma separated list
+        min_amount, max_amount: inclusive amount range
+    """
+    queryset = filter_by_date_range(queryset, params)
+    
+    # Equality/IN on the second column keeps these on the
+    # (user, category, date) and (user, payment_mode, date) indexes
+    categories = parse_list_param(params, 'category', Expense.CATEGORY_CHOICES)
+    if categories:
+        queryset = queryset.filter(category__in=categories)
+    
+    payment_modes = parse_list_param(params, 'payment_mode', Expense.PAYMENT_MODE_CHOICES)
+    if payment_modes:
+        queryset = queryset.filter(payment_mode__in=payment_modes)
+    
+    min_amount = parse_amount_param(params, 'min_amount')
+    max_amount = parse_amount_param(params, 'max_amount')
+    
+    if min_amount is not None:
+        queryset = queryset.filter(amount__gte=min_amount)
+    if max_amount is not None:
+        queryset = queryset.filter(amount__lte=max_amount)
+    
+    return queryset
@@ -0,0 +1,52 @@
+"""
+Resolve canonical merchants for existing expenses
+
+Usage:
+    python manage.py backfill_merchants [--batch-size 1000] [--all]
+"""
+from django.core.management.base import BaseCommand
+
+from expenses.merchants import get_merchant_matcher
+from expenses.models import Expense
+
+
+class Command(BaseCommand):
+    help = 'Link expenses to canonical merchants using the merchant alias table'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Re-resolve expenses that already have a canonical merchant'
+        )
+    
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        matcher = get_merchant_matcher()
+        
+        expenses = Expense.objects.only('id', 'merchant', 'sms_raw_text', 'canonical_merchant')
+        if not options['all']:
+            expenses = expenses.filter(canonical_merchant__isnull=True)
+        
+        batch = []
+        updated = 0
+        
+        for expense in expenses.order_by('id').iterator(chunk_size=batch_size):
+            merchant_id = matcher.match(expense.merchant) or matcher.match(expense.sms_raw_text or '')
+            if merchant_id is None or merchant_id == expense.canonical_merchant_id:
+                continue
+            
+            expense.canonical_merchant_id = merchant_id
+            batch.append(expense)
+            
+            if len(batch) >= batch_size:
+                Expense.objects.bulk_update(batch, ['canonical_merchant'])
+                updated += len(batch)
+                batch = []
+        
+        if batch:
+            Expense.objects.bulk_update(batch, ['canonical_merchant'])
+            updated += len(batch)
+        
+        self.stdout.write(self.style.SUCCESS(f'✓ Linked {updated} expenses to merchants'))
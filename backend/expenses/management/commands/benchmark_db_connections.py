@@ -0,0 +1,76 @@
+"""
+Measure the connection setup overhead removed by persistent connections
+
+Runs the same cheap query N times, first opening a new connection for
+each query (what CONN_MAX_AGE=0 does per request), then reusing one
+connection, and from several threads at once to mimic concurrent workers.
+
+Usage:
+    python manage.py benchmark_db_connections [--queries 200] [--threads 8]
+"""
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+def run_queries(count, reconnect):
+    """Run count SELECT 1 queries, returning per-query latencies in ms"""
+    latencies = []
+    
+    for _ in range(count):
+        if reconnect:
+            connection.close()
+        start = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        latencies.append((time.perf_counter() - start) * 1000)
+    
+    connection.close()
+    return latencies
+
+
+class Command(BaseCommand):
+    help = 'Compare per-query latency with and without connection reuse'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--threads', type=int, default=8)
+    
+    def report(self, label, latencies, elapsed):
+        latencies = sorted(latencies)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(
+            f"{label:<28} mean {statistics.mean(latencies):7.2f} ms  "
+            f"p50 {statistics.median(latencies):7.2f} ms  p99 {p99:7.2f} ms  "
+            f"{len(latencies) / elapsed:8.0f} q/s"
+        )
+        return statistics.mean(latencies)
+    
+    def handle(self, *args, **options):
+        queries = options['queries']
+        threads = options['threads']
+        
+        self.stdout.write(f"Database: {connection.vendor} ({connection.settings_dict['ENGINE']})\n")
+        
+        results = {}
+        for reconnect in (True, False):
+            label = 'new connection per query' if reconnect else 'persistent connection'
+            
+            start = time.perf_counter()
+            latencies = run_queries(queries, reconnect)
+            results[reconnect] = self.report(label, latencies, time.perf_counter() - start)
+            
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                batches = pool.map(run_queries, [queries // threads] * threads, [reconnect] * threads)
+                latencies = [latency for batch in batches for latency in batch]
+            self.report(f"  x{threads} threads", latencies, time.perf_counter() - start)
+        
+        overhead = results[True] - results[False]
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✓ Connection setup overhead removed per request: {overhead:.2f} ms"
+        ))
@@ -0,0 +1,65 @@
+"""
+Index plan review for the filtered expense list queries
+
+Prints the database EXPLAIN plan for each filter combination the list
+endpoint builds and fails if any of them falls back to a full table scan.
+
+Usage:
+    python manage.py explain_expense_queries [--user-id 1]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.http import QueryDict
+
+from expenses.filters import filter_expenses
+from expenses.models import Expense
+
+SCENARIOS = [
+    ('date range', 'start_date=2024-01-01&end_date=2024-03-31'),
+    ('single category', 'category=food'),
+    ('multi category + date range', 'category=food,bills&start_date=2024-01-01&end_date=2024-03-31'),
+    ('multi payment mode + date range', 'payment_mode=upi,card&start_date=2024-01-01'),
+    ('category + amount range', 'category=shopping&min_amount=100&max_amount=5000'),
+]
+
+
+def is_full_scan(plan):
+    """Detect a full table scan in a MySQL or SQLite EXPLAIN plan"""
+    if connection.vendor == 'mysql':
+        # Traditional format: the access type column reads ALL
+        return any(' ALL ' in f' {line} ' for line in plan.splitlines())
+    if connection.vendor == 'sqlite':
+        return any(
+            'SCAN' in line and 'expenses' in line and 'INDEX' not in line
+            for line in plan.splitlines()
+        )
+    return False
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the filtered expense list queries and flag full table scans'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--user-id', type=int, default=1)
+    
+    def handle(self, *args, **options):
+        full_scans = []
+        
+        for name, query in SCENARIOS:
+            queryset = filter_expenses(
+                Expense.objects.filter(user_id=options['user_id']),
+                QueryDict(query)
+            ).order_by('-date')
+            
+            plan = queryset.explain()
+            
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{name}: ?{query}'))
+            self.stdout.write(plan)
+            
+            if is_full_scan(plan):
+                full_scans.append(name)
+        
+        if full_scans:
+            raise CommandError(f"Full table scan in: {', '.join(full_scans)}")
+        
+        self.stdout.write(self.style.SUCCESS('\n✓ All filtered list queries use an index'))
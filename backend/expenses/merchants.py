@@ -0,0 +1,175 @@
+"""
+Merchant Normalization Module
+Resolves free-form merchant strings and SMS text to canonical merchants
+"""
+import re
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+# Global variable to store the built matcher
+_matcher = None
+_matcher_built_at = 0.0
+_matcher_lock = threading.Lock()
+
+
+def normalize_merchant_name(name):
+    """
+    Normalize a merchant string for matching
+    "SWIGGY", "Swiggy Ltd" and "swiggy*order" all start with "swiggy"
+    """
+    if not name:
+        return ""
+    
+    # Lowercase and turn separators like '*', '-', '.' into spaces
+    name = re.sub(r'[^a-z0-9]+', ' ', name.lower())
+    
+    return ' '.join(name.split())
+
+
+class MerchantMatcher:
+    """
+    Aho-Corasick automaton over normalized merchant aliases
+    Finds every alias occurring in a text in a single pass
+    """
+    
+    def __init__(self, aliases):
+        """
+        Args:
+            aliases (dict): normalized alias -> merchant id
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        
+        for alias, merchant_id in aliases.items():
+            if alias:
+                self._add(alias, merchant_id)
+        
+        self._build_failure_links()
+    
+    def __len__(self):
+        return len(self._goto)
+    
+    def _add(self, alias, merchant_id):
+        state = 0
+        for char in alias:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(alias), merchant_id))
+    
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] = (
+                    self._output[next_state] + self._output[self._fail[next_state]]
+                )
+    
+    def find_all(self, text):
+        """
+        Yield (start, end, merchant_id) for every alias in normalized text
+        Only matches aligned to word boundaries are reported
+        """
+        state = 0
+        for end, char in enumerate(text, start=1):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            
+            for length, merchant_id in self._output[state]:
+                start = end - length
+                if start > 0 and text[start - 1] != ' ':
+                    continue
+                if end < len(text) and text[end] != ' ':
+                    continue
+                yield start, end, merchant_id
+    
+    def match(self, text):
+        """
+        Return the merchant id of the longest alias in text, or None
+        Ties are broken by the earliest occurrence
+        """
+        text = normalize_merchant_name(text)
+        
+        best = None
+        for start, end, merchant_id in self.find_all(text):
+            if best is None or (end - start, -start) > (best[1] - best[0], -best[0]):
+                best = (start, end, merchant_id)
+        
+        return best[2] if best else None
+
+
+def build_merchant_matcher():
+    """Build a matcher from all merchants and aliases in the database"""
+    from .models import Merchant, MerchantAlias
+    
+    aliases = dict(Merchant.objects.values_list('normalized_name', 'id'))
+    for alias, merchant_id in MerchantAlias.objects.values_list('alias', 'merchant_id'):
+        aliases[normalize_merchant_name(alias)] = merchant_id
+    
+    return MerchantMatcher(aliases)
+
+
+def get_merchant_matcher():
+    """
+    Get the cached matcher (singleton pattern)
+    Rebuilt after MERCHANT_MATCHER_TTL seconds so other workers pick up edits
+    """
+    global _matcher, _matcher_built_at
+    
+    ttl = getattr(settings, 'MERCHANT_MATCHER_TTL', 300)
+    
+    if _matcher is not None and time.monotonic() - _matcher_built_at < ttl:
+        return _matcher
+    
+    with _matcher_lock:
+        if _matcher is None or time.monotonic() - _matcher_built_at >= ttl:
+            _matcher = build_merchant_matcher()
+            _matcher_built_at = time.monotonic()
+    
+    return _matcher
+
+
+def invalidate_merchant_matcher(**kwargs):
+    """Drop the cached matcher, used as a signal receiver on merchant edits"""
+    global _matcher
+    _matcher = None
+
+
+def resolve_merchant_id(*texts):
+    """
+    Resolve the first text that mentions a known merchant
+    
+    Args:
+        *texts: Candidate strings, e.g. the merchant field then the SMS body
+    
+    Returns:
+        int or None: Merchant id
+    """
+    matcher = get_merchant_matcher()
+    
+    for text in texts:
+        if text:
+            merchant_id = matcher.match(text)
+            if merchant_id is not None:
+                return merchant_id
+    
+    return None
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Merchant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('normalized_name', models.CharField(max_length=255, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Merchant',
+                'verbose_name_plural': 'Merchants',
+                'db_table': 'merchants',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MerchantAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=255, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Merchant Alias',
+                'verbose_name_plural': 'Merchant Aliases',
+                'db_table': 'merchant_aliases',
+                'ordering': ['alias'],
+            },
+        ),
+        migrations.AddField(
+            model_name='merchantalias',
+            name='merchant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='expenses.merchant'),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='canonical_merchant',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='expenses', to='expenses.merchant'),
+        ),
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['user', 'canonical_merchant'], name='expenses_user_id_cb44b5_idx'),
+        ),
+    ]
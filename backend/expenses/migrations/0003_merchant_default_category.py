@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0002_merchants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='merchant',
+            name='default_category',
+            field=models.CharField(blank=True, choices=[('food', 'Food & Dining'), ('transport', 'Transportation'), ('shopping', 'Shopping'), ('entertainment', 'Entertainment'), ('bills', 'Bills & Utilities'), ('healthcare', 'Healthcare'), ('education', 'Education'), ('groceries', 'Groceries'), ('travel', 'Travel'), ('other', 'Other')], help_text="Always classify this merchant's SMS into this category", max_length=50),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0004_composite_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='expense',
+            name='predicted_category',
+            field=models.CharField(blank=True, choices=[('food', 'Food & Dining'), ('transport', 'Transportation'), ('shopping', 'Shopping'), ('entertainment', 'Entertainment'), ('bills', 'Bills & Utilities'), ('healthcare', 'Healthcare'), ('education', 'Education'), ('groceries', 'Groceries'), ('travel', 'Travel'), ('other', 'Other')], max_length=50),
+        ),
+        migrations.AddField(
+            model_name='expense',
+            name='prediction_model_version',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
 from decimal import Decimal
+from .merchants import normalize_merchant_name
 
 User = get_user_model()
 
@@ -45,12 +46,23 @@ class Expense(models.Model):
         validators=[MinValueValidator(Decimal('0.01'))]
     )
     merchant = models.CharField(max_length=255, blank=True)
+    canonical_merchant = models.ForeignKey(
+        'Merchant',
+        on_delete=models.SET_NULL,
+        related_name='expenses',
+        blank=True,
+        null=True
+    )
     category = models.CharField(
         max_length=50, 
         choices=CATEGORY_CHOICES,
         default='other',
         db_index=True
     )
+    # Category suggested by the model when the expense was created, so a
+    # different saved category can be recorded as a correction
+    predicted_category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, blank=True)
+    prediction_model_version = models.CharField(max_length=64, blank=True)
     payment_mode = models.CharField(
         max_length=50,
         choices=PAYMENT_MODE_CHOICES,
@@ -70,8 +82,68 @@ class Expense(models.Model):
         ordering = ['-date']
         indexes = [
             models.Index(fields=['user', '-date']),
-            models.Index(fields=['user', 'category']),
+            models.Index(fields=['user', 'category', '-date']),
+            models.Index(fields=['user', 'payment_mode', '-date']),
+            models.Index(fields=['user', 'canonical_merchant']),
         ]
     
     def __str__(self):
         return f"{self.user.email} - {self.amount} - {self.category} - {self.date}"
+
+
+class Merchant(models.Model):
+    """
+    Canonical merchant that free-form merchant strings resolve to
+    """
+    
+    name = models.CharField(max_length=255)
+    normalized_name = models.CharField(max_length=255, unique=True)
+    default_category = models.CharField(
+        max_length=50,
+        choices=Expense.CATEGORY_CHOICES,
+        blank=True,
+        help_text='Always classify this merchant\'s SMS into this category'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'merchants'
+        verbose_name = 'Merchant'
+        verbose_name_plural = 'Merchants'
+        ordering = ['name']
+    
+    def __str__(self):
+        return self.name
+    
+    def save(self, *args, **kwargs):
+        if not self.normalized_name:
+            self.normalized_name = normalize_merchant_name(self.name)
+        super().save(*args, **kwargs)
+
+
+class MerchantAlias(models.Model):
+    """
+    Alternative spelling of a merchant as it appears in SMS and user input
+    """
+    
+    merchant = models.ForeignKey(
+        Merchant,
+        on_delete=models.CASCADE,
+        related_name='aliases'
+    )
+    alias = models.CharField(max_length=255, unique=True)
+    
+    class Meta:
+        db_table = 'merchant_aliases'
+        verbose_name = 'Merchant Alias'
+        verbose_name_plural = 'Merchant Aliases'
+        ordering = ['alias']
+    
+    def __str__(self):
+        return f"{self.alias} -> {self.merchant.name}"
+    
+    def save(self, *args, **kwargs):
+        self.alias = normalize_merchant_name(self.alias)
+        super().save(*args, **kwargs)
@@ -8,6 +8,11 @@ class ExpenseSerializer(serializers.ModelSerializer):
     Serializer for Expense model
     """
     user_email = serializers.EmailField(source='user.email', read_only=True)
+    canonical_merchant_name = serializers.CharField(
+        source='canonical_merchant.name',
+        read_only=True,
+        default=None
+    )
     
     class Meta:
         model = Expense
@@ -17,7 +22,11 @@ class ExpenseSerializer(serializers.ModelSerializer):
             'user_email',
             'amount', 
             'merchant', 
+            'canonical_merchant',
+            'canonical_merchant_name',
             'category',
+            'predicted_category',
+            'prediction_model_version',
             'payment_mode',
             'date', 
             'sms_raw_text',
@@ -25,7 +34,10 @@ class ExpenseSerializer(serializers.ModelSerializer):
             'created_at',
             'updated_at'
         ]
-        read_only_fields = ('id', 'user', 'created_at', 'updated_at')
+        read_only_fields = (
+            'id', 'user', 'canonical_merchant', 'predicted_category', 'prediction_model_version',
+            'created_at', 'updated_at'
+        )
     
     def validate_amount(self, value):
         """Validate amount is positive"""
@@ -43,6 +55,9 @@ class ExpenseSerializer(serializers.ModelSerializer):
 class ExpenseCreateSerializer(serializers.ModelSerializer):
     """
     Serializer for creating expenses (user is set automatically)
+    
+    predicted_category and prediction_model_version take the category and
+    model_version returned by POST /ml/classify/ for the SMS
     """
     
     class Meta:
@@ -51,6 +66,8 @@ class ExpenseCreateSerializer(serializers.ModelSerializer):
             'amount', 
             'merchant', 
             'category',
+            'predicted_category',
+            'prediction_model_version',
             'payment_mode',
             'date', 
             'sms_raw_text',
@@ -82,3 +99,22 @@ class ExpenseSummaryResponseSerializer(serializers.Serializer):
     total_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
     total_expenses = serializers.IntegerField()
     by_category = MonthlySummarySerializer(many=True)
+
+
+class MerchantSummarySerializer(serializers.Serializer):
+    """
+    Serializer for per-merchant spending aggregate
+    """
+    merchant_id = serializers.IntegerField(allow_null=True)
+    merchant = serializers.CharField(allow_null=True)
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    count = serializers.IntegerField()
+
+
+class TimeseriesBucketSerializer(serializers.Serializer):
+    """
+    Serializer for one bucket of the spending time series
+    """
+    period = serializers.DateField()
+    total = serializers.DecimalField(max_digits=12, decimal_places=2)
+    count = serializers.IntegerField()
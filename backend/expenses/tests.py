@@ -0,0 +1,167 @@
+from datetime import datetime, timezone as dt_timezone
+
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from .filters import filter_expenses, parse_date_param
+from .management.commands.explain_expense_queries import SCENARIOS, is_full_scan
+from .models import Expense
+
+
+class DateRangeFilterTests(TestCase):
+    """start_date/end_date filtering of GET /expenses/"""
+    
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='filters@example.com',
+            username='filters',
+            password='Passw0rd!x'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def create_expense(self, date):
+        return Expense.objects.create(
+            user=self.user,
+            amount=100,
+            category='food',
+            payment_mode='upi',
+            date=date
+        )
+    
+    def test_bare_end_date_covers_the_whole_day(self):
+        self.create_expense(datetime(2026, 10, 1, 10, 0, tzinfo=dt_timezone.utc))
+        self.create_expense(datetime(2026, 10, 1, 23, 59, tzinfo=dt_timezone.utc))
+        self.create_expense(datetime(2026, 10, 2, 0, 0, tzinfo=dt_timezone.utc))
+        
+        response = self.client.get('/expenses/', {'start_date': '2026-10-01', 'end_date': '2026-10-01'})
+        
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results'] if isinstance(response.data, dict) else response.data
+        self.assertEqual(len(results), 2)
+    
+    def test_parse_date_param(self):
+        end, exclusive = parse_date_param({'end_date': '2026-10-01'}, 'end_date', end_of_day=True)
+        self.assertEqual(end, datetime(2026, 10, 2, tzinfo=dt_timezone.utc))
+        self.assertTrue(exclusive)
+        
+        end, exclusive = parse_date_param({'end_date': '2026-10-01T10:30:00'}, 'end_date', end_of_day=True)
+        self.assertEqual(end, datetime(2026, 10, 1, 10, 30, tzinfo=dt_timezone.utc))
+        self.assertFalse(exclusive)
+    
+    def test_out_of_range_end_date_is_rejected(self):
+        for url in ('/expenses/', '/expenses/timeseries/', '/expenses/summary/merchants/'):
+            response = self.client.get(url, {'end_date': '9999-12-31'})
+            self.assertEqual(response.status_code, 400)
+
+
+class TimeseriesTests(TestCase):
+    """GET /expenses/timeseries/"""
+    
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='timeseries@example.com',
+            username='timeseries',
+            password='Passw0rd!x'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def test_last_day_bucket_and_decimal_totals(self):
+        Expense.objects.create(
+            user=self.user,
+            amount='250.50',
+            category='food',
+            payment_mode='upi',
+            date=datetime(2026, 10, 1, 10, 0, tzinfo=dt_timezone.utc)
+        )
+        
+        response = self.client.get('/expenses/timeseries/', {
+            'granularity': 'day',
+            'start_date': '2026-09-30',
+            'end_date': '2026-10-01'
+        })
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['buckets'], [
+            {'period': '2026-09-30', 'total': '0.00', 'count': 0},
+            {'period': '2026-10-01', 'total': '250.50', 'count': 1},
+        ])
+
+
+class CategoryTrendsTests(TestCase):
+    """GET /expenses/analytics/trends/"""
+    
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='trends@example.com',
+            username='trends',
+            password='Passw0rd!x'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def test_out_of_range_year_is_rejected(self):
+        for params in ({'month': 1, 'year': 1}, {'month': 12, 'year': 9999}):
+            response = self.client.get('/expenses/analytics/trends/', params)
+            self.assertEqual(response.status_code, 400)
+        
+        response = self.client.get('/expenses/analytics/trends/', {'month': 1, 'year': 1900, 'months': 24})
+        self.assertEqual(response.status_code, 200)
+
+
+class MerchantSummaryTests(TestCase):
+    """GET /expenses/summary/merchants/"""
+    
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='merchants@example.com',
+            username='merchants',
+            password='Passw0rd!x'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+    
+    def test_limit_bounds(self):
+        for limit in (-1, 0, 101, 'x'):
+            response = self.client.get('/expenses/summary/merchants/', {'limit': limit})
+            self.assertEqual(response.status_code, 400)
+        
+        response = self.client.get('/expenses/summary/merchants/', {'limit': 100})
+        self.assertEqual(response.status_code, 200)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN output is SQLite specific')
+class ExpenseQueryPlanTests(TestCase):
+    """Filtered list queries stay on the composite (user, ...) indexes"""
+    
+    # Scenarios whose plan must name a specific index
+    EXPECTED_INDEXES = {
+        'date range': 'expenses_user_id_d1baf3_idx',
+        'single category': 'expenses_user_id_7e1cdd_idx',
+        'category + amount range': 'expenses_user_id_7e1cdd_idx',
+    }
+    
+    def explain(self, query):
+        return filter_expenses(
+            Expense.objects.filter(user_id=1),
+            QueryDict(query)
+        ).order_by('-date').explain()
+    
+    def test_no_full_table_scans(self):
+        for name, query in SCENARIOS:
+            with self.subTest(name):
+                plan = self.explain(query)
+                self.assertFalse(is_full_scan(plan), plan)
+                self.assertIn('USING INDEX expenses_user_id_', plan)
+    
+    def test_expected_indexes(self):
+        scenarios = dict(SCENARIOS)
+        for name, index in self.EXPECTED_INDEXES.items():
+            with self.subTest(name):
+                self.assertIn(f'USING INDEX {index}', self.explain(scenarios[name]))
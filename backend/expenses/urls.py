@@ -1,10 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .async_views import monthly_summary_async, yearly_summary_async
 from .views import ExpenseViewSet
 
 router = DefaultRouter()
 router.register(r'', ExpenseViewSet, basename='expense')
 
 urlpatterns = [
+    path('async/summary/monthly/', monthly_summary_async, name='expense-monthly-summary-async'),
+    path('async/summary/yearly/', yearly_summary_async, name='expense-yearly-summary-async'),
     path('', include(router.urls)),
 ]
@@ -2,18 +2,27 @@ from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.db.models import Sum, Count, Q
+from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
 from django.utils import timezone
 from datetime import datetime, timedelta
 from decimal import Decimal
-from .models import Expense
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import numpy as np
+from expensesense_backend.db_router import ReplicaReadMixin
+from ml_model.feedback import record_category_feedback
+from .models import Expense, Merchant
+from .filters import filter_expenses, filter_by_date_range, parse_date_param
+from .merchants import resolve_merchant_id
 from .serializers import (
     ExpenseSerializer, 
     ExpenseCreateSerializer,
-    ExpenseSummaryResponseSerializer
+    ExpenseSummaryResponseSerializer,
+    MerchantSummarySerializer,
+    TimeseriesBucketSerializer
 )
 
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class ExpenseViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """
     ViewSet for Expense CRUD operations
     
@@ -26,6 +35,12 @@ class ExpenseViewSet(viewsets.ModelViewSet):
     """
     permission_classes = [permissions.IsAuthenticated]
     
+    # Read-only actions served from the read replica when one is configured
+    replica_actions = (
+        'list', 'retrieve', 'monthly_summary', 'yearly_summary',
+        'merchant_summary', 'category_trends', 'timeseries'
+    )
+    
     def get_serializer_class(self):
         if self.action == 'create':
             return ExpenseCreateSerializer
@@ -33,33 +48,41 @@ class ExpenseViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Return expenses for the authenticated user only"""
-        user = self.request.user
-        queryset = Expense.objects.filter(user=user)
-        
-        # Filter by date range
-        start_date = self.request.query_params.get('start_date', None)
-        end_date = self.request.query_params.get('end_date', None)
-        
-        if start_date:
-            queryset = queryset.filter(date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(date__lte=end_date)
+        queryset = Expense.objects.filter(user_id=self.request.user.id).select_related('canonical_merchant')
         
-        # Filter by category
-        category = self.request.query_params.get('category', None)
-        if category:
-            queryset = queryset.filter(category=category)
-        
-        # Filter by payment mode
-        payment_mode = self.request.query_params.get('payment_mode', None)
-        if payment_mode:
-            queryset = queryset.filter(payment_mode=payment_mode)
+        # Date range, multi-value category/payment_mode and amount range
+        queryset = filter_expenses(queryset, self.request.query_params)
         
         return queryset.order_by('-date')
     
     def perform_create(self, serializer):
-        """Set the user when creating an expense"""
-        serializer.save(user=self.request.user)
+        """Set the user and canonical merchant when creating an expense"""
+        canonical_merchant_id = resolve_merchant_id(
+            serializer.validated_data.get('merchant'),
+            serializer.validated_data.get('sms_raw_text')
+        )
+        expense = serializer.save(user_id=self.request.user.id, canonical_merchant_id=canonical_merchant_id)
+        
+        # The user may have picked another category than the model suggested
+        record_category_feedback(expense, created=True)
+    
+    def perform_update(self, serializer):
+        """
+        Re-resolve the canonical merchant when the merchant text changes, and
+        record category changes against the model's suggestion
+        """
+        if 'merchant' in serializer.validated_data or 'sms_raw_text' in serializer.validated_data:
+            instance = serializer.instance
+            canonical_merchant_id = resolve_merchant_id(
+                serializer.validated_data.get('merchant', instance.merchant),
+                serializer.validated_data.get('sms_raw_text', instance.sms_raw_text)
+            )
+            expense = serializer.save(canonical_merchant_id=canonical_merchant_id)
+        else:
+            expense = serializer.save()
+        
+        if 'category' in serializer.validated_data or 'sms_raw_text' in serializer.validated_data:
+            record_category_feedback(expense)
     
     @action(detail=False, methods=['get'], url_path='summary/monthly')
     def monthly_summary(self, request):
@@ -91,7 +114,7 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         
         # Get expenses for the specified month/year
         expenses = Expense.objects.filter(
-            user=request.user,
+            user_id=request.user.id,
             date__year=year,
             date__month=month
         )
@@ -151,7 +174,7 @@ class ExpenseViewSet(viewsets.ModelViewSet):
             year = timezone.now().year
         
         expenses = Expense.objects.filter(
-            user=request.user,
+            user_id=request.user.id,
             date__year=year
         )
         
@@ -175,3 +198,315 @@ class ExpenseViewSet(viewsets.ModelViewSet):
             'total_expenses': total_count,
             'monthly_breakdown': monthly_data
         }, status=status.HTTP_200_OK)
+    
+    MERCHANT_SUMMARY_MAX_LIMIT = 100
+    
+    @action(detail=False, methods=['get'], url_path='summary/merchants')
+    def merchant_summary(self, request):
+        """
+        GET /expenses/summary/merchants/
+        
+        Get spending grouped by canonical merchant
+        Query params: start_date, end_date (optional), limit (1-100, default 20)
+        Expenses without a resolved merchant are reported under merchant null
+        """
+        limit = request.query_params.get('limit', 20)
+        
+        try:
+            limit = int(limit)
+        except ValueError:
+            return Response(
+                {'error': 'Invalid limit format'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not 1 <= limit <= self.MERCHANT_SUMMARY_MAX_LIMIT:
+            return Response(
+                {'error': f'limit must be between 1 and {self.MERCHANT_SUMMARY_MAX_LIMIT}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        expenses = filter_by_date_range(
+            Expense.objects.filter(user_id=request.user.id),
+            request.query_params
+        )
+        
+        # Group on the (user, canonical_merchant) index instead of the merchant string
+        merchant_totals = list(
+            expenses.order_by()
+            .values('canonical_merchant')
+            .annotate(total=Sum('amount'), count=Count('id'))
+            .order_by('-total')[:limit]
+        )
+        
+        # Resolve names for the page of merchants in a single lookup
+        merchant_ids = [item['canonical_merchant'] for item in merchant_totals if item['canonical_merchant']]
+        names = dict(Merchant.objects.filter(id__in=merchant_ids).values_list('id', 'name'))
+        
+        by_merchant = [
+            {
+                'merchant_id': item['canonical_merchant'],
+                'merchant': names.get(item['canonical_merchant']),
+                'total': item['total'],
+                'count': item['count']
+            }
+            for item in merchant_totals
+        ]
+        
+        serializer = MerchantSummarySerializer(by_merchant, many=True)
+        return Response({'by_merchant': serializer.data}, status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['get'], url_path='analytics/trends')
+    def category_trends(self, request):
+        """
+        GET /expenses/analytics/trends/
+        
+        Per-category monthly totals, this month vs last month, and trailing
+        3/6/12-month averages, computed from a single grouped query
+        Query params: month (1-12), year (YYYY), months (window length, 1-24, default 12)
+        If month/year are not provided, uses current month/year
+        """
+        month = request.query_params.get('month')
+        year = request.query_params.get('year')
+        window = request.query_params.get('months', 12)
+        
+        now = timezone.now()
+        
+        try:
+            window = int(window)
+            if month and year:
+                month = int(month)
+                year = int(year)
+            else:
+                month = now.month
+                year = now.year
+            datetime(year, month, 1)
+        except ValueError:
+            return Response(
+                {'error': 'Invalid month, year or months format'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not 1 <= window <= 24:
+            return Response(
+                {'error': 'months must be between 1 and 24'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # The history window reaches 35 months back and one month forward
+        if not 1900 <= year <= 9998:
+            return Response(
+                {'error': 'year must be between 1900 and 9998'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Fetch 11 extra months so the 12-month average is defined for every month shown
+        rolling_windows = (3, 6, 12)
+        history = window + max(rolling_windows) - 1
+        
+        # Month indexes counted from year 0 make month arithmetic trivial
+        end_index = year * 12 + (month - 1)
+        start_index = end_index - history + 1
+        
+        def month_start(index):
+            return timezone.make_aware(datetime(index // 12, index % 12 + 1, 1))
+        
+        monthly_totals = (
+            Expense.objects.filter(
+                user_id=request.user.id,
+                date__gte=month_start(start_index),
+                date__lt=month_start(end_index + 1)
+            )
+            .annotate(month=TruncMonth('date'))
+            .values('month', 'category')
+            .annotate(total=Sum('amount'))
+            .order_by()
+        )
+        
+        categories = [code for code, _ in Expense.CATEGORY_CHOICES]
+        category_index = {code: idx for idx, code in enumerate(categories)}
+        
+        # (month, category) matrix of totals, zero where nothing was spent
+        totals = np.zeros((history, len(categories)))
+        for item in monthly_totals:
+            row = item['month'].year * 12 + item['month'].month - 1 - start_index
+            totals[row, category_index[item['category']]] = float(item['total'])
+        
+        # Trailing means via cumulative sums over the month axis
+        cumulative = np.vstack([np.zeros((1, len(categories))), np.cumsum(totals, axis=0)])
+        rows = np.arange(history - window, history)
+        rolling = {
+            size: (cumulative[rows + 1] - cumulative[rows + 1 - size]) / size
+            for size in rolling_windows
+        }
+        
+        current = totals[-1]
+        previous = totals[-2]
+        change = current - previous
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change_pct = np.where(previous > 0, change / previous * 100, np.nan)
+        
+        def round_list(values):
+            return [round(float(value), 2) for value in values]
+        
+        def describe(series, rolling_series, cur, prev, delta, delta_pct):
+            return {
+                'totals': round_list(series),
+                'current': round(float(cur), 2),
+                'previous': round(float(prev), 2),
+                'change': round(float(delta), 2),
+                'change_percentage': None if np.isnan(delta_pct) else round(float(delta_pct), 2),
+                'rolling_average': {
+                    str(size): round_list(values) for size, values in rolling_series.items()
+                }
+            }
+        
+        window_totals = totals[-window:]
+        
+        by_category = []
+        for idx in np.argsort(-current, kind='stable'):
+            if not totals[:, idx].any():
+                continue
+            by_category.append({
+                'category': categories[idx],
+                **describe(
+                    window_totals[:, idx],
+                    {size: values[:, idx] for size, values in rolling.items()},
+                    current[idx], previous[idx], change[idx], change_pct[idx]
+                )
+            })
+        
+        overall_totals = totals.sum(axis=1)
+        overall_previous = overall_totals[-2]
+        overall_change = overall_totals[-1] - overall_previous
+        
+        return Response({
+            'month': datetime(year, month, 1).strftime('%B'),
+            'year': year,
+            'months': [
+                month_start(index).strftime('%Y-%m')
+                for index in range(end_index - window + 1, end_index + 1)
+            ],
+            'overall': describe(
+                overall_totals[-window:],
+                {size: values.sum(axis=1) for size, values in rolling.items()},
+                overall_totals[-1], overall_previous, overall_change,
+                overall_change / overall_previous * 100 if overall_previous > 0 else np.nan
+            ),
+            'by_category': by_category
+        }, status=status.HTTP_200_OK)
+    
+    # granularity -> (trunc function, default number of buckets)
+    TIMESERIES_GRANULARITIES = {
+        'day': (TruncDay, 30),
+        'week': (TruncWeek, 12),
+        'month': (TruncMonth, 12),
+    }
+    TIMESERIES_MAX_BUCKETS = 1000
+    
+    @action(detail=False, methods=['get'], url_path='timeseries')
+    def timeseries(self, request):
+        """
+        GET /expenses/timeseries/
+        
+        Spending totals bucketed by day, week (Monday start) or month in the
+        user's time zone, with empty buckets zero-filled
+        Query params: granularity (day|week|month, default day),
+        start_date, end_date (YYYY-MM-DD in the user's time zone),
+        plus the category/payment_mode/amount filters of the list endpoint
+        """
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in self.TIMESERIES_GRANULARITIES:
+            return Response(
+                {'error': 'granularity must be one of day, week, month'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        trunc, default_buckets = self.TIMESERIES_GRANULARITIES[granularity]
+        
+        try:
+            user_tz = ZoneInfo(request.user.time_zone or 'UTC')
+        except (ZoneInfoNotFoundError, ValueError):
+            user_tz = ZoneInfo('UTC')
+        
+        def bucket_start(day):
+            if granularity == 'week':
+                return day - timedelta(days=day.weekday())
+            if granularity == 'month':
+                return day.replace(day=1)
+            return day
+        
+        def next_bucket(day):
+            if granularity == 'week':
+                return day + timedelta(days=7)
+            if granularity == 'month':
+                return (day + timedelta(days=32)).replace(day=1)
+            return day + timedelta(days=1)
+        
+        # Bare dates in the filters are read in the user's time zone
+        with timezone.override(user_tz):
+            expenses = filter_expenses(
+                Expense.objects.filter(user_id=request.user.id),
+                request.query_params
+            )
+            start_date, _ = parse_date_param(request.query_params, 'start_date')
+            end_date, end_exclusive = parse_date_param(
+                request.query_params, 'end_date', end_of_day=True
+            )
+        
+        if end_date is None:
+            last_bucket = bucket_start(timezone.localtime(timezone.now(), user_tz).date())
+        else:
+            end_local = timezone.localtime(end_date, user_tz)
+            if end_exclusive:
+                end_local -= timedelta(microseconds=1)
+            last_bucket = bucket_start(end_local.date())
+        
+        if start_date is None:
+            first_bucket = last_bucket
+            for _ in range(default_buckets - 1):
+                first_bucket = bucket_start(first_bucket - timedelta(days=1))
+            expenses = expenses.filter(
+                date__gte=datetime.combine(first_bucket, datetime.min.time(), tzinfo=user_tz)
+            )
+        else:
+            first_bucket = bucket_start(timezone.localtime(start_date, user_tz).date())
+        
+        # Enumerate every bucket up front so gaps can be zero-filled
+        periods = []
+        period = first_bucket
+        while period <= last_bucket:
+            periods.append(period)
+            if len(periods) > self.TIMESERIES_MAX_BUCKETS:
+                return Response(
+                    {'error': f'Range exceeds {self.TIMESERIES_MAX_BUCKETS} buckets, use a coarser granularity'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            period = next_bucket(period)
+        
+        bucket_totals = (
+            expenses.annotate(period=trunc('date', tzinfo=user_tz))
+            .values('period')
+            .annotate(total=Sum('amount'), count=Count('id'))
+            .order_by()
+        )
+        by_period = {
+            timezone.localtime(item['period'], user_tz).date(): item
+            for item in bucket_totals
+        }
+        
+        empty = {'total': Decimal('0.00'), 'count': 0}
+        buckets = [
+            {
+                'period': period,
+                'total': by_period.get(period, empty)['total'],
+                'count': by_period.get(period, empty)['count']
+            }
+            for period in periods
+        ]
+        
+        serializer = TimeseriesBucketSerializer(buckets, many=True)
+        return Response({
+            'granularity': granularity,
+            'timezone': str(user_tz),
+            'buckets': serializer.data
+        }, status=status.HTTP_200_OK)
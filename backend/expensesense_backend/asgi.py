@@ -9,3 +9,12 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'expensesense_backend.settings')
 
 application = get_asgi_application()
+
+# Checkpoint hot reload (SIGHUP, file watcher) only in serving processes,
+# not in migrate, shell, tests or backfill workers. With an inference
+# server the server reloads instead
+from django.conf import settings
+from ml_model.load_model import start_model_reloader
+
+if not settings.ML_INFERENCE_SOCKET:
+    start_model_reloader()
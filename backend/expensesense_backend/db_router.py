@@ -0,0 +1,119 @@
+"""
+Database router sending read-only API actions to a replica
+
+Reads go to the 'replica' alias only while a view has declared read intent
+(see ReplicaReadMixin). Writes, transactions and reads made shortly after a
+user's own write stay on the primary so users always see their changes.
+"""
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+REPLICA_DB_ALIAS = 'replica'
+
+PIN_CACHE_KEY = 'db_router:pinned:{user_id}'
+
+_read_intent = ContextVar('db_read_intent', default=False)
+
+
+def replica_configured():
+    """Whether a replica alias exists in settings.DATABASES"""
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+@contextmanager
+def read_from_replica():
+    """Route reads inside the block to the replica"""
+    token = _read_intent.set(True)
+    try:
+        yield
+    finally:
+        _read_intent.reset(token)
+
+
+def pin_to_primary(user_id):
+    """
+    Keep a user's reads on the primary for REPLICA_PIN_SECONDS
+    Covers replication lag after the user writes
+    """
+    if user_id is not None and replica_configured():
+        cache.set(PIN_CACHE_KEY.format(user_id=user_id), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned_to_primary(user_id):
+    """Whether the user wrote recently enough that the replica may be stale"""
+    if user_id is None or not replica_configured():
+        return False
+    return bool(cache.get(PIN_CACHE_KEY.format(user_id=user_id)))
+
+
+async def areplica_reads_for(user_id):
+    """
+    Async helper returning the context manager to wrap a user's read queries in
+    The replica unless the user is pinned to the primary, else a no-op
+    """
+    if not replica_configured():
+        return nullcontext()
+    if user_id is not None and await cache.aget(PIN_CACHE_KEY.format(user_id=user_id)):
+        return nullcontext()
+    return read_from_replica()
+
+
+class ReplicaRouter:
+    """Route reads to the replica when read intent is set, everything else to default"""
+    
+    def db_for_read(self, model, **hints):
+        if not _read_intent.get() or not replica_configured():
+            return 'default'
+        
+        # Reads inside a transaction must see its uncommitted writes
+        if connections['default'].in_atomic_block:
+            return 'default'
+        
+        return REPLICA_DB_ALIAS
+    
+    def db_for_write(self, model, **hints):
+        return 'default'
+    
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+    
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives schema changes through replication
+        return db == 'default'
+
+
+class ReplicaReadMixin:
+    """
+    ViewSet mixin serving replica_actions from the replica
+    
+    Successful unsafe requests pin the user to the primary for a short
+    window, so a list right after a create still shows the new expense.
+    """
+    replica_actions = ('list', 'retrieve')
+    
+    def initial(self, request, *args, **kwargs):
+        # Authentication runs here, so the user is known afterwards
+        super().initial(request, *args, **kwargs)
+        
+        self._read_intent_token = None
+        if self.action in self.replica_actions and not is_pinned_to_primary(request.user.id):
+            self._read_intent_token = _read_intent.set(True)
+    
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        
+        token = getattr(self, '_read_intent_token', None)
+        if token is not None:
+            _read_intent.reset(token)
+            self._read_intent_token = None
+        
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(getattr(request.user, 'id', None))
+        
+        return response
@@ -0,0 +1,70 @@
+"""
+Health check endpoints for the orchestrator
+"""
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+
+
+def check_database():
+    """Run a trivial query on the default database"""
+    with connections['default'].cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+def check_model():
+    """
+    Returns:
+        str: Version of the warmed model serving this worker
+    
+    Raises:
+        Exception: If no warmed model is available, or only the untrained
+            fallback loaded because the checkpoint is missing or unreadable
+    """
+    from ml_model.load_model import DUMMY_MODEL_VERSION
+    
+    if settings.ML_INFERENCE_SOCKET:
+        from ml_model.inference_server import get_inference_client
+        version = get_inference_client().ping()
+    else:
+        from ml_model.load_model import get_model_info, is_model_ready
+        
+        if not is_model_ready():
+            raise RuntimeError('Model not loaded and warmed yet')
+        version = get_model_info()['model_version']
+    
+    if version == DUMMY_MODEL_VERSION:
+        raise RuntimeError('Serving the untrained fallback model, no usable checkpoint')
+    return version
+
+
+def readiness(request):
+    """
+    GET /healthz/ready
+    
+    200 once the database answers and the trained model is loaded and
+    warmed, 503 otherwise, so traffic is never routed to a cold worker or
+    one serving the untrained fallback
+    """
+    checks = {}
+    model_version = None
+    
+    try:
+        check_database()
+        checks['database'] = 'ok'
+    except Exception as e:
+        checks['database'] = str(e)
+    
+    try:
+        model_version = check_model()
+        checks['model'] = 'ok'
+    except Exception as e:
+        checks['model'] = str(e)
+    
+    ready = all(result == 'ok' for result in checks.values())
+    
+    return JsonResponse(
+        {'ready': ready, 'checks': checks, 'model_version': model_version},
+        status=200 if ready else 503
+    )
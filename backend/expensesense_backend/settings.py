@@ -4,8 +4,10 @@ Django settings for expensesense_backend project.
 
 from pathlib import Path
 from datetime import timedelta
+from importlib.util import find_spec
 import environ
 import os
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -91,9 +93,74 @@ DATABASES = {
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
             'charset': 'utf8mb4',
         },
+        # Keep connections open across requests instead of reconnecting each time;
+        # health checks replace connections the server dropped while idle
+        'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=60),
+        'CONN_HEALTH_CHECKS': env.bool('DB_CONN_HEALTH_CHECKS', default=True),
     }
 }
 
+# Optional real connection pool (django-db-connection-pool), mainly for the
+# ASGI path where requests hop between threads and can't reuse persistent
+# per-thread connections. The pool owns reuse, so CONN_MAX_AGE is disabled.
+if env.bool('DB_POOL_ENABLED', default=False):
+    if not (find_spec('dj_db_conn_pool') and find_spec('sqlalchemy')):
+        raise ImproperlyConfigured('DB_POOL_ENABLED needs django-db-connection-pool[mysql] installed')
+    DATABASES['default'].update({
+        'ENGINE': 'dj_db_conn_pool.backends.mysql',
+        'CONN_MAX_AGE': 0,
+        'POOL_OPTIONS': {
+            'POOL_SIZE': env.int('DB_POOL_SIZE', default=10),
+            'MAX_OVERFLOW': env.int('DB_POOL_MAX_OVERFLOW', default=10),
+            'RECYCLE': env.int('DB_POOL_RECYCLE', default=3600),
+            'PRE_PING': True,
+        },
+    })
+
+# Read replica - read-only API actions are routed here when DB_REPLICA_HOST is set
+if env('DB_REPLICA_HOST', default=''):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': env('DB_REPLICA_HOST'),
+        'PORT': env('DB_REPLICA_PORT', default=DATABASES['default']['PORT']),
+        'USER': env('DB_REPLICA_USER', default=DATABASES['default']['USER']),
+        'PASSWORD': env('DB_REPLICA_PASSWORD', default=DATABASES['default']['PASSWORD']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['expensesense_backend.db_router.ReplicaRouter']
+
+# Seconds a user's reads stay on the primary after they write,
+# should exceed the usual replication lag. Needs a shared CACHE_URL
+REPLICA_PIN_SECONDS = env.int('REPLICA_PIN_SECONDS', default=5)
+
+# Cache - use a shared backend (e.g. redis://) so workers share cached data
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# The replica read-your-writes pin lives in this cache; a per-process cache
+# would let a user's next read land on another worker and a lagging replica
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+if 'replica' in DATABASES and CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHES:
+    raise ImproperlyConfigured('DB_REPLICA_HOST needs a shared CACHE_URL (e.g. redis://) for REPLICA_PIN_SECONDS')
+
+# Refresh token blacklist: 'cache' (shared cache, entries expire with the
+# token), 'db' (simplejwt token_blacklist tables) or 'none'. A per-process
+# cache would let a rotated token be replayed on another worker, so the
+# default is 'cache' only when CACHE_URL is shared
+JWT_BLACKLIST_BACKEND = env(
+    'JWT_BLACKLIST_BACKEND',
+    default='db' if CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHES else 'cache'
+)
+if JWT_BLACKLIST_BACKEND == 'cache' and CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHES:
+    raise ImproperlyConfigured('JWT_BLACKLIST_BACKEND=cache needs a shared CACHE_URL (e.g. redis://)')
+if JWT_BLACKLIST_BACKEND == 'db':
+    INSTALLED_APPS.append('rest_framework_simplejwt.token_blacklist')
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -113,6 +180,27 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing policy: 'pbkdf2', 'scrypt' or 'argon2' (needs argon2-cffi).
+# Hashes made under another policy are upgraded on the user's next login.
+# Size login capacity with: python manage.py benchmark_password_hashers
+PASSWORD_HASH_POLICY = env('PASSWORD_HASH_POLICY', default='pbkdf2')
+PASSWORD_PBKDF2_ITERATIONS = env.int('PASSWORD_PBKDF2_ITERATIONS', default=600000)
+PASSWORD_SCRYPT_WORK_FACTOR = env.int('PASSWORD_SCRYPT_WORK_FACTOR', default=2 ** 14)
+PASSWORD_SCRYPT_BLOCK_SIZE = env.int('PASSWORD_SCRYPT_BLOCK_SIZE', default=8)
+PASSWORD_SCRYPT_PARALLELISM = env.int('PASSWORD_SCRYPT_PARALLELISM', default=1)
+PASSWORD_ARGON2_TIME_COST = env.int('PASSWORD_ARGON2_TIME_COST', default=2)
+PASSWORD_ARGON2_MEMORY_COST = env.int('PASSWORD_ARGON2_MEMORY_COST', default=65536)
+PASSWORD_ARGON2_PARALLELISM = env.int('PASSWORD_ARGON2_PARALLELISM', default=1)
+
+PASSWORD_POLICY_HASHERS = {
+    'pbkdf2': 'users.hashers.TunedPBKDF2PasswordHasher',
+    'scrypt': 'users.hashers.TunedScryptPasswordHasher',
+    'argon2': 'users.hashers.TunedArgon2PasswordHasher',
+}
+PASSWORD_HASHERS = [PASSWORD_POLICY_HASHERS[PASSWORD_HASH_POLICY]] + [
+    hasher for policy, hasher in PASSWORD_POLICY_HASHERS.items() if policy != PASSWORD_HASH_POLICY
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -131,9 +219,18 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Stateless JWT auth builds request.user from token claims instead of
+# loading the users row on every request
+JWT_STATELESS_AUTH = env.bool('JWT_STATELESS_AUTH', default=False)
+
+# Seconds a full user row stays cached when stateless auth needs one
+AUTH_USER_CACHE_TTL = env.int('AUTH_USER_CACHE_TTL', default=30)
+
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
+        'users.authentication.ClaimsJWTAuthentication'
+        if JWT_STATELESS_AUTH else
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
@@ -144,13 +241,19 @@ REST_FRAMEWORK = {
     'DATETIME_FORMAT': '%Y-%m-%d %H:%M:%S',
 }
 
+# last_login tracking: only record a login when the stored value is older
+# than GRANULARITY seconds, and write pending logins every FLUSH_INTERVAL
+LAST_LOGIN_GRANULARITY = env.int('LAST_LOGIN_GRANULARITY', default=3600)
+LAST_LOGIN_FLUSH_INTERVAL = env.int('LAST_LOGIN_FLUSH_INTERVAL', default=60)
+
 # Simple JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
-    'UPDATE_LAST_LOGIN': True,
+    # last_login is written by users.last_login in coalesced batches instead
+    'UPDATE_LAST_LOGIN': False,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': env('JWT_SECRET', default=SECRET_KEY),
     'AUTH_HEADER_TYPES': ('Bearer',),
@@ -158,6 +261,7 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    'TOKEN_USER_CLASS': 'users.authentication.ClaimsUser',
 }
 
 # CORS settings
@@ -170,5 +274,71 @@ CORS_ALLOW_CREDENTIALS = True
 # Google OAuth settings
 GOOGLE_CLIENT_ID = env('GOOGLE_CLIENT_ID', default='')
 
+# Where Google ID token signing certificates come from. The cert set is
+# cached in CACHES['default'] for the max-age Google advertises
+GOOGLE_CERT_SOURCE = env('GOOGLE_CERT_SOURCE', default='users.google_auth.HttpCertSource')
+# JSON {key id: PEM} read by users.google_auth.FileCertSource
+GOOGLE_CERTS_FILE = env('GOOGLE_CERTS_FILE', default='')
+
+# Merchant normalization settings
+# Seconds before a worker rebuilds its in-memory merchant alias matcher
+MERCHANT_MATCHER_TTL = env.int('MERCHANT_MATCHER_TTL', default=300)
+
 # ML Model settings
-ML_MODEL_PATH = os.path.join(BASE_DIR, 'ml_model', 'expense_cnn_model.pt')
+ML_MODEL_PATH = env('ML_MODEL_PATH', default=os.path.join(BASE_DIR, 'ml_model', 'expense_cnn_model.pt'))
+
+# Hot reload: workers swap in a replaced checkpoint on this signal, when the
+# file watcher (polling every WATCH_INTERVAL seconds, 0 = off) sees a change,
+# or through POST /ml/model/reload/
+ML_MODEL_RELOAD_SIGNAL = env('ML_MODEL_RELOAD_SIGNAL', default='SIGHUP')
+ML_MODEL_WATCH_INTERVAL = env.int('ML_MODEL_WATCH_INTERVAL', default=30)
+
+# Sequence lengths and batch sizes run through a model before it serves,
+# /healthz/ready only reports ready once this warmup has finished
+ML_WARMUP_LENGTHS = env.list('ML_WARMUP_LENGTHS', cast=int, default=[16, 32, 64, 100])
+ML_WARMUP_BATCH_SIZES = env.list('ML_WARMUP_BATCH_SIZES', cast=int, default=[1, 8])
+
+# Merchant -> category rules consulted before the CNN
+# A merchant is learned once MIN_COUNT expenses agree on a category by MIN_SHARE
+ML_MERCHANT_RULE_TTL = env.int('ML_MERCHANT_RULE_TTL', default=600)
+ML_MERCHANT_RULE_MIN_COUNT = env.int('ML_MERCHANT_RULE_MIN_COUNT', default=5)
+ML_MERCHANT_RULE_MIN_SHARE = env.float('ML_MERCHANT_RULE_MIN_SHARE', default=0.9)
+
+# Async views run inference on a bounded thread pool; requests beyond
+# MAX_PENDING queued predictions get 503 instead of piling up
+ML_INFERENCE_THREADS = env.int('ML_INFERENCE_THREADS', default=2)
+ML_INFERENCE_MAX_PENDING = env.int('ML_INFERENCE_MAX_PENDING', default=32)
+
+# Optional standalone inference server (manage.py run_inference_server).
+# When set, predict_category sends texts to this Unix socket instead of
+# loading torch in every web worker, and falls back in-process if it's down
+ML_INFERENCE_SOCKET = env('ML_INFERENCE_SOCKET', default='')
+ML_INFERENCE_TIMEOUT = env.float('ML_INFERENCE_TIMEOUT', default=2.0)
+ML_INFERENCE_BATCH_SIZE = env.int('ML_INFERENCE_BATCH_SIZE', default=32)
+ML_INFERENCE_BATCH_WAIT_MS = env.float('ML_INFERENCE_BATCH_WAIT_MS', default=2)
+
+# Texts per forward pass when classifying in bulk; texts are grouped by
+# length so each pass pads only to its own longest text
+ML_INFERENCE_BUCKET_SIZE = env.int('ML_INFERENCE_BUCKET_SIZE', default=64)
+
+# Serve the merged-conv, dropout-free build of the model (same outputs,
+# less work per request); turn off to serve the trained module as loaded
+ML_INFERENCE_FUSED = env.bool('ML_INFERENCE_FUSED', default=True)
+
+# Runtime serving the model: torch (the .pt checkpoint), onnx (ONNX Runtime
+# on CPU) or numpy (plain NumPy). onnx and numpy serve the file written by
+# manage.py export_model --format onnx|numpy next to the checkpoint, so
+# workers don't import torch
+ML_INFERENCE_BACKEND = env('ML_INFERENCE_BACKEND', default='torch')
+ML_ONNX_THREADS = env.int('ML_ONNX_THREADS', default=1)
+
+# Predictions below this confidence aren't served as is: keyword rules
+# answer when ML_LOW_CONFIDENCE_FALLBACK is 'keyword' and one category
+# matches, otherwise the response is 'other' with abstain set. These cases
+# are queued for review, written ML_REVIEW_BATCH_SIZE rows at a time or once
+# the oldest is ML_REVIEW_FLUSH_SECONDS old. Off (0) by default; pick a
+# value from the model's confidence on held-out data
+ML_CONFIDENCE_THRESHOLD = env.float('ML_CONFIDENCE_THRESHOLD', default=0.0)
+ML_LOW_CONFIDENCE_FALLBACK = env('ML_LOW_CONFIDENCE_FALLBACK', default='keyword')
+ML_REVIEW_BATCH_SIZE = env.int('ML_REVIEW_BATCH_SIZE', default=50)
+ML_REVIEW_FLUSH_SECONDS = env.float('ML_REVIEW_FLUSH_SECONDS', default=30)
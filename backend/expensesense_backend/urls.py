@@ -5,12 +5,14 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .health import readiness
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls')),
     path('expenses/', include('expenses.urls')),
     path('ml/', include('ml_model.urls')),
+    path('healthz/ready', readiness, name='readiness'),
 ]
 
 # Serve media files in development
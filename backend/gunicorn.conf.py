@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration
+
+GUNICORN_WORKER_CLASS=sync (default) serves the WSGI app with sync workers.
+Set it to uvicorn.workers.UvicornWorker to serve the ASGI app, where the
+async classify and summary endpoints no longer tie up a worker per request.
+
+Usage:
+    gunicorn -c gunicorn.conf.py
+"""
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', '3'))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', '120'))
+
+if worker_class.startswith('uvicorn'):
+    wsgi_app = 'expensesense_backend.asgi:application'
+else:
+    wsgi_app = 'expensesense_backend.wsgi:application'
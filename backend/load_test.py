@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+Load Test Script
+Compares p50/p99 latency of the sync and async classify/summary endpoints
+under concurrency
+
+Run it once against the WSGI deployment and once against the ASGI one:
+    GUNICORN_WORKER_CLASS=sync gunicorn -c gunicorn.conf.py
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c gunicorn.conf.py
+
+Usage:
+    python load_test.py --email you@example.com --password ... [--concurrency 64]
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BASE_URL = "http://localhost:8000"
+
+SMS_TEXT = "Rs 450.00 debited from A/c XX1234 for UPI txn to SWIGGY on 12-10-24"
+
+ENDPOINTS = {
+    "classify (sync)": ("POST", "/ml/classify/"),
+    "classify (async)": ("POST", "/ml/classify/async/"),
+    "monthly summary (sync)": ("GET", "/expenses/summary/monthly/"),
+    "monthly summary (async)": ("GET", "/expenses/async/summary/monthly/"),
+    "yearly summary (sync)": ("GET", "/expenses/summary/yearly/"),
+    "yearly summary (async)": ("GET", "/expenses/async/summary/yearly/"),
+}
+
+
+def login(base_url, email, password):
+    response = requests.post(
+        f"{base_url}/auth/login/",
+        json={"email": email, "password": password},
+        timeout=10
+    )
+    response.raise_for_status()
+    return response.json()['tokens']['access']
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_endpoint(base_url, token, method, path, total, concurrency):
+    session = requests.Session()
+    session.headers["Authorization"] = f"Bearer {token}"
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    
+    def call(_):
+        start = time.perf_counter()
+        try:
+            if method == "POST":
+                response = session.post(f"{base_url}{path}", json={"sms_text": SMS_TEXT}, timeout=60)
+            else:
+                response = session.get(f"{base_url}{path}", timeout=60)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        return (time.perf_counter() - start) * 1000, ok
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, range(total)))
+    elapsed = time.perf_counter() - start
+    
+    latencies = [latency for latency, _ in results]
+    errors = sum(1 for _, ok in results if not ok)
+    return latencies, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+    
+    print("\n" + "="*60)
+    print("⏱  EXPENSESENSE LOAD TEST")
+    print("="*60)
+    print(f"{args.base_url}: {args.requests} requests per endpoint, concurrency {args.concurrency}\n")
+    
+    token = login(args.base_url, args.email, args.password)
+    
+    for name, (method, path) in ENDPOINTS.items():
+        latencies, errors, elapsed = run_endpoint(
+            args.base_url, token, method, path, args.requests, args.concurrency
+        )
+        print(
+            f"{name:<26} p50 {statistics.median(latencies):8.1f} ms  "
+            f"p99 {percentile(latencies, 99):8.1f} ms  "
+            f"{len(latencies) / elapsed:7.1f} req/s  errors {errors}"
+        )
+    
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import CategoryCorrection, ClassificationReview
+
+
+@admin.register(ClassificationReview)
+class ClassificationReviewAdmin(admin.ModelAdmin):
+    list_display = ('predicted_category', 'confidence', 'served_category', 'outcome', 'reviewed_category', 'created_at')
+    list_filter = ('outcome', 'predicted_category', 'reviewed_category', 'model_version')
+    search_fields = ('sms_text',)
+    readonly_fields = ('sms_text', 'predicted_category', 'confidence', 'served_category', 'outcome',
+                       'model_version', 'created_at')
+    list_editable = ('reviewed_category',)
+    date_hierarchy = 'created_at'
+    ordering = ('-created_at',)
+    
+    def save_model(self, request, obj, form, change):
+        if obj.reviewed_category and obj.reviewed_at is None:
+            obj.reviewed_at = timezone.now()
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(CategoryCorrection)
+class CategoryCorrectionAdmin(admin.ModelAdmin):
+    list_display = ('user', 'predicted_category', 'corrected_category', 'model_version', 'updated_at')
+    list_filter = ('predicted_category', 'corrected_category', 'model_version')
+    search_fields = ('user__email', 'sms_text')
+    raw_id_fields = ('expense', 'user')
+    readonly_fields = ('created_at', 'updated_at')
+    ordering = ('-updated_at',)
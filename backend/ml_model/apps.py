@@ -7,9 +7,24 @@ class MlModelConfig(AppConfig):
     verbose_name = 'ML Model'
     
     def ready(self):
-        """Load ML model when Django starts"""
-        from .load_model import load_expense_model
+        """Load ML model when Django starts, unless an inference server serves it"""
+        from django.conf import settings
+        from django.db.models.signals import post_save, post_delete
+        from expenses.models import Merchant
+        from .rules import invalidate_merchant_rules
+        
+        # Explicit merchant categories take effect without waiting for the TTL
+        post_save.connect(invalidate_merchant_rules, sender=Merchant)
+        post_delete.connect(invalidate_merchant_rules, sender=Merchant)
+        
+        # With an inference server the model (and torch) stay out of web workers
+        if settings.ML_INFERENCE_SOCKET:
+            return
+        
+        # Hot reload triggers are started by the serving entry points
+        # (wsgi.py, asgi.py), not in every process that sets up Django
         try:
+            from .load_model import load_expense_model
             load_expense_model()
             print("✓ ML Model loaded successfully")
         except Exception as e:
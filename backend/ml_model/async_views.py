@@ -0,0 +1,76 @@
+"""
+Async variants of the ML views for the ASGI deployment
+"""
+import json
+
+from django.http import HttpResponse, HttpResponseNotAllowed
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+
+from users.authentication import aauthenticate
+from .executor import InferenceBusy, apredict_category
+from .serializers import ClassifyExpenseSerializer, ClassifyExpenseResponseSerializer
+
+
+def json_response(data, status_code=status.HTTP_200_OK):
+    """Render data the same way DRF's JSONRenderer does for the sync views"""
+    return HttpResponse(
+        JSONRenderer().render(data),
+        content_type='application/json',
+        status=status_code
+    )
+
+
+async def classify_expense_async(request):
+    """
+    POST /ml/classify/async/
+    
+    Same contract as POST /ml/classify/, with inference offloaded to a
+    bounded thread pool. Returns 503 when the pool is saturated.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    
+    try:
+        user = await aauthenticate(request)
+    except AuthenticationFailed as e:
+        return json_response({'detail': e.detail}, status.HTTP_401_UNAUTHORIZED)
+    
+    if user is None:
+        return json_response(
+            {'detail': 'Authentication credentials were not provided.'},
+            status.HTTP_401_UNAUTHORIZED
+        )
+    
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return json_response({'detail': 'JSON parse error'}, status.HTTP_400_BAD_REQUEST)
+    
+    serializer = ClassifyExpenseSerializer(data=data)
+    
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        result = await apredict_category(
+            serializer.validated_data['sms_text'],
+            top_k=serializer.validated_data.get('top_k'),
+            lite=serializer.validated_data['lite']
+        )
+    except InferenceBusy:
+        return json_response(
+            {'error': 'Classification is busy, retry shortly'},
+            status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+    
+    # Check for errors
+    if 'error' in result:
+        return json_response({'error': result['error'], 'category': result['category']})
+    
+    return json_response(ClassifyExpenseResponseSerializer(result).data)
+
+
+# Token authenticated, so CSRF doesn't apply (csrf_exempt isn't async-aware in Django 4.2)
+classify_expense_async.csrf_exempt = True
@@ -0,0 +1,183 @@
+"""
+Inference Backends
+Run a loaded model on a padded int64 token array and return class
+probabilities, so callers don't depend on the runtime executing it
+
+- torch: the ExpenseCNN checkpoint (.pt), as trained
+- onnx: an ONNX Runtime session over a file written by
+  manage.py export_model --format onnx, without importing torch
+- numpy: ExpenseCNN.forward in plain NumPy over the weights written by
+  manage.py export_model --format numpy, no runtime beyond numpy
+
+torch and onnxruntime are only imported by the backend using them.
+"""
+import io
+import json
+
+import numpy as np
+from django.conf import settings
+from numpy.lib.stride_tricks import sliding_window_view
+
+BACKENDS = ('torch', 'onnx', 'numpy')
+
+# File suffix of each backend's model, next to the .pt checkpoint
+EXPORT_SUFFIXES = {'onnx': '.onnx', 'numpy': '.npz'}
+
+# Conv layers of ExpenseCNN, in the order their features are concatenated
+CONV_LAYERS = ('conv1', 'conv2', 'conv3')
+
+
+def softmax(logits):
+    """Row-wise softmax over a (batch, classes) array"""
+    logits = logits - logits.max(axis=1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=1, keepdims=True)
+
+
+def get_backend_name():
+    """Configured backend (settings.ML_INFERENCE_BACKEND)"""
+    name = getattr(settings, 'ML_INFERENCE_BACKEND', 'torch')
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ML_INFERENCE_BACKEND {name!r}, expected one of {', '.join(BACKENDS)}")
+    return name
+
+
+def optimize_for_inference(model):
+    """
+    Swap in the merged-conv InferenceExpenseCNN when ML_INFERENCE_FUSED is on
+    and the model's shapes allow it, otherwise serve the model as trained
+    """
+    from .cnn import InferenceExpenseCNN
+    
+    if not getattr(settings, 'ML_INFERENCE_FUSED', True):
+        return model
+    return InferenceExpenseCNN.from_trained(model) or model
+
+
+class TorchBackend:
+    """Serve a trained ExpenseCNN with torch"""
+    
+    name = 'torch'
+    
+    def __init__(self, model):
+        # Trained ExpenseCNN as loaded, and the model used for serving
+        self.trained_model = model
+        self.model = optimize_for_inference(model)
+        self.vocab_size = model.embedding.num_embeddings
+        self.num_classes = model.fc2.out_features
+    
+    def predict_proba(self, batch):
+        import torch
+        
+        with torch.inference_mode():
+            return torch.softmax(self.model(torch.from_numpy(batch)), dim=1).numpy()
+
+
+class OnnxBackend:
+    """Serve an exported model with ONNX Runtime on CPU"""
+    
+    name = 'onnx'
+    trained_model = None
+    
+    def __init__(self, model_bytes):
+        import onnxruntime
+        
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = getattr(settings, 'ML_ONNX_THREADS', 1)
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        
+        self.session = onnxruntime.InferenceSession(
+            model_bytes,
+            options,
+            providers=['CPUExecutionProvider']
+        )
+        self.input_name = self.session.get_inputs()[0].name
+        
+        # Written by load_model.export_metadata at export time
+        self.metadata = self.session.get_modelmeta().custom_metadata_map
+        self.vocab_size = int(self.metadata['vocab_size'])
+        self.num_classes = int(self.metadata['num_classes'])
+    
+    def predict_proba(self, batch):
+        (logits,) = self.session.run(None, {self.input_name: batch})
+        return softmax(logits)
+
+
+class NumpyBackend:
+    """
+    Serve ExpenseCNN weights exported to .npz with NumPy
+    
+    Like InferenceExpenseCNN, the conv branches are merged into one
+    kernel 5 / padding 2 convolution, run as a single im2col matmul over
+    sliding windows, and ReLU is applied after global max pooling.
+    """
+    
+    name = 'numpy'
+    trained_model = None
+    
+    # Kernel size and padding of the merged convolution
+    KERNEL_SIZE = 5
+    PADDING = 2
+    
+    def __init__(self, model_bytes):
+        with np.load(io.BytesIO(model_bytes), allow_pickle=False) as arrays:
+            weights = {key: arrays[key] for key in arrays.files}
+        
+        self.metadata = json.loads(str(weights.pop('metadata')))
+        self.embedding = weights['embedding.weight'].astype(np.float32)
+        self.fc1_weight = weights['fc1.weight'].T.astype(np.float32)
+        self.fc1_bias = weights['fc1.bias'].astype(np.float32)
+        self.fc2_weight = weights['fc2.weight'].T.astype(np.float32)
+        self.fc2_bias = weights['fc2.bias'].astype(np.float32)
+        
+        embedding_dim = self.embedding.shape[1]
+        kernels, biases = [], []
+        
+        # Output channel slice of each branch, and how many trailing
+        # positions of the merged output the branch doesn't have
+        self.branches = []
+        start = 0
+        for layer in CONV_LAYERS:
+            weight = weights[f'{layer}.weight']
+            out_channels, in_channels, kernel_size = weight.shape
+            padding = int(weights[f'{layer}.padding'])
+            if in_channels != embedding_dim:
+                raise ValueError(f"{layer} takes {in_channels} channels, expected {embedding_dim}")
+            
+            offset = self.PADDING - padding
+            kernel = np.zeros((out_channels, in_channels, self.KERNEL_SIZE), dtype=np.float32)
+            kernel[:, :, offset:offset + kernel_size] = weight
+            kernels.append(kernel)
+            biases.append(weights[f'{layer}.bias'])
+            
+            self.branches.append((slice(start, start + out_channels), kernel_size - 1 - 2 * padding))
+            start += out_channels
+        
+        # (in_channels * kernel, out_channels), matching the im2col window layout
+        self.conv_weight = np.concatenate(kernels).reshape(start, -1).T.copy()
+        self.conv_bias = np.concatenate(biases).astype(np.float32)
+        
+        self.vocab_size = int(self.metadata['vocab_size'])
+        self.num_classes = int(self.metadata['num_classes'])
+    
+    def logits(self, batch):
+        batch_size, length = batch.shape
+        
+        x = self.embedding[batch]  # (batch, length, embedding_dim)
+        x = np.pad(x, ((0, 0), (self.PADDING, self.PADDING), (0, 0)))
+        
+        # im2col: (batch, length, embedding_dim, kernel) windows as one matrix
+        windows = sliding_window_view(x, self.KERNEL_SIZE, axis=1)
+        columns = windows.reshape(batch_size * length, -1)
+        conv = (columns @ self.conv_weight + self.conv_bias).reshape(batch_size, length, -1)
+        
+        pooled = np.concatenate(
+            [conv[:, :length - trim, channels].max(axis=1) for channels, trim in self.branches],
+            axis=1
+        )
+        hidden = np.maximum(np.maximum(pooled, 0) @ self.fc1_weight + self.fc1_bias, 0)
+        return hidden @ self.fc2_weight + self.fc2_bias
+    
+    def predict_proba(self, batch):
+        return softmax(self.logits(batch))
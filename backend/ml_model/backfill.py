@@ -0,0 +1,55 @@
+"""
+Worker process functions for parallel reclassification
+Kept free of model imports at module level so spawned workers can unpickle
+them before Django is set up
+"""
+
+# Sequences per forward pass inside a worker
+INFERENCE_BATCH_SIZE = 256
+
+
+def init_worker(torch_threads):
+    """Process pool initializer: set up Django and load the model once per worker"""
+    import django
+    django.setup()
+    
+    from ml_model.backends import get_backend_name
+    from ml_model.load_model import load_expense_model
+    
+    # Workers already run in parallel, so keep each one from spawning a thread per core
+    # (ONNX Runtime sessions use ML_ONNX_THREADS)
+    if get_backend_name() == 'torch':
+        import torch
+        torch.set_num_threads(torch_threads)
+    load_expense_model()
+
+
+def classify_chunk(rows):
+    """
+    Classify one chunk in a worker process
+    
+    Args:
+        rows (list): (expense id, sms text) pairs
+    
+    Returns:
+        list: (expense id, category or None, confidence, model version) tuples
+    """
+    from ml_model.predict import preprocess_sms_text, run_model
+    
+    results = []
+    texts = [(expense_id, preprocess_sms_text(text)) for expense_id, text in rows]
+    
+    # Texts that preprocess to nothing keep their current category
+    results.extend((expense_id, None, 0.0, None) for expense_id, text in texts if not text)
+    texts = [(expense_id, text) for expense_id, text in texts if text]
+    
+    for start in range(0, len(texts), INFERENCE_BATCH_SIZE):
+        batch = texts[start:start + INFERENCE_BATCH_SIZE]
+        probabilities, label_encoder, model_version = run_model([text for _, text in batch])
+        predicted = probabilities.argmax(axis=1)
+        confidences = probabilities[range(len(batch)), predicted].tolist()
+        
+        for (expense_id, _), predicted_idx, confidence in zip(batch, predicted.tolist(), confidences):
+            results.append((expense_id, label_encoder.get(predicted_idx), confidence, model_version))
+    
+    return results
@@ -0,0 +1,42 @@
+"""
+Checkpoint Saving
+Versioned checkpoint files with an atomically replaced active checkpoint,
+shared by train_model.py and manage.py finetune_model
+
+Kept free of Django imports so train_model.py can use it as a plain script.
+"""
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+import torch
+
+
+def new_model_version():
+    """Timestamp version for a newly trained checkpoint"""
+    return datetime.now().strftime('%Y%m%d%H%M%S')
+
+
+def save_checkpoint(checkpoint, active_path, activate=True):
+    """
+    Save checkpoint as <name>-<model_version>.pt next to active_path, and
+    point active_path at it unless activate is off
+    
+    active_path is replaced atomically, so running servers never read a
+    half-written file and their hot reload picks up the new model.
+    
+    Returns:
+        Path: The versioned checkpoint file
+    """
+    active_path = Path(active_path)
+    versioned_path = active_path.with_name(f"{active_path.stem}-{checkpoint['model_version']}{active_path.suffix}")
+    
+    torch.save(checkpoint, versioned_path)
+    
+    if activate:
+        tmp_path = active_path.with_name(f"{active_path.name}.tmp")
+        shutil.copyfile(versioned_path, tmp_path)
+        os.replace(tmp_path, active_path)
+    
+    return versioned_path
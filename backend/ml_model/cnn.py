@@ -0,0 +1,130 @@
+"""
+Expense CNN Model Definition
+Shared by training (train_model.py) and serving (load_model.py)
+
+Kept free of Django imports so train_model.py can use it as a plain script.
+"""
+import torch
+import torch.nn as nn
+
+
+class ExpenseCNN(nn.Module):
+    """
+    CNN Model for SMS expense classification
+    Architecture: Embedding -> 3 parallel Conv1D -> Global MaxPool -> FC -> FC
+    """
+    def __init__(self, vocab_size=10000, embedding_dim=128, num_classes=10, max_length=100):
+        super(ExpenseCNN, self).__init__()
+        
+        self.embedding = nn.Embedding(vocab_size, embedding_dim, padding_idx=0)
+        
+        # Convolutional layers with different kernel sizes
+        self.conv1 = nn.Conv1d(embedding_dim, 128, kernel_size=3, padding=1)
+        self.conv2 = nn.Conv1d(128, 128, kernel_size=4, padding=1)
+        self.conv3 = nn.Conv1d(128, 128, kernel_size=5, padding=2)
+        
+        self.relu = nn.ReLU()
+        self.dropout = nn.Dropout(0.5)
+        
+        # Calculate FC input size
+        fc_input_size = 128 * 3  # 3 conv outputs concatenated
+        
+        self.fc1 = nn.Linear(fc_input_size, 64)
+        self.fc2 = nn.Linear(64, num_classes)
+    
+    def forward(self, x):
+        # x shape: (batch, seq_len)
+        x = self.embedding(x)  # (batch, seq_len, embedding_dim)
+        x = x.permute(0, 2, 1)  # (batch, embedding_dim, seq_len)
+        
+        # Apply convolutions
+        x1 = self.relu(self.conv1(x))
+        x1 = torch.max(x1, dim=2)[0]  # Global max pooling
+        
+        x2 = self.relu(self.conv2(x))
+        x2 = torch.max(x2, dim=2)[0]
+        
+        x3 = self.relu(self.conv3(x))
+        x3 = torch.max(x3, dim=2)[0]
+        
+        # Concatenate features
+        x = torch.cat([x1, x2, x3], dim=1)
+        
+        x = self.dropout(x)
+        x = self.relu(self.fc1(x))
+        x = self.dropout(x)
+        x = self.fc2(x)
+        
+        return x
+
+
+class InferenceExpenseCNN(nn.Module):
+    """
+    Eval-only ExpenseCNN producing the same outputs with less work
+    
+    - The three conv branches run as one Conv1d (kernel 5, padding 2) with
+      each branch's weights placed at the offsets its own padding implies.
+      conv2's output is one position shorter, so its last position is dropped
+      before pooling.
+    - ReLU is monotonic, so it's applied after global max pooling to
+      (batch, 384) values instead of every conv position.
+    - Dropout, an identity in eval, is left out.
+    """
+    
+    def __init__(self, embedding, conv, fc1, fc2, branch_channels):
+        super(InferenceExpenseCNN, self).__init__()
+        
+        self.embedding = embedding
+        self.conv = conv
+        self.fc1 = fc1
+        self.fc2 = fc2
+        self.branch_channels = branch_channels
+    
+    @classmethod
+    def from_trained(cls, model):
+        """
+        Build from a trained ExpenseCNN, sharing its embedding and FC layers
+        
+        Returns:
+            InferenceExpenseCNN, or None when the conv branches can't be
+            merged (their input channels differ from the embedding size)
+        """
+        convs = (model.conv1, model.conv2, model.conv3)
+        in_channels = model.embedding.embedding_dim
+        
+        if any(conv.in_channels != in_channels for conv in convs):
+            return None
+        
+        # Offset of each branch inside a kernel 5 / padding 2 window
+        offsets = [2 - conv.padding[0] for conv in convs]
+        
+        out_channels = [conv.out_channels for conv in convs]
+        merged = nn.Conv1d(in_channels, sum(out_channels), kernel_size=5, padding=2)
+        
+        with torch.no_grad():
+            merged.weight.zero_()
+            start = 0
+            for conv, offset in zip(convs, offsets):
+                end = start + conv.out_channels
+                kernel_size = conv.kernel_size[0]
+                merged.weight[start:end, :, offset:offset + kernel_size] = conv.weight
+                merged.bias[start:end] = conv.bias
+                start = end
+        
+        inference_model = cls(model.embedding, merged, model.fc1, model.fc2, out_channels)
+        inference_model.eval()
+        return inference_model
+    
+    def forward(self, x):
+        x = self.embedding(x).permute(0, 2, 1)
+        x = self.conv(x)
+        
+        # conv2 (kernel 4, padding 1) has one output position fewer
+        first, second, _ = self.branch_channels
+        x1 = x[:, :first].amax(dim=2)
+        x2 = x[:, first:first + second, :-1].amax(dim=2)
+        x3 = x[:, first + second:].amax(dim=2)
+        
+        x = torch.relu(torch.cat([x1, x2, x3], dim=1))
+        x = torch.relu(self.fc1(x))
+        return self.fc2(x)
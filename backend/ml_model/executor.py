@@ -0,0 +1,72 @@
+"""
+Bounded thread pool for model inference from async views
+Keeps CPU-bound inference off the event loop
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .predict import predict_category
+
+# Global executor and pending-request limit
+_executor = None
+_executor_lock = threading.Lock()
+_pending = None
+
+
+class InferenceBusy(Exception):
+    """Raised when ML_INFERENCE_MAX_PENDING predictions are already queued"""
+
+
+def get_inference_executor():
+    """
+    Get the inference thread pool (singleton pattern)
+    
+    Returns:
+        tuple: (ThreadPoolExecutor, BoundedSemaphore limiting queued work)
+    """
+    global _executor, _pending
+    
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _pending = threading.BoundedSemaphore(
+                    getattr(settings, 'ML_INFERENCE_MAX_PENDING', 32)
+                )
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'ML_INFERENCE_THREADS', 2),
+                    thread_name_prefix='inference'
+                )
+    
+    return _executor, _pending
+
+
+def _predict_in_worker(sms_text, options):
+    # Rule lookups may query the database from this long-lived thread
+    close_old_connections()
+    try:
+        return predict_category(sms_text, **options)
+    finally:
+        close_old_connections()
+
+
+async def apredict_category(sms_text, **options):
+    """
+    Async predict_category running on the inference pool
+    
+    Raises:
+        InferenceBusy: If the pool's queue is full, so callers can shed load
+    """
+    executor, pending = get_inference_executor()
+    
+    if not pending.acquire(blocking=False):
+        raise InferenceBusy()
+    
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, _predict_in_worker, sms_text, options)
+    finally:
+        pending.release()
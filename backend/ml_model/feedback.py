@@ -0,0 +1,33 @@
+"""
+Category Feedback Module
+Records the category a user saved when it differs from the model's suggestion
+"""
+from .models import CategoryCorrection
+
+
+def record_category_feedback(expense, created=False):
+    """
+    Create, update or drop the CategoryCorrection for an expense
+    
+    Only expenses saved with a predicted_category and SMS text carry a
+    signal. Changing the category back to the suggestion removes the
+    correction; a just created expense has none to remove.
+    """
+    if not expense.predicted_category or not expense.sms_raw_text:
+        return
+    
+    if expense.category == expense.predicted_category:
+        if not created:
+            CategoryCorrection.objects.filter(expense=expense).delete()
+        return
+    
+    CategoryCorrection.objects.update_or_create(
+        expense=expense,
+        defaults={
+            'user_id': expense.user_id,
+            'sms_text': expense.sms_raw_text,
+            'predicted_category': expense.predicted_category,
+            'corrected_category': expense.category,
+            'model_version': expense.prediction_model_version,
+        }
+    )
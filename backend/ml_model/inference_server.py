@@ -0,0 +1,299 @@
+"""
+Standalone Inference Server
+One process holds the model and batches requests from all web workers,
+which reach it over a Unix domain socket
+
+Wire protocol (network byte order):
+    handshake, server -> client on connect:
+        !B length + UTF-8 model version,
+        !H label count, then per label !B length + UTF-8 name
+    request, client -> server:
+        !I length + UTF-8 preprocessed text
+    response, server -> client:
+        !BHB status, count, version length
+        status 0: UTF-8 model version, then count float32 class probabilities
+        status 1: count bytes of UTF-8 error message
+    A response from a model version other than the handshake's means the
+    server reloaded, and the client reconnects to fetch the new labels.
+"""
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from concurrent.futures import Future
+
+from django.conf import settings
+
+HEADER = struct.Struct('!I')
+RESPONSE_HEADER = struct.Struct('!BHB')
+LABEL_COUNT = struct.Struct('!H')
+STRING_LENGTH = struct.Struct('!B')
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+# Longest text accepted in one request, in bytes
+MAX_TEXT_BYTES = 64 * 1024
+
+# Thread-local client connections
+_local = threading.local()
+
+
+class InferenceUnavailable(Exception):
+    """The inference server could not be reached or failed the request"""
+
+
+def recv_exact(sock, size):
+    """Read exactly size bytes from sock"""
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError('Connection closed by peer')
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def pack_string(value):
+    """Encode a short string as !B length + UTF-8"""
+    data = str(value).encode('utf-8')[:255]
+    return STRING_LENGTH.pack(len(data)) + data
+
+
+def read_string(sock):
+    (length,) = STRING_LENGTH.unpack(recv_exact(sock, STRING_LENGTH.size))
+    return recv_exact(sock, length).decode('utf-8')
+
+
+def pack_handshake(bundle):
+    """Encode the model version and its category names in index order"""
+    num_classes = bundle.backend.num_classes
+    label_encoder = bundle.label_encoder or {}
+    
+    parts = [pack_string(bundle.version), LABEL_COUNT.pack(num_classes)]
+    for idx in range(num_classes):
+        parts.append(pack_string(label_encoder.get(idx, f'category_{idx}')))
+    return b''.join(parts)
+
+
+def read_handshake(sock):
+    """
+    Returns:
+        tuple: (model version, index -> category name dict)
+    """
+    version = read_string(sock)
+    (count,) = LABEL_COUNT.unpack(recv_exact(sock, LABEL_COUNT.size))
+    return version, {idx: read_string(sock) for idx in range(count)}
+
+
+class InferenceClient:
+    """
+    Client for one web worker thread
+    Keeps its socket open between requests and reconnects after failures
+    """
+    
+    def __init__(self, path, timeout):
+        self.path = path
+        self.timeout = timeout
+        self.sock = None
+        self.version = None
+        self.labels = None
+    
+    def connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+            self.version, self.labels = read_handshake(sock)
+        except Exception:
+            sock.close()
+            raise
+        self.sock = sock
+    
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+    
+    def ping(self):
+        """
+        Connect if needed and return the server's model version
+        The server only listens once its model is loaded and warmed
+        
+        Raises:
+            InferenceUnavailable: If the server can't be reached
+        """
+        try:
+            if self.sock is None:
+                self.connect()
+        except (OSError, struct.error) as e:
+            self.close()
+            raise InferenceUnavailable(str(e))
+        
+        return self.version
+    
+    def request(self, payload):
+        """
+        Returns:
+            tuple: (model version, list of class probabilities)
+        """
+        if self.sock is None:
+            self.connect()
+        
+        self.sock.sendall(HEADER.pack(len(payload)) + payload)
+        status, count, version_length = RESPONSE_HEADER.unpack(
+            recv_exact(self.sock, RESPONSE_HEADER.size)
+        )
+        
+        if status != STATUS_OK:
+            message = recv_exact(self.sock, count).decode('utf-8', 'replace')
+            raise InferenceUnavailable(message)
+        
+        version = recv_exact(self.sock, version_length).decode('utf-8')
+        probabilities = struct.unpack(f'!{count}f', recv_exact(self.sock, 4 * count))
+        return version, list(probabilities)
+    
+    def predict(self, processed_text):
+        """
+        Returns:
+            tuple: (list of class probabilities, index -> category name dict, model version)
+        
+        Raises:
+            InferenceUnavailable: On connection or server errors
+        """
+        payload = processed_text.encode('utf-8')[:MAX_TEXT_BYTES]
+        
+        try:
+            version, probabilities = self.request(payload)
+            
+            # The server swapped models since we connected, refresh the labels
+            if version != self.version:
+                self.close()
+                version, probabilities = self.request(payload)
+                if version != self.version:
+                    raise InferenceUnavailable('Model changed during request')
+        except (OSError, struct.error) as e:
+            self.close()
+            raise InferenceUnavailable(str(e))
+        
+        return probabilities, self.labels, version
+
+
+def get_inference_client():
+    """Get this thread's inference client for settings.ML_INFERENCE_SOCKET"""
+    client = getattr(_local, 'client', None)
+    
+    if client is None or client.path != settings.ML_INFERENCE_SOCKET:
+        client = InferenceClient(
+            settings.ML_INFERENCE_SOCKET,
+            getattr(settings, 'ML_INFERENCE_TIMEOUT', 2.0)
+        )
+        _local.client = client
+    
+    return client
+
+
+class Batcher:
+    """
+    Collects texts from all connections and runs them through the model together
+    A batch closes when it reaches batch_size or batch_wait seconds have passed
+    since its first text arrived
+    """
+    
+    def __init__(self, batch_size, batch_wait):
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.queue = queue.Queue()
+        self.batches = 0
+        self.items = 0
+    
+    def submit(self, processed_text):
+        future = Future()
+        self.queue.put((processed_text, future))
+        return future
+    
+    def run(self):
+        from .predict import run_model
+        
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.batch_wait
+            
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            try:
+                probabilities, _, version = run_model([text for text, _ in batch])
+                if probabilities is None:
+                    raise RuntimeError('Model not loaded')
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            
+            self.batches += 1
+            self.items += len(batch)
+            
+            for (_, future), probs in zip(batch, probabilities):
+                future.set_result((version, probs))
+
+
+class InferenceRequestHandler(socketserver.BaseRequestHandler):
+    """Serves one web worker connection until it disconnects"""
+    
+    def handle(self):
+        from .load_model import get_model_bundle
+        
+        sock = self.request
+        sock.sendall(pack_handshake(get_model_bundle()))
+        
+        while True:
+            try:
+                (length,) = HEADER.unpack(recv_exact(sock, HEADER.size))
+                if length > MAX_TEXT_BYTES:
+                    return
+                text = recv_exact(sock, length).decode('utf-8', 'replace')
+            except (OSError, ConnectionError):
+                return
+            
+            try:
+                version, probabilities = self.server.batcher.submit(text).result()
+                version = version.encode('utf-8')[:255]
+                response = RESPONSE_HEADER.pack(STATUS_OK, len(probabilities), len(version)) + version
+                response += struct.pack(f'!{len(probabilities)}f', *probabilities)
+            except Exception as e:
+                message = str(e).encode('utf-8')[:1024]
+                response = RESPONSE_HEADER.pack(STATUS_ERROR, len(message), 0) + message
+            
+            try:
+                sock.sendall(response)
+            except OSError:
+                return
+
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server sharing one model and batcher across connections"""
+    
+    daemon_threads = True
+    
+    # Every web worker thread holds a connection, so allow a deep accept queue
+    request_queue_size = 128
+    
+    def __init__(self, path, batcher):
+        self.batcher = batcher
+        
+        # Remove a stale socket left by a previous run
+        if os.path.exists(path):
+            os.unlink(path)
+        
+        super().__init__(path, InferenceRequestHandler)
+        os.chmod(path, 0o660)
@@ -2,73 +2,199 @@
 ML Model Loading Module
 Loads the pretrained CNN model for expense classification
 """
-import torch
-import torch.nn as nn
-import os
+import hashlib
+import io
+import json
+import signal
+import threading
+import time
 from pathlib import Path
 
-# Global variable to store the loaded model
-_model = None
-_vectorizer = None
-_label_encoder = None
+import numpy as np
+from django.conf import settings
 
+from .backends import EXPORT_SUFFIXES, NumpyBackend, OnnxBackend, TorchBackend, get_backend_name
 
-class ExpenseCNN(nn.Module):
+# Global variable to store the loaded model bundle
+_bundle = None
+_load_lock = threading.Lock()
+_reload_lock = threading.Lock()
+_reload_count = 0
+_reloader_started = False
+
+DUMMY_LABELS = [
+    'food', 'transport', 'shopping', 'entertainment', 'bills',
+    'healthcare', 'education', 'groceries', 'travel', 'other'
+]
+
+# Version of the untrained fallback model
+DUMMY_MODEL_VERSION = 'dummy'
+
+
+class ModelBundle:
     """
-    CNN Model for SMS expense classification
-    Architecture: Embedding -> Conv1D -> MaxPool -> FC -> Softmax
+    One loaded model version with everything needed to run it
+    Swapped as a whole on reload, so a request never mixes two versions
     """
-    def __init__(self, vocab_size=10000, embedding_dim=128, num_classes=10, max_length=100):
-        super(ExpenseCNN, self).__init__()
-        
-        self.embedding = nn.Embedding(vocab_size, embedding_dim, padding_idx=0)
-        
-        # Convolutional layers with different kernel sizes
-        self.conv1 = nn.Conv1d(embedding_dim, 128, kernel_size=3, padding=1)
-        self.conv2 = nn.Conv1d(128, 128, kernel_size=4, padding=1)
-        self.conv3 = nn.Conv1d(128, 128, kernel_size=5, padding=2)
-        
-        self.relu = nn.ReLU()
-        self.pool = nn.MaxPool1d(kernel_size=2)
-        self.dropout = nn.Dropout(0.5)
-        
-        # Calculate FC input size
-        fc_input_size = 128 * 3  # 3 conv outputs concatenated
-        
-        self.fc1 = nn.Linear(fc_input_size, 64)
-        self.fc2 = nn.Linear(64, num_classes)
     
-    def forward(self, x):
-        # x shape: (batch, seq_len)
-        x = self.embedding(x)  # (batch, seq_len, embedding_dim)
-        x = x.permute(0, 2, 1)  # (batch, embedding_dim, seq_len)
-        
-        # Apply convolutions
-        x1 = self.relu(self.conv1(x))
-        x1 = torch.max(x1, dim=2)[0]  # Global max pooling
-        
-        x2 = self.relu(self.conv2(x))
-        x2 = torch.max(x2, dim=2)[0]
-        
-        x3 = self.relu(self.conv3(x))
-        x3 = torch.max(x3, dim=2)[0]
-        
-        # Concatenate features
-        x = torch.cat([x1, x2, x3], dim=1)
-        
-        x = self.dropout(x)
-        x = self.relu(self.fc1(x))
-        x = self.dropout(x)
-        x = self.fc2(x)
-        
-        return x
+    def __init__(self, backend, vectorizer, label_encoder, vocab=None, version=DUMMY_MODEL_VERSION, checksum=None):
+        self.backend = backend
+        # torch modules (trained and serving), None for other backends
+        self.trained_model = backend.trained_model
+        self.model = getattr(backend, 'model', None)
+        self.vectorizer = vectorizer
+        self.label_encoder = label_encoder
+        self.vocab = vocab
+        self.version = version
+        self.checksum = checksum
+        self.loaded_at = time.time()
+        self.warmed = False
 
 
 def get_model_path():
-    """Get the path to the saved model file"""
-    base_dir = Path(__file__).resolve().parent
-    model_path = base_dir / 'expense_cnn_model.pt'
-    return model_path
+    """Get the path to the saved model file (settings.ML_MODEL_PATH)"""
+    default = Path(__file__).resolve().parent / 'expense_cnn_model.pt'
+    return Path(getattr(settings, 'ML_MODEL_PATH', default))
+
+
+def get_export_path(backend_name):
+    """Path of the checkpoint exported for a backend, e.g. expense_cnn_model.onnx"""
+    return get_model_path().with_suffix(EXPORT_SUFFIXES[backend_name])
+
+
+def get_serving_path():
+    """
+    Path of the model file the configured backend serves
+    Other backends fall back to the torch checkpoint until it's exported
+    """
+    backend_name = get_backend_name()
+    
+    if backend_name != 'torch':
+        export_path = get_export_path(backend_name)
+        if export_path.exists():
+            return export_path
+    
+    return get_model_path()
+
+
+def build_dummy_bundle():
+    """Untrained model for development when no usable checkpoint exists"""
+    from .cnn import ExpenseCNN
+    
+    model = ExpenseCNN()
+    model.eval()
+    return ModelBundle(TorchBackend(model), None, dict(enumerate(DUMMY_LABELS)))
+
+
+def build_model_bundle(model_path):
+    """
+    Load a checkpoint into a new ModelBundle
+    
+    The file is read once so a checkpoint replaced mid-load can't be mixed
+    with the previous one. The version is the checkpoint's model_version,
+    or a prefix of its SHA-256 for checkpoints saved without one.
+    
+    Raises:
+        Exception: If the checkpoint can't be read or doesn't match the model
+    """
+    import torch
+    from .cnn import ExpenseCNN
+    
+    data = Path(model_path).read_bytes()
+    checksum = hashlib.sha256(data).hexdigest()
+    
+    # Load on CPU (for deployment)
+    device = torch.device('cpu')
+    checkpoint = torch.load(io.BytesIO(data), map_location=device)
+    
+    # Extract model components
+    model_state = checkpoint.get('model_state_dict', checkpoint)
+    
+    # Initialize model with saved config
+    model = ExpenseCNN(
+        vocab_size=checkpoint.get('vocab_size', 10000),
+        embedding_dim=checkpoint.get('embedding_dim', 128),
+        num_classes=checkpoint.get('num_classes', 10)
+    )
+    
+    model.load_state_dict(model_state)
+    model.to(device)
+    model.eval()
+    
+    return ModelBundle(
+        TorchBackend(model),
+        checkpoint.get('vectorizer', None),
+        checkpoint.get('label_encoder', None),
+        vocab=checkpoint.get('vocab', None),
+        version=str(checkpoint.get('model_version') or checksum[:12]),
+        checksum=checksum
+    )
+
+
+def export_metadata(bundle):
+    """
+    String metadata stored with an exported model, so backends without
+    torch get the vocabulary, labels and version of the source checkpoint
+    """
+    return {
+        'model_version': bundle.version,
+        'source_checksum': bundle.checksum or '',
+        'vocab_size': str(bundle.backend.vocab_size),
+        'num_classes': str(bundle.backend.num_classes),
+        'vocab': json.dumps(bundle.vocab) if bundle.vocab is not None else '',
+        'label_encoder': json.dumps(bundle.label_encoder or {}),
+    }
+
+
+def build_export_bundle(model_path, backend_class):
+    """
+    Load a model written by manage.py export_model
+    
+    Raises:
+        Exception: If the file can't be read or lacks the export metadata
+    """
+    data = Path(model_path).read_bytes()
+    backend = backend_class(data)
+    metadata = backend.metadata
+    
+    return ModelBundle(
+        backend,
+        None,
+        {int(idx): name for idx, name in json.loads(metadata['label_encoder']).items()},
+        vocab=json.loads(metadata['vocab']) if metadata.get('vocab') else None,
+        version=metadata['model_version'],
+        checksum=hashlib.sha256(data).hexdigest()
+    )
+
+
+def build_bundle(model_path):
+    """Load a model file with the backend matching its suffix"""
+    suffix = Path(model_path).suffix
+    
+    if suffix == EXPORT_SUFFIXES['onnx']:
+        return build_export_bundle(model_path, OnnxBackend)
+    if suffix == EXPORT_SUFFIXES['numpy']:
+        return build_export_bundle(model_path, NumpyBackend)
+    return build_model_bundle(model_path)
+
+
+def warm_bundle(bundle):
+    """
+    Run forward passes over representative input shapes before serving
+    
+    The first passes pay for the runtime's lazy init, allocator growth and
+    kernel selection per shape; doing them here keeps that off real requests.
+    """
+    vocab_size = bundle.backend.vocab_size
+    lengths = getattr(settings, 'ML_WARMUP_LENGTHS', [16, 32, 64, 100])
+    batch_sizes = getattr(settings, 'ML_WARMUP_BATCH_SIZES', [1, 8])
+    rng = np.random.default_rng(0)
+    
+    for batch_size in batch_sizes:
+        for length in lengths:
+            bundle.backend.predict_proba(rng.integers(1, max(vocab_size, 2), (batch_size, length)))
+    
+    bundle.warmed = True
 
 
 def load_expense_model():
@@ -76,83 +202,161 @@ def load_expense_model():
     Load the pretrained expense classification model
     Returns: model, vectorizer, label_encoder
     """
-    global _model, _vectorizer, _label_encoder
-    
-    if _model is not None:
-        return _model, _vectorizer, _label_encoder
+    bundle = get_model_bundle()
+    return bundle.model, bundle.vectorizer, bundle.label_encoder
+
+
+def get_model_bundle():
+    """Get the active ModelBundle, loading it on first use (singleton pattern)"""
+    global _bundle
     
-    model_path = get_model_path()
+    if _bundle is not None:
+        return _bundle
     
-    if not model_path.exists():
-        print(f"Warning: Model file not found at {model_path}")
-        print("Creating a dummy model for development. Train the real model for production.")
-        
-        # Create dummy model for development
-        _model = ExpenseCNN()
-        _model.eval()
-        
-        # Dummy vectorizer and label encoder
-        _vectorizer = None
-        _label_encoder = {
-            0: 'food',
-            1: 'transport',
-            2: 'shopping',
-            3: 'entertainment',
-            4: 'bills',
-            5: 'healthcare',
-            6: 'education',
-            7: 'groceries',
-            8: 'travel',
-            9: 'other'
-        }
+    with _load_lock:
+        if _bundle is not None:
+            return _bundle
         
-        return _model, _vectorizer, _label_encoder
-    
-    try:
-        # Load on CPU (for deployment)
-        device = torch.device('cpu')
-        checkpoint = torch.load(model_path, map_location=device)
+        model_path = get_serving_path()
         
-        # Extract model components
-        model_state = checkpoint.get('model_state_dict', checkpoint)
-        _vectorizer = checkpoint.get('vectorizer', None)
-        _label_encoder = checkpoint.get('label_encoder', None)
+        if model_path.suffix == '.pt' and get_backend_name() != 'torch':
+            print(f"Warning: No {get_backend_name()} export found, serving {model_path} with torch. "
+                  f"Run manage.py export_model --format {get_backend_name()}")
         
-        # Initialize model with saved config
-        vocab_size = checkpoint.get('vocab_size', 10000)
-        embedding_dim = checkpoint.get('embedding_dim', 128)
-        num_classes = checkpoint.get('num_classes', 10)
+        if not model_path.exists():
+            print(f"Warning: Model file not found at {model_path}")
+            print("Creating a dummy model for development. Train the real model for production.")
+            bundle = build_dummy_bundle()
+        else:
+            try:
+                bundle = build_bundle(model_path)
+                print(f"✓ Model {bundle.version} loaded from {model_path} ({bundle.backend.name})")
+            except Exception as e:
+                print(f"Error loading model: {e}")
+                # Fallback to dummy model
+                bundle = build_dummy_bundle()
         
-        _model = ExpenseCNN(
-            vocab_size=vocab_size,
-            embedding_dim=embedding_dim,
-            num_classes=num_classes
-        )
+        warm_bundle(bundle)
+        _bundle = bundle
+    
+    return _bundle
+
+
+def get_loaded_model():
+    """Get the already loaded model (singleton pattern)"""
+    bundle = get_model_bundle()
+    return bundle.model, bundle.vectorizer, bundle.label_encoder
+
+
+def reload_model(force=False):
+    """
+    Load the served model file and swap it in if it changed
+    
+    The new model is loaded and warmed before the swap, and requests keep
+    using the old one until then. A failed load keeps the old model.
+    
+    Args:
+        force (bool): Swap even if the checkpoint bytes are unchanged
+    
+    Returns:
+        tuple: (active ModelBundle, whether a new one was swapped in)
+    
+    Raises:
+        Exception: If the new checkpoint can't be loaded
+    """
+    global _bundle, _reload_count
+    
+    with _reload_lock:
+        current = get_model_bundle()
+        bundle = build_bundle(get_serving_path())
         
-        _model.load_state_dict(model_state)
-        _model.to(device)
-        _model.eval()
+        if not force and bundle.checksum == current.checksum:
+            return current, False
         
-        print(f"✓ Model loaded from {model_path}")
+        warm_bundle(bundle)
         
-    except Exception as e:
-        print(f"Error loading model: {e}")
-        # Fallback to dummy model
-        _model = ExpenseCNN()
-        _model.eval()
-        _label_encoder = {i: cat for i, cat in enumerate([
-            'food', 'transport', 'shopping', 'entertainment', 'bills',
-            'healthcare', 'education', 'groceries', 'travel', 'other'
-        ])}
+        # A single reference assignment, so readers see the old or the new bundle
+        _bundle = bundle
+        _reload_count += 1
     
-    return _model, _vectorizer, _label_encoder
+    print(f"✓ Model reloaded: {current.version} -> {bundle.version}")
+    return bundle, True
 
 
-def get_loaded_model():
-    """Get the already loaded model (singleton pattern)"""
-    global _model, _vectorizer, _label_encoder
+def is_model_ready():
+    """Whether a model is loaded and warmed in this process"""
+    bundle = _bundle
+    return bundle is not None and bundle.warmed
+
+
+def get_model_info():
+    """Active model version and reload counters for stats responses"""
+    bundle = _bundle
+    
+    return {
+        'model_version': bundle.version if bundle else None,
+        'model_backend': bundle.backend.name if bundle else None,
+        'model_loaded_at': (
+            time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(bundle.loaded_at)) if bundle else None
+        ),
+        'model_reloads': _reload_count,
+    }
+
+
+def _reload_in_background():
+    def run():
+        try:
+            reload_model()
+        except Exception as e:
+            print(f"✗ Model reload failed, keeping current model: {e}")
+    
+    threading.Thread(target=run, name='model-reload', daemon=True).start()
+
+
+def _watch_model_file(interval):
+    """Poll the checkpoint file and reload when it's replaced or modified"""
+    def stat_key():
+        try:
+            stat = get_serving_path().stat()
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+    
+    last_seen = stat_key()
+    while True:
+        time.sleep(interval)
+        current = stat_key()
+        if current is not None and current != last_seen:
+            last_seen = current
+            _reload_in_background()
+
+
+def start_model_reloader():
+    """
+    Enable hot reload triggers for this process (idempotent)
+    Called from the serving entry points: wsgi.py, asgi.py and
+    run_inference_server
+    
+    ML_MODEL_RELOAD_SIGNAL (default SIGHUP) reloads on that signal, and
+    ML_MODEL_WATCH_INTERVAL > 0 polls the checkpoint file for changes.
+    """
+    global _reloader_started
+    
+    if _reloader_started:
+        return
+    _reloader_started = True
+    
+    signal_name = getattr(settings, 'ML_MODEL_RELOAD_SIGNAL', 'SIGHUP')
     
-    if _model is None:
-        return load_expense_model()
+    # Signal handlers can only be installed from the main thread
+    if signal_name and threading.current_thread() is threading.main_thread():
+        signal.signal(getattr(signal, signal_name), lambda signum, frame: _reload_in_background())
     
-    return _model, _vectorizer, _label_encoder
+    interval = getattr(settings, 'ML_MODEL_WATCH_INTERVAL', 0)
+    if interval > 0:
+        threading.Thread(
+            target=_watch_model_file,
+            args=(interval,),
+            name='model-watch',
+            daemon=True
+        ).start()
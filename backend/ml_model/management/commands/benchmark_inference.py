@@ -0,0 +1,146 @@
+"""
+Compare padding every text to 100 tokens with variable-length inference,
+and the trained model with the inference-optimized variant
+
+Checks that each gives the same probabilities, then measures single-text
+latency and bulk throughput.
+
+Usage:
+    python manage.py benchmark_inference [--samples 500] [--repeat 3] [--batch-size 64] [--synthetic]
+"""
+import statistics
+import time
+
+import numpy as np
+import torch
+from django.core.management.base import BaseCommand, CommandError
+
+from ml_model.cnn import InferenceExpenseCNN
+from ml_model.load_model import get_model_bundle
+from ml_model.predict import MAX_SEQUENCE_LENGTH, length_buckets, pad_sequences, tokenize
+from ml_model.samples import sample_texts
+
+
+def pad_full(sequences):
+    """Pad every sequence to MAX_SEQUENCE_LENGTH, the previous behaviour"""
+    padded = np.zeros((len(sequences), MAX_SEQUENCE_LENGTH), dtype=np.int64)
+    for row, sequence in enumerate(sequences):
+        padded[row, :len(sequence)] = sequence
+    return padded
+
+
+class Command(BaseCommand):
+    help = 'Check equivalence and benchmark padding modes and model variants for inference'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=500)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--batch-size', type=int, default=64)
+        parser.add_argument('--synthetic', action='store_true', help='Use generated bank SMS only')
+    
+    def forward(self, model, batch, grad_mode=torch.inference_mode):
+        with grad_mode():
+            return torch.softmax(model(torch.from_numpy(batch)), dim=1).numpy()
+    
+    def handle(self, *args, **options):
+        bundle = get_model_bundle()
+        if bundle.trained_model is None:
+            raise CommandError('Compares torch models, run with ML_INFERENCE_BACKEND=torch')
+        if bundle.vectorizer is not None:
+            raise CommandError('Checkpoints with a vectorizer always pad to a fixed length')
+        
+        model = bundle.model
+        sequences = [tokenize(text, bundle.vocab) for text in sample_texts(options['samples'], options['synthetic'])]
+        lengths = [len(sequence) for sequence in sequences]
+        batch_size = options['batch_size']
+        
+        self.stdout.write(
+            f"Model {bundle.version}: {len(sequences)} texts, "
+            f"tokens mean {statistics.mean(lengths):.1f}, max {max(lengths)}\n"
+        )
+        
+        # Equivalence against padding to MAX_SEQUENCE_LENGTH
+        reference = np.concatenate([self.forward(model, pad_full([seq])) for seq in sequences])
+        single = np.concatenate([self.forward(model, pad_sequences([seq])) for seq in sequences])
+        
+        bucketed = np.zeros_like(reference)
+        for bucket in length_buckets(sequences, batch_size):
+            bucketed[bucket] = self.forward(model, pad_sequences([sequences[idx] for idx in bucket]))
+        
+        for label, probs in (('single text', single), ('length buckets', bucketed)):
+            max_diff = float(np.abs(probs - reference).max())
+            same = int((probs.argmax(axis=1) == reference.argmax(axis=1)).sum())
+            style = self.style.SUCCESS if max_diff < 1e-5 and same == len(sequences) else self.style.ERROR
+            self.stdout.write(style(
+                f"{label:<16} max |p - p100| {max_diff:.2e}, same category {same}/{len(sequences)}"
+            ))
+        
+        # Single-text latency, as served per request
+        self.stdout.write('\nSingle text latency')
+        for label, pad in (('padded to 100', pad_full), ('variable length', pad_sequences)):
+            latencies = []
+            for _ in range(options['repeat']):
+                for sequence in sequences:
+                    start = time.perf_counter()
+                    self.forward(model, pad([sequence]))
+                    latencies.append((time.perf_counter() - start) * 1000)
+            latencies.sort()
+            self.stdout.write(
+                f"  {label:<16} p50 {statistics.median(latencies):.3f} ms  "
+                f"p99 {latencies[int(len(latencies) * 0.99)]:.3f} ms"
+            )
+        
+        # Bulk throughput, as in the inference server and backfills
+        self.stdout.write(f"\nBulk throughput, batches of {batch_size}")
+        in_order = [list(range(start, min(start + batch_size, len(sequences))))
+                    for start in range(0, len(sequences), batch_size)]
+        for label, batches, pad in (
+            ('padded to 100', in_order, pad_full),
+            ('padded per batch', in_order, pad_sequences),
+            ('length buckets', length_buckets(sequences, batch_size), pad_sequences),
+        ):
+            start = time.perf_counter()
+            for _ in range(options['repeat']):
+                for batch in batches:
+                    self.forward(model, pad([sequences[idx] for idx in batch]))
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f"  {label:<16} {len(sequences) * options['repeat'] / elapsed:9.0f} texts/s")
+        
+        # Model variants, each step adding one change on top of the previous
+        fused = InferenceExpenseCNN.from_trained(bundle.trained_model)
+        if fused is None:
+            self.stdout.write('\nConv branches have different input sizes, no merged variant')
+            return
+        
+        variants = (
+            ('trained, no_grad', bundle.trained_model, torch.no_grad),
+            ('+ inference_mode', bundle.trained_model, torch.inference_mode),
+            ('+ merged convs', fused, torch.inference_mode),
+        )
+        buckets = length_buckets(sequences, batch_size)
+        reference = None
+        
+        self.stdout.write('\nModel variants (variable length)')
+        for label, variant, grad_mode in variants:
+            probs = np.concatenate([self.forward(variant, pad_sequences([seq]), grad_mode) for seq in sequences])
+            if reference is None:
+                reference = probs
+            max_diff = float(np.abs(probs - reference).max())
+            
+            latencies = []
+            for _ in range(options['repeat']):
+                for sequence in sequences:
+                    start = time.perf_counter()
+                    self.forward(variant, pad_sequences([sequence]), grad_mode)
+                    latencies.append((time.perf_counter() - start) * 1000)
+            
+            start = time.perf_counter()
+            for _ in range(options['repeat']):
+                for bucket in buckets:
+                    self.forward(variant, pad_sequences([sequences[idx] for idx in bucket]), grad_mode)
+            throughput = len(sequences) * options['repeat'] / (time.perf_counter() - start)
+            
+            self.stdout.write(
+                f"  {label:<18} p50 {statistics.median(latencies):.3f} ms  "
+                f"{throughput:9.0f} texts/s  max |p - p_trained| {max_diff:.1e}"
+            )
@@ -0,0 +1,200 @@
+"""
+Compare inference backends: installed runtime size, import time, memory,
+model load time, per-request latency, throughput and probability parity
+
+Each backend runs in a fresh `manage.py compare_backends --child` process
+with ML_INFERENCE_BACKEND set, so memory and loaded modules are its own.
+Backends other than torch need an export (manage.py export_model) first.
+
+Usage:
+    python manage.py compare_backends [--backends torch onnx numpy] [--samples 300] [--repeat 3]
+"""
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from importlib import metadata
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ml_model.backends import BACKENDS, get_backend_name
+from ml_model.load_model import build_bundle, get_export_path, get_serving_path
+from ml_model.predict import run_model
+from ml_model.samples import sample_texts
+
+# Module each backend imports, and the distribution providing it
+RUNTIMES = {
+    'torch': ('torch', 'torch'),
+    'onnx': ('onnxruntime', 'onnxruntime'),
+    'numpy': ('numpy', 'numpy'),
+}
+
+# Already required by the web app, so not counted against a runtime
+SHARED_DISTRIBUTIONS = {'numpy', 'django'}
+
+
+def installed_size(name, seen):
+    """Bytes installed by a distribution and its requirements not yet in seen"""
+    from packaging.requirements import Requirement
+    
+    key = name.lower().replace('_', '-')
+    if key in seen:
+        return 0
+    seen.add(key)
+    
+    try:
+        dist = metadata.distribution(name)
+    except metadata.PackageNotFoundError:
+        return 0
+    
+    size = sum(f.size or 0 for f in dist.files or [])
+    for requirement in map(Requirement, dist.requires or []):
+        if requirement.marker is None or requirement.marker.evaluate({'extra': ''}):
+            size += installed_size(requirement.name, seen)
+    return size
+
+
+def peak_rss_mb():
+    """
+    Peak resident memory of this process
+    ru_maxrss survives exec on Linux, so a child would report its parent's
+    peak; VmHWM in /proc is per address space
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def import_seconds(module):
+    """Time to import a module in a fresh interpreter"""
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    return float(result.stdout.strip()) if result.returncode == 0 else None
+
+
+class Command(BaseCommand):
+    help = 'Compare size, startup, memory, latency and parity of the inference backends'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+        parser.add_argument('--samples', type=int, default=300)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--synthetic', action='store_true', help='Use generated bank SMS only')
+        parser.add_argument('--child', help='Internal: measure the configured backend, saving probabilities here')
+    
+    def measure(self, options):
+        """Runs in the child process, with the model already loaded at startup"""
+        texts = sample_texts(options['samples'], options['synthetic'])
+        
+        start = time.perf_counter()
+        bundle = build_bundle(get_serving_path())
+        load_seconds = time.perf_counter() - start
+        
+        probabilities, _, _ = run_model(texts)
+        np.save(options['child'], np.asarray(probabilities, dtype=np.float32))
+        
+        latencies = []
+        for _ in range(options['repeat']):
+            for text in texts:
+                start = time.perf_counter()
+                run_model([text])
+                latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        
+        start = time.perf_counter()
+        for _ in range(options['repeat']):
+            run_model(texts)
+        throughput = len(texts) * options['repeat'] / (time.perf_counter() - start)
+        
+        return {
+            'backend': bundle.backend.name,
+            'load_seconds': load_seconds,
+            'max_rss_mb': peak_rss_mb(),
+            'torch_imported': 'torch' in sys.modules,
+            'p50_ms': statistics.median(latencies),
+            'p99_ms': latencies[int(len(latencies) * 0.99)],
+            'throughput': throughput,
+        }
+    
+    def run_child(self, backend, options, output):
+        env = dict(
+            os.environ,
+            ML_INFERENCE_BACKEND=backend,
+            ML_INFERENCE_SOCKET='',
+            ML_MODEL_WATCH_INTERVAL='0'
+        )
+        command = [
+            sys.executable, str(settings.BASE_DIR / 'manage.py'), 'compare_backends',
+            '--child', output, '--samples', str(options['samples']), '--repeat', str(options['repeat'])
+        ]
+        if options['synthetic']:
+            command.append('--synthetic')
+        
+        result = subprocess.run(command, env=env, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise CommandError(f"{backend} measurement failed:\n{result.stderr}")
+        
+        # Model loading prints come first, the measurements are the last line
+        return json.loads(result.stdout.strip().splitlines()[-1])
+    
+    def handle(self, *args, **options):
+        if options['child']:
+            self.stdout.write(json.dumps(self.measure(options)))
+            return
+        
+        rows = []
+        reference = None
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for backend in options['backends']:
+                if backend != 'torch' and not get_export_path(backend).exists():
+                    self.stdout.write(self.style.WARNING(
+                        f"Skipping {backend}: run manage.py export_model --format {backend} first"
+                    ))
+                    continue
+                
+                output = os.path.join(tmp_dir, f'{backend}.npy')
+                row = self.run_child(backend, options, output)
+                if row['backend'] != backend:
+                    raise CommandError(f"{backend} child served with {row['backend']}")
+                
+                module, distribution = RUNTIMES[backend]
+                row['import_seconds'] = import_seconds(module)
+                row['runtime_mb'] = installed_size(distribution, set(SHARED_DISTRIBUTIONS)) / 1024 ** 2
+                
+                probabilities = np.load(output)
+                if backend == 'torch':
+                    reference = probabilities
+                row['max_diff'] = (
+                    float(np.abs(probabilities - reference).max()) if reference is not None else None
+                )
+                rows.append(row)
+        
+        self.stdout.write(
+            f"\n{'backend':<8} {'runtime':>9} {'import':>8} {'load':>7} {'max RSS':>8} {'torch':>6} "
+            f"{'p50':>8} {'p99':>8} {'texts/s':>8} {'max |dp|':>9}"
+        )
+        for row in rows:
+            import_time = f"{row['import_seconds']:.2f}s" if row['import_seconds'] is not None else '-'
+            max_diff = f"{row['max_diff']:.1e}" if row['max_diff'] is not None else '-'
+            self.stdout.write(
+                f"{row['backend']:<8} {row['runtime_mb']:>7.0f}MB {import_time:>8} "
+                f"{row['load_seconds']:>6.2f}s {row['max_rss_mb']:>6.0f}MB {'yes' if row['torch_imported'] else 'no':>6} "
+                f"{row['p50_ms']:>6.3f}ms {row['p99_ms']:>6.3f}ms {row['throughput']:>8.0f} {max_diff:>9}"
+            )
+        
+        self.stdout.write(
+            f"\nServing backend: {get_backend_name()}. "
+            "runtime: installed size of the backend's runtime and its dependencies, excluding numpy"
+        )
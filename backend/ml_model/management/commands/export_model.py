@@ -0,0 +1,144 @@
+"""
+Export the torch checkpoint for a backend that serves it without torch
+
+The export is checked against the torch model on sample texts before it
+replaces the previous one, and carries the checkpoint's vocabulary, labels
+and model version. Web workers serving that backend pick it up through
+the usual hot reload.
+
+Formats:
+    onnx: the inference model as an ONNX graph, with the metadata as
+        ONNX metadata properties (ML_INFERENCE_BACKEND=onnx)
+    numpy: the trained weights and conv paddings in an .npz archive, with
+        the metadata as a JSON string array (ML_INFERENCE_BACKEND=numpy)
+
+Usage:
+    python manage.py export_model [--format onnx|numpy] [--output path] [--opset 17]
+        [--samples 200] [--tolerance 1e-4]
+"""
+import inspect
+import io
+import json
+import os
+
+import numpy as np
+import torch
+from django.core.management.base import BaseCommand, CommandError
+
+from ml_model.backends import CONV_LAYERS, EXPORT_SUFFIXES
+from ml_model.load_model import build_bundle, build_model_bundle, export_metadata, get_export_path, get_model_path
+from ml_model.predict import length_buckets, pad_sequences, tokenize
+from ml_model.samples import sample_texts
+
+
+class Command(BaseCommand):
+    help = 'Export the model checkpoint for a torch-free inference backend and check parity'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=sorted(EXPORT_SUFFIXES), default='onnx')
+        parser.add_argument('--output', help='Defaults to the checkpoint path with the format suffix')
+        parser.add_argument('--opset', type=int, default=17)
+        parser.add_argument('--samples', type=int, default=200, help='Texts used for the parity check')
+        parser.add_argument('--tolerance', type=float, default=1e-4, help='Largest allowed probability difference')
+    
+    def export_onnx(self, bundle, options):
+        import onnx
+        
+        # torch >= 2.5 defaults to the dynamo exporter, which needs onnxscript
+        kwargs = {'dynamo': False} if 'dynamo' in inspect.signature(torch.onnx.export).parameters else {}
+        
+        buffer = io.BytesIO()
+        torch.onnx.export(
+            bundle.model,
+            (torch.zeros((1, 16), dtype=torch.long),),
+            buffer,
+            input_names=['tokens'],
+            output_names=['logits'],
+            dynamic_axes={'tokens': {0: 'batch', 1: 'length'}, 'logits': {0: 'batch'}},
+            opset_version=options['opset'],
+            **kwargs
+        )
+        
+        model = onnx.load_from_string(buffer.getvalue())
+        for key, value in export_metadata(bundle).items():
+            entry = model.metadata_props.add()
+            entry.key = key
+            entry.value = value
+        onnx.checker.check_model(model)
+        
+        return model.SerializeToString()
+    
+    def export_numpy(self, bundle, options):
+        model = bundle.trained_model
+        arrays = {key: value.numpy() for key, value in model.state_dict().items()}
+        for layer in CONV_LAYERS:
+            arrays[f'{layer}.padding'] = np.array(getattr(model, layer).padding[0])
+        
+        buffer = io.BytesIO()
+        np.savez(buffer, metadata=np.array(json.dumps(export_metadata(bundle))), **arrays)
+        return buffer.getvalue()
+    
+    def check_parity(self, bundle, exported, count):
+        """
+        Returns:
+            tuple: (max probability difference, texts with the same category, texts compared)
+        """
+        sequences = [tokenize(text, bundle.vocab) for text in sample_texts(count)]
+        max_diff, same = 0.0, 0
+        
+        # Single texts as served per request, then length buckets as in bulk
+        batches = [[idx] for idx in range(len(sequences))] + length_buckets(sequences, 64)
+        for batch in batches:
+            padded = pad_sequences([sequences[idx] for idx in batch])
+            with torch.inference_mode():
+                expected = torch.softmax(bundle.trained_model(torch.from_numpy(padded)), dim=1).numpy()
+            actual = exported.backend.predict_proba(padded)
+            
+            max_diff = max(max_diff, float(np.abs(actual - expected).max()))
+            same += int((actual.argmax(axis=1) == expected.argmax(axis=1)).sum())
+        
+        return max_diff, same, 2 * len(sequences)
+    
+    def handle(self, *args, **options):
+        fmt = options['format']
+        model_path = get_model_path()
+        
+        if not model_path.exists():
+            raise CommandError(f"No checkpoint at {model_path}, train the model first")
+        
+        bundle = build_model_bundle(model_path)
+        if bundle.vectorizer is not None:
+            raise CommandError('Checkpoints with a vectorizer can only be served with torch')
+        
+        output = options['output'] or str(get_export_path(fmt))
+        if not output.endswith(EXPORT_SUFFIXES[fmt]):
+            raise CommandError(f"--output must end with {EXPORT_SUFFIXES[fmt]}")
+        
+        data = getattr(self, f'export_{fmt}')(bundle, options)
+        
+        # Load the export through the serving path before it replaces the old one
+        tmp_path = f"{output[:-len(EXPORT_SUFFIXES[fmt])]}.tmp{EXPORT_SUFFIXES[fmt]}"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        
+        try:
+            exported = build_bundle(tmp_path)
+            max_diff, same, total = self.check_parity(bundle, exported, options['samples'])
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        
+        self.stdout.write(
+            f"Parity over {total} predictions (single and batched): "
+            f"max |p - p_torch| {max_diff:.2e}, same category {same}/{total}"
+        )
+        
+        if max_diff > options['tolerance'] or same != total:
+            os.unlink(tmp_path)
+            raise CommandError(f"Export differs from the torch model, {output} left unchanged")
+        
+        os.replace(tmp_path, output)
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Model {bundle.version} exported to {output} ({len(data) / 1024:.0f} KB)"
+        ))
@@ -0,0 +1,197 @@
+"""
+Fine-tune the active checkpoint on users' category corrections
+
+Corrections are streamed from the database in id-ordered chunks, so memory
+stays flat however many have accumulated. Each chunk is shuffled and
+trained on in minibatches. The result is saved as a new versioned
+checkpoint and made active (workers hot reload it), and ONNX/NumPy exports
+next to the checkpoint are refreshed.
+
+The checkpoint's vocabulary and classes are kept: words it doesn't know map
+to id 0 as in training, and corrections to a category without a class are
+skipped. Every --holdout-every'th correction is only used to measure
+accuracy before and after.
+
+Usage:
+    python manage.py finetune_model [--epochs 3] [--lr 1e-4] [--batch-size 32]
+        [--chunk-size 1000] [--since 2024-01-01] [--min-corrections 50]
+        [--holdout-every 10] [--no-activate]
+"""
+import random
+
+import numpy as np
+import torch
+import torch.nn as nn
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from ml_model.backends import EXPORT_SUFFIXES
+from ml_model.checkpoints import new_model_version, save_checkpoint
+from ml_model.load_model import build_model_bundle, get_export_path, get_model_path
+from ml_model.models import CategoryCorrection
+from ml_model.predict import pad_sequences, preprocess_sms_text, tokenize
+
+
+class Command(BaseCommand):
+    help = 'Fine-tune the model checkpoint on recorded category corrections'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--epochs', type=int, default=3)
+        parser.add_argument('--lr', type=float, default=1e-4)
+        parser.add_argument('--batch-size', type=int, default=32)
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Corrections read per query')
+        parser.add_argument('--since', help='Only corrections updated on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--min-corrections', type=int, default=50)
+        parser.add_argument(
+            '--holdout-every',
+            type=int,
+            default=10,
+            help='Hold out every Nth correction for evaluation (0 = train on all)'
+        )
+        parser.add_argument('--no-activate', action='store_true', help='Save the checkpoint without serving it')
+    
+    def chunks(self, queryset, chunk_size):
+        """Yield lists of (id, sms text, category) in id order, one query per chunk"""
+        cursor_id = 0
+        while True:
+            rows = list(queryset.filter(id__gt=cursor_id)[:chunk_size])
+            if not rows:
+                return
+            cursor_id = rows[-1][0]
+            yield rows
+    
+    def batches(self, queryset, options, vocab, label_index, holdout, rng=None):
+        """
+        Yield (token array, label array) minibatches from the training or
+        holdout corrections, shuffled within each chunk when rng is given
+        """
+        every = options['holdout_every']
+        
+        for rows in self.chunks(queryset, options['chunk_size']):
+            examples = [
+                (tokenize(preprocess_sms_text(text), vocab), label_index[category])
+                for correction_id, text, category in rows
+                if not every or (correction_id % every == 0) == holdout
+            ]
+            if rng is not None:
+                rng.shuffle(examples)
+            
+            for start in range(0, len(examples), options['batch_size']):
+                batch = examples[start:start + options['batch_size']]
+                yield pad_sequences([sequence for sequence, _ in batch]), np.array([label for _, label in batch])
+    
+    def evaluate(self, model, batches):
+        """
+        Returns:
+            tuple: (accuracy or None without examples, examples seen)
+        """
+        model.eval()
+        correct = total = 0
+        
+        with torch.no_grad():
+            for tokens, labels in batches:
+                predicted = model(torch.from_numpy(tokens)).argmax(dim=1).numpy()
+                correct += int((predicted == labels).sum())
+                total += len(labels)
+        
+        return (correct / total if total else None), total
+    
+    def handle(self, *args, **options):
+        model_path = get_model_path()
+        if not model_path.exists():
+            raise CommandError(f"No checkpoint at {model_path}, train the model first")
+        
+        bundle = build_model_bundle(model_path)
+        if bundle.vectorizer is not None or bundle.vocab is None:
+            raise CommandError('Fine-tuning needs a checkpoint with a vocabulary')
+        
+        label_encoder = {int(idx): str(name) for idx, name in bundle.label_encoder.items()}
+        label_index = {name: idx for idx, name in label_encoder.items()}
+        
+        corrections = CategoryCorrection.objects.all()
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError('--since must be YYYY-MM-DD')
+            corrections = corrections.filter(updated_at__date__gte=since)
+        
+        total = corrections.count()
+        corrections = corrections.filter(corrected_category__in=label_index)
+        usable = corrections.count()
+        
+        self.stdout.write(
+            f"Model {bundle.version}: {usable} usable corrections "
+            f"({total - usable} to categories the model has no class for)"
+        )
+        if usable < options['min_corrections']:
+            raise CommandError(f"Fewer than --min-corrections {options['min_corrections']} corrections")
+        
+        queryset = corrections.order_by('id').values_list('id', 'sms_text', 'corrected_category')
+        vocab = bundle.vocab
+        model = bundle.trained_model
+        
+        def holdout_batches():
+            return self.batches(queryset, options, vocab, label_index, holdout=True)
+        
+        accuracy_before, holdout_size = self.evaluate(model, holdout_batches())
+        
+        criterion = nn.CrossEntropyLoss()
+        optimizer = torch.optim.Adam(model.parameters(), lr=options['lr'])
+        rng = random.Random(0)
+        trained_on = 0
+        
+        for epoch in range(options['epochs']):
+            model.train()
+            epoch_loss = 0.0
+            trained_on = 0
+            
+            for tokens, labels in self.batches(queryset, options, vocab, label_index, holdout=False, rng=rng):
+                outputs = model(torch.from_numpy(tokens))
+                loss = criterion(outputs, torch.from_numpy(labels))
+                
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+                
+                epoch_loss += loss.item() * len(labels)
+                trained_on += len(labels)
+            
+            self.stdout.write(
+                f"Epoch [{epoch + 1}/{options['epochs']}] - Loss: {epoch_loss / max(trained_on, 1):.4f} "
+                f"on {trained_on} corrections"
+            )
+        
+        accuracy_after, _ = self.evaluate(model, holdout_batches())
+        if accuracy_before is not None:
+            self.stdout.write(
+                f"Holdout accuracy on {holdout_size} corrections: "
+                f"{accuracy_before:.2%} -> {accuracy_after:.2%}"
+            )
+        
+        model_version = new_model_version()
+        versioned_path = save_checkpoint({
+            'model_state_dict': model.state_dict(),
+            'vocab': vocab,
+            'label_encoder': label_encoder,
+            'vocab_size': model.embedding.num_embeddings,
+            'embedding_dim': model.embedding.embedding_dim,
+            'num_classes': model.fc2.out_features,
+            'model_version': model_version,
+            'parent_version': bundle.version,
+            'finetuned_on': trained_on,
+        }, model_path, activate=not options['no_activate'])
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Model {model_version} fine-tuned from {bundle.version} saved to {versioned_path}"
+        ))
+        
+        if options['no_activate']:
+            return
+        
+        self.stdout.write(f"✓ Active model: {model_path}")
+        
+        # Exports of the previous model would otherwise keep being served
+        for fmt in EXPORT_SUFFIXES:
+            if get_export_path(fmt).exists():
+                call_command('export_model', format=fmt, stdout=self.stdout, stderr=self.stderr)
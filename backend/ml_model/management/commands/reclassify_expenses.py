@@ -0,0 +1,216 @@
+"""
+Reclassify historical expenses from their SMS text after a model update
+
+Expenses are read in id-ordered chunks and classified by a pool of worker
+processes, each loading the model once. Every expense gets the new
+predicted_category and prediction_model_version; its category is only
+replaced while it is still the previous prediction, never when the user
+typed it in or corrected it. Progress is reported per
+chunk, and the last written id can be passed back with --after-id (or kept
+in --state-file) to resume an interrupted run.
+
+Usage:
+    python manage.py reclassify_expenses [--workers 4] [--chunk-size 1000]
+        [--after-id 0] [--state-file reclassify.state] [--min-confidence 0.5] [--dry-run]
+"""
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.utils import timezone
+
+from expenses.models import Expense
+from ml_model.backfill import classify_chunk, init_worker
+
+
+def chunk_queryset():
+    """Expenses with SMS text, in id order, with the fields plan_updates reads"""
+    return (
+        Expense.objects.filter(sms_raw_text__isnull=False)
+        .exclude(sms_raw_text='')
+        .order_by('id')
+        .values(
+            'id', 'sms_raw_text', 'category', 'predicted_category',
+            'prediction_model_version', 'category_correction'
+        )
+    )
+
+
+def plan_updates(chunk, results, min_confidence=0.0):
+    """
+    Decide what to write for one classified chunk
+    
+    Every expense gets the new predicted_category and model version. The
+    category is only replaced while it is still the model's own suggestion:
+    categories users typed in or corrected are ground truth.
+    
+    Args:
+        chunk (dict): expense id -> row from chunk_queryset
+        results (list): (expense id, category, confidence, model version) from classify_chunk
+    
+    Returns:
+        tuple: (Expense list to recategorize, Expense list with only new predictions)
+    """
+    valid_categories = {code for code, _ in Expense.CATEGORY_CHOICES}
+    updates, prediction_updates = [], []
+    now = timezone.now()
+    
+    for expense_id, category, confidence, model_version in results:
+        if category not in valid_categories:
+            continue
+        row = chunk[expense_id]
+        expense = Expense(
+            id=expense_id,
+            category=category,
+            predicted_category=category,
+            prediction_model_version=model_version,
+            updated_at=now
+        )
+        
+        model_assigned = row['category'] == row['predicted_category'] and row['category_correction'] is None
+        if model_assigned and category != row['category'] and confidence >= min_confidence:
+            updates.append(expense)
+        elif (category, model_version) != (row['predicted_category'], row['prediction_model_version']):
+            prediction_updates.append(expense)
+    
+    return updates, prediction_updates
+
+
+def write_updates(updates, prediction_updates):
+    """Save the lists returned by plan_updates"""
+    if updates:
+        Expense.objects.bulk_update(
+            updates,
+            ['category', 'predicted_category', 'prediction_model_version', 'updated_at'],
+            batch_size=500
+        )
+    if prediction_updates:
+        Expense.objects.bulk_update(
+            prediction_updates,
+            ['predicted_category', 'prediction_model_version'],
+            batch_size=500
+        )
+
+
+class Command(BaseCommand):
+    help = 'Reclassify expense categories from SMS text in parallel worker processes'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--after-id', type=int, default=None, help='Resume after this expense id')
+        parser.add_argument('--state-file', help='File recording the last processed id, for resuming')
+        parser.add_argument(
+            '--min-confidence',
+            type=float,
+            default=0.0,
+            help='Only overwrite a category when the model is at least this confident'
+        )
+        parser.add_argument('--torch-threads', type=int, default=1)
+        parser.add_argument('--dry-run', action='store_true', help='Classify without saving')
+    
+    def read_state(self, state_file):
+        if state_file and os.path.exists(state_file):
+            with open(state_file) as f:
+                return int(f.read().strip() or 0)
+        return 0
+    
+    def write_state(self, state_file, last_id):
+        if state_file:
+            tmp_path = f"{state_file}.tmp"
+            with open(tmp_path, 'w') as f:
+                f.write(str(last_id))
+            os.replace(tmp_path, state_file)
+    
+    def submit(self, pool, chunk):
+        rows = [(expense_id, row['sms_raw_text']) for expense_id, row in chunk.items()]
+        return pool.submit(classify_chunk, rows), chunk
+    
+    def handle(self, *args, **options):
+        workers = options['workers']
+        chunk_size = options['chunk_size']
+        state_file = options['state_file']
+        min_confidence = options['min_confidence']
+        dry_run = options['dry_run']
+        
+        after_id = options['after_id']
+        if after_id is None:
+            after_id = self.read_state(state_file)
+        
+        expenses = chunk_queryset()
+        
+        # Worker processes must not inherit this process' open connections
+        connections.close_all()
+        
+        self.stdout.write(
+            f"Reclassifying expenses after id {after_id} "
+            f"with {workers} workers, {chunk_size} per chunk{' (dry run)' if dry_run else ''}"
+        )
+        
+        processed = changed = 0
+        last_id = after_id
+        started = time.perf_counter()
+        
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context('spawn'),
+            initializer=init_worker,
+            initargs=(options['torch_threads'],)
+        )
+        
+        # Chunks in flight, oldest first; results are written in id order so
+        # the saved last id never skips an unwritten chunk
+        pending = deque()
+        
+        def write_oldest():
+            nonlocal processed, changed, last_id
+            
+            future, current = pending.popleft()
+            updates, prediction_updates = plan_updates(current, future.result(), min_confidence)
+            if not dry_run:
+                write_updates(updates, prediction_updates)
+            
+            processed += len(current)
+            changed += len(updates)
+            last_id = max(current)
+            if not dry_run:
+                self.write_state(state_file, last_id)
+            
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"  {processed} processed, {changed} changed, "
+                f"{processed / elapsed:.0f} expenses/s, last id {last_id}"
+            )
+        
+        try:
+            # Keyset pagination by id: mysqlclient buffers whole result sets, so a
+            # single .iterator() over every expense would still load them all
+            cursor_id = after_id
+            while True:
+                chunk = {row['id']: row for row in expenses.filter(id__gt=cursor_id)[:chunk_size]}
+                if not chunk:
+                    break
+                cursor_id = max(chunk)
+                
+                pending.append(self.submit(pool, chunk))
+                if len(pending) >= workers * 2:
+                    write_oldest()
+            
+            while pending:
+                write_oldest()
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING(f"\nInterrupted, resume with --after-id {last_id}"))
+            pool.shutdown(wait=False, cancel_futures=True)
+            return
+        
+        pool.shutdown()
+        
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Reclassified {processed} expenses in {elapsed:.1f}s "
+            f"({processed / elapsed if elapsed else 0:.0f}/s), {changed} categories changed"
+        ))
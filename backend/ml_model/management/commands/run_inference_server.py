@@ -0,0 +1,63 @@
+"""
+Serve the expense CNN to web workers over a Unix domain socket
+
+Web workers use it when ML_INFERENCE_SOCKET points at the same path,
+so torch and the model only live in this process.
+
+Usage:
+    python manage.py run_inference_server [--socket /run/expensesense/inference.sock]
+        [--batch-size 32] [--batch-wait-ms 2]
+"""
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ml_model.inference_server import Batcher, InferenceServer
+from ml_model.load_model import get_model_bundle, start_model_reloader
+
+
+class Command(BaseCommand):
+    help = 'Run the batching model inference server on a Unix socket'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--socket', default=getattr(settings, 'ML_INFERENCE_SOCKET', ''))
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=getattr(settings, 'ML_INFERENCE_BATCH_SIZE', 32)
+        )
+        parser.add_argument(
+            '--batch-wait-ms',
+            type=float,
+            default=getattr(settings, 'ML_INFERENCE_BATCH_WAIT_MS', 2),
+            help='How long a batch waits for more texts after the first arrives'
+        )
+    
+    def handle(self, *args, **options):
+        path = options['socket']
+        if not path:
+            raise CommandError('Pass --socket or set ML_INFERENCE_SOCKET')
+        
+        bundle = get_model_bundle()
+        
+        # Hot reload on SIGHUP or checkpoint change, same as web workers
+        start_model_reloader()
+        
+        batcher = Batcher(options['batch_size'], options['batch_wait_ms'] / 1000)
+        threading.Thread(target=batcher.run, name='inference-batcher', daemon=True).start()
+        
+        server = InferenceServer(path, batcher)
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Inference server for model {bundle.version} listening on {path} "
+            f"(batch size {options['batch_size']}, wait {options['batch_wait_ms']} ms)"
+        ))
+        
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Served {batcher.items} predictions in {batcher.batches} batches")
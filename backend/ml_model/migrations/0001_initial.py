@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassificationReview',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sms_text', models.TextField()),
+                ('predicted_category', models.CharField(max_length=50)),
+                ('confidence', models.FloatField()),
+                ('served_category', models.CharField(choices=[('food', 'Food & Dining'), ('transport', 'Transportation'), ('shopping', 'Shopping'), ('entertainment', 'Entertainment'), ('bills', 'Bills & Utilities'), ('healthcare', 'Healthcare'), ('education', 'Education'), ('groceries', 'Groceries'), ('travel', 'Travel'), ('other', 'Other')], max_length=50)),
+                ('outcome', models.CharField(choices=[('keyword', 'Answered by keyword rule'), ('abstain', 'Abstained')], max_length=20)),
+                ('model_version', models.CharField(blank=True, max_length=64)),
+                ('reviewed_category', models.CharField(blank=True, choices=[('food', 'Food & Dining'), ('transport', 'Transportation'), ('shopping', 'Shopping'), ('entertainment', 'Entertainment'), ('bills', 'Bills & Utilities'), ('healthcare', 'Healthcare'), ('education', 'Education'), ('groceries', 'Groceries'), ('travel', 'Travel'), ('other', 'Other')], help_text='Correct category, set by a reviewer', max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Classification Review',
+                'verbose_name_plural': 'Classification Reviews',
+                'db_table': 'classification_reviews',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['reviewed_at', '-created_at'], name='classificat_reviewe_aed4ff_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:46
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('expenses', '0005_expense_prediction'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('ml_model', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryCorrection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sms_text', models.TextField()),
+                ('predicted_category', models.CharField(choices=[('food', 'Food & Dining'), ('transport', 'Transportation'), ('shopping', 'Shopping'), ('entertainment', 'Entertainment'), ('bills', 'Bills & Utilities'), ('healthcare', 'Healthcare'), ('education', 'Education'), ('groceries', 'Groceries'), ('travel', 'Travel'), ('other', 'Other')], max_length=50)),
+                ('corrected_category', models.CharField(choices=[('food', 'Food & Dining'), ('transport', 'Transportation'), ('shopping', 'Shopping'), ('entertainment', 'Entertainment'), ('bills', 'Bills & Utilities'), ('healthcare', 'Healthcare'), ('education', 'Education'), ('groceries', 'Groceries'), ('travel', 'Travel'), ('other', 'Other')], max_length=50)),
+                ('model_version', models.CharField(blank=True, max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expense', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='category_correction', to='expenses.expense')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_corrections', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Category Correction',
+                'verbose_name_plural': 'Category Corrections',
+                'db_table': 'category_corrections',
+                'ordering': ['-updated_at'],
+                'indexes': [models.Index(fields=['updated_at'], name='category_co_updated_3bb724_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.db import models
+
+from expenses.models import Expense
+
+
+class ClassificationReview(models.Model):
+    """
+    Low-confidence model prediction queued for manual review
+    Written in batches by ml_model.review, see ML_CONFIDENCE_THRESHOLD
+    """
+    
+    OUTCOME_CHOICES = [
+        ('keyword', 'Answered by keyword rule'),
+        ('abstain', 'Abstained'),
+    ]
+    
+    sms_text = models.TextField()
+    predicted_category = models.CharField(max_length=50)
+    confidence = models.FloatField()
+    served_category = models.CharField(max_length=50, choices=Expense.CATEGORY_CHOICES)
+    outcome = models.CharField(max_length=20, choices=OUTCOME_CHOICES)
+    model_version = models.CharField(max_length=64, blank=True)
+    reviewed_category = models.CharField(
+        max_length=50,
+        choices=Expense.CATEGORY_CHOICES,
+        blank=True,
+        help_text='Correct category, set by a reviewer'
+    )
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    reviewed_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        db_table = 'classification_reviews'
+        verbose_name = 'Classification Review'
+        verbose_name_plural = 'Classification Reviews'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['reviewed_at', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.predicted_category} ({self.confidence:.2f}) -> {self.served_category}"
+
+
+class CategoryCorrection(models.Model):
+    """
+    Category a user saved instead of the model's suggestion
+    One row per expense holding its latest category, used by
+    manage.py finetune_model
+    """
+    
+    expense = models.OneToOneField(
+        Expense,
+        on_delete=models.SET_NULL,
+        related_name='category_correction',
+        blank=True,
+        null=True
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='category_corrections'
+    )
+    sms_text = models.TextField()
+    predicted_category = models.CharField(max_length=50, choices=Expense.CATEGORY_CHOICES)
+    corrected_category = models.CharField(max_length=50, choices=Expense.CATEGORY_CHOICES)
+    model_version = models.CharField(max_length=64, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'category_corrections'
+        verbose_name = 'Category Correction'
+        verbose_name_plural = 'Category Corrections'
+        ordering = ['-updated_at']
+        indexes = [
+            models.Index(fields=['updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.predicted_category} -> {self.corrected_category}"
@@ -1,10 +1,11 @@
 """
 Prediction Module for Expense Classification
 """
-import torch
 import re
 import numpy as np
-from .load_model import get_loaded_model
+from django.conf import settings
+from .review import queue_review
+from .rules import lookup_keyword_category, lookup_merchant_category, record_classification
 
 
 def preprocess_sms_text(text):
@@ -26,97 +27,263 @@ def preprocess_sms_text(text):
     return text
 
 
-def text_to_sequence(text, vectorizer=None, max_length=100):
+# Longest sequence the model was trained on
+MAX_SEQUENCE_LENGTH = 100
+
+# Padding positions kept after the last token. The padding token's
+# embedding isn't zero in trained checkpoints, so every kind of conv window
+# seen with 100-token padding must still occur: tokens followed by padding,
+# padding only (5 positions for the kernel 5 branch) and padding running into
+# the conv's implicit zeros. Global max pooling then sees the same values
+SEQUENCE_PAD_MARGIN = 5
+
+
+def tokenize(text, vocab=None, max_length=MAX_SEQUENCE_LENGTH):
+    """
+    Convert text to an unpadded list of token ids
+    Words missing from the training vocabulary map to 0 like in training
+    """
+    words = text.split()[:max_length]
+    
+    if vocab is None:
+        # Checkpoints saved without a vocabulary: ids only distinguish the
+        # words within this text
+        vocab = {word: idx + 1 for idx, word in enumerate(dict.fromkeys(words))}
+    
+    return [vocab.get(word, 0) for word in words]
+
+
+def pad_sequences(sequences, max_length=MAX_SEQUENCE_LENGTH):
     """
-    Convert text to sequence of integers
-    This is a simple tokenizer - in production, use the trained vectorizer
+    Pad token id lists into one int64 array
+    
+    Pads to the longest sequence plus SEQUENCE_PAD_MARGIN rather than to
+    max_length; model outputs are the same, with far fewer conv positions
+    for typical 15-30 word SMS.
+    """
+    longest = max((len(sequence) for sequence in sequences), default=0)
+    width = min(max_length, longest + SEQUENCE_PAD_MARGIN)
+    
+    padded = np.zeros((len(sequences), width), dtype=np.int64)
+    for row, sequence in enumerate(sequences):
+        padded[row, :len(sequence)] = sequence
+    
+    return padded
+
+
+def text_to_sequence(text, vectorizer=None, max_length=100, vocab=None):
+    """
+    Convert text to a sequence of integers padded to max_length
     """
     if vectorizer is not None:
         # Use trained vectorizer
         return vectorizer.transform([text])
     
-    # Simple word-level tokenization (fallback)
-    words = text.split()
+    sequence = tokenize(text, vocab, max_length)
+    
+    # Pad sequence
+    return np.array([sequence + [0] * (max_length - len(sequence))])
+
+
+def length_buckets(sequences, batch_size):
+    """
+    Split sequence indices into batches of similar length
+    Each batch is padded only to its own longest sequence
+    """
+    order = sorted(range(len(sequences)), key=lambda idx: len(sequences[idx]))
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+def run_model(processed_texts):
+    """
+    Run the CNN in this process on a batch of preprocessed texts
+    The model is loaded on first use, so web workers using the inference
+    server never load it (or its runtime)
+    
+    Returns:
+        tuple: ((texts, classes) float32 array or None if no model, label_encoder, model version)
+    """
+    from .load_model import get_model_bundle
     
-    # Create a simple vocabulary (this should match training)
-    # In production, load the actual vocabulary from training
-    vocab = {word: idx + 1 for idx, word in enumerate(set(words))}
+    # One bundle for the whole batch, even if a reload swaps it meanwhile
+    bundle = get_model_bundle()
     
-    # Convert to sequence
-    sequence = [vocab.get(word, 0) for word in words[:max_length]]
+    if bundle.backend is None:
+        return None, bundle.label_encoder, bundle.version
     
-    # Pad sequence
-    if len(sequence) < max_length:
-        sequence = sequence + [0] * (max_length - len(sequence))
+    if bundle.vectorizer is not None:
+        sequences = np.concatenate([text_to_sequence(text, bundle.vectorizer) for text in processed_texts])
+        probabilities = bundle.backend.predict_proba(sequences.astype(np.int64))
+        return probabilities, bundle.label_encoder, bundle.version
     
-    return np.array([sequence])
+    sequences = [tokenize(text, bundle.vocab) for text in processed_texts]
+    results = np.zeros((len(sequences), bundle.backend.num_classes), dtype=np.float32)
+    
+    for bucket in length_buckets(sequences, getattr(settings, 'ML_INFERENCE_BUCKET_SIZE', 64)):
+        batch = pad_sequences([sequences[idx] for idx in bucket])
+        results[bucket] = bundle.backend.predict_proba(batch)
+    
+    return results, bundle.label_encoder, bundle.version
 
 
-def predict_category(sms_text: str) -> dict:
+def get_probabilities(processed_text):
+    """
+    Class probabilities for one preprocessed text
+    Uses the inference server when ML_INFERENCE_SOCKET is set, falling back
+    to in-process inference if it can't be reached
+    
+    Returns:
+        tuple: (probability array or None, label_encoder, model version)
+    """
+    if getattr(settings, 'ML_INFERENCE_SOCKET', ''):
+        from .inference_server import InferenceUnavailable, get_inference_client
+        
+        try:
+            probabilities, label_encoder, model_version = get_inference_client().predict(processed_text)
+            return np.asarray(probabilities, dtype=np.float32), label_encoder, model_version
+        except InferenceUnavailable:
+            pass
+    
+    probabilities, label_encoder, model_version = run_model([processed_text])
+    return (probabilities[0] if probabilities is not None else None), label_encoder, model_version
+
+
+def top_k_indices(probabilities, k):
+    """
+    Indices of the k largest probabilities, highest first
+    argpartition finds them without sorting every class
+    """
+    if k >= len(probabilities):
+        return np.argsort(probabilities)[::-1]
+    
+    indices = np.argpartition(probabilities, -k)[-k:]
+    return indices[np.argsort(probabilities[indices])[::-1]]
+
+
+def gate_prediction(sms_text, processed_text, category, confidence, model_version):
+    """
+    Fallback for a prediction below ML_CONFIDENCE_THRESHOLD
+    
+    Answers from the keyword rules when they name a single category (and
+    ML_LOW_CONFIDENCE_FALLBACK is 'keyword'), otherwise abstains with
+    'other'. Either way the case is queued for review.
+    
+    Returns:
+        dict: Response fields replacing the model's answer
+    """
+    keyword_category = None
+    if getattr(settings, 'ML_LOW_CONFIDENCE_FALLBACK', 'keyword') == 'keyword':
+        keyword_category = lookup_keyword_category(processed_text)
+    
+    if keyword_category is not None:
+        outcome, fields = 'keyword', {'category': keyword_category, 'source': 'keyword'}
+    else:
+        outcome, fields = 'abstain', {'category': 'other', 'abstain': True}
+    
+    record_classification(outcome)
+    queue_review(
+        sms_text=sms_text,
+        predicted_category=category,
+        confidence=confidence,
+        served_category=fields['category'],
+        outcome=outcome,
+        model_version=model_version or ''
+    )
+    
+    fields['model_category'] = category
+    return fields
+
+
+def predict_category(sms_text: str, top_k: int = None, lite: bool = False) -> dict:
     """
     Predict expense category from SMS text
     
     Args:
         sms_text (str): Raw SMS text
+        top_k (int): Return only the k most likely categories as top_probabilities
+            instead of all_probabilities
+        lite (bool): Leave out all_probabilities and preprocessed_text
     
     Returns:
         dict: {
             'category': predicted category name,
             'confidence': confidence score (0-1),
-            'all_probabilities': dict of all categories with probabilities
+            'all_probabilities': dict of all categories with probabilities,
+            'top_probabilities': dict of the top_k categories, highest first,
+            'preprocessed_text': model input, unless lite,
+            'source': 'rule' or 'keyword' when a rule answered, else 'model',
+            'model_version': version of the model, when it answered,
+            'abstain': True when the model was unsure and no rule applied,
+            'model_category': the model's own guess, when it was overridden
         }
     """
+    # Known merchants skip the model entirely
     try:
-        # Load model
-        model, vectorizer, label_encoder = get_loaded_model()
+        rule_category, merchant_id = lookup_merchant_category(sms_text)
+    except Exception:
+        rule_category, merchant_id = None, None
+    
+    if rule_category is not None:
+        record_classification('rule')
+        return {
+            'category': rule_category,
+            'confidence': 1.0,
+            'source': 'rule',
+            'merchant_id': merchant_id
+        }
+    
+    try:
+        # Preprocess text
+        processed_text = preprocess_sms_text(sms_text)
         
-        if model is None:
+        if not processed_text:
             return {
                 'category': 'other',
                 'confidence': 0.0,
-                'error': 'Model not loaded'
+                'error': 'Empty text after preprocessing'
             }
         
-        # Preprocess text
-        processed_text = preprocess_sms_text(sms_text)
+        probabilities, label_encoder, model_version = get_probabilities(processed_text)
         
-        if not processed_text:
+        if probabilities is None:
             return {
                 'category': 'other',
                 'confidence': 0.0,
-                'error': 'Empty text after preprocessing'
+                'error': 'Model not loaded'
             }
         
-        # Convert to sequence
-        sequence = text_to_sequence(processed_text, vectorizer)
+        record_classification('model')
         
-        # Convert to tensor
-        input_tensor = torch.LongTensor(sequence)
+        predicted_idx = int(probabilities.argmax())
         
-        # Get prediction
-        with torch.no_grad():
-            outputs = model(input_tensor)
-            probabilities = torch.softmax(outputs, dim=1)
-            confidence, predicted_idx = torch.max(probabilities, dim=1)
-            
-            predicted_idx = predicted_idx.item()
-            confidence = confidence.item()
+        result = {
+            'category': label_encoder.get(predicted_idx, 'other'),
+            'confidence': round(float(probabilities[predicted_idx]), 4),
+            'source': 'model',
+            'model_version': model_version
+        }
         
-        # Get category name
-        category = label_encoder.get(predicted_idx, 'other')
+        if result['confidence'] < getattr(settings, 'ML_CONFIDENCE_THRESHOLD', 0.0):
+            result.update(gate_prediction(
+                sms_text, processed_text, result['category'], result['confidence'], model_version
+            ))
         
-        # Get all probabilities
-        all_probs = {}
-        for idx, prob in enumerate(probabilities[0].tolist()):
-            cat_name = label_encoder.get(idx, f'category_{idx}')
-            all_probs[cat_name] = round(prob, 4)
+        if top_k:
+            indices = top_k_indices(probabilities, top_k)
+            result['top_probabilities'] = {
+                label_encoder.get(idx, f'category_{idx}'): prob
+                for idx, prob in zip(indices.tolist(), np.round(probabilities[indices].astype(np.float64), 4).tolist())
+            }
+        elif not lite:
+            result['all_probabilities'] = {
+                label_encoder.get(idx, f'category_{idx}'): prob
+                for idx, prob in enumerate(np.round(probabilities.astype(np.float64), 4).tolist())
+            }
         
-        return {
-            'category': category,
-            'confidence': round(confidence, 4),
-            'all_probabilities': all_probs,
-            'preprocessed_text': processed_text
-        }
+        if not lite:
+            result['preprocessed_text'] = processed_text
+        
+        return result
     
     except Exception as e:
         return {
@@ -126,14 +293,15 @@ def predict_category(sms_text: str) -> dict:
         }
 
 
-def predict_category_batch(sms_texts: list) -> list:
+def predict_category_batch(sms_texts: list, **options) -> list:
     """
     Predict categories for multiple SMS texts
     
     Args:
         sms_texts (list): List of SMS texts
+        **options: top_k / lite, as for predict_category
     
     Returns:
         list: List of prediction dictionaries
     """
-    return [predict_category(text) for text in sms_texts]
+    return [predict_category(text, **options) for text in sms_texts]
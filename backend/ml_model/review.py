@@ -0,0 +1,79 @@
+"""
+Review Queue Module
+Buffers low-confidence predictions and writes them to ClassificationReview
+in batches, so gated requests don't each pay for an INSERT
+"""
+import atexit
+import threading
+import time
+
+from django.conf import settings
+
+# Global buffer of unsaved reviews
+_pending = []
+_pending_since = 0.0
+_pending_lock = threading.Lock()
+_flush_lock = threading.Lock()
+
+
+def queue_review(**fields):
+    """
+    Buffer one ClassificationReview row
+    
+    The buffer is written when a queued row finds it holding
+    ML_REVIEW_BATCH_SIZE rows or its oldest row ML_REVIEW_FLUSH_SECONDS
+    old, and when the process exits.
+    """
+    global _pending_since
+    
+    batch_size = getattr(settings, 'ML_REVIEW_BATCH_SIZE', 50)
+    max_age = getattr(settings, 'ML_REVIEW_FLUSH_SECONDS', 30)
+    
+    with _pending_lock:
+        if not _pending:
+            _pending_since = time.monotonic()
+        _pending.append(fields)
+        due = len(_pending) >= batch_size or time.monotonic() - _pending_since >= max_age
+    
+    if due:
+        flush_reviews()
+
+
+def flush_reviews():
+    """
+    Write buffered reviews with one bulk INSERT
+    
+    Returns:
+        int: Rows written
+    """
+    from .models import ClassificationReview
+    
+    # One writer at a time; rows queued meanwhile go in the next batch
+    with _flush_lock:
+        with _pending_lock:
+            batch = _pending[:]
+            _pending.clear()
+        
+        if not batch:
+            return 0
+        
+        try:
+            ClassificationReview.objects.bulk_create(
+                [ClassificationReview(**fields) for fields in batch],
+                batch_size=500
+            )
+        except Exception as e:
+            # Reviews are best effort, never fail the classification over them
+            print(f"✗ Failed to save {len(batch)} classification reviews: {e}")
+            return 0
+    
+    return len(batch)
+
+
+def pending_review_count():
+    """Reviews buffered in this process and not yet written"""
+    with _pending_lock:
+        return len(_pending)
+
+
+atexit.register(flush_reviews)
@@ -0,0 +1,204 @@
+"""
+Merchant Category Rules Module
+Maps known merchants straight to a category so the CNN can be skipped, and
+keywords to a category for predictions the CNN is unsure about
+"""
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count, F
+
+# Global variables to store the loaded rules
+_rules = None
+_categories = ()
+_rules_loaded_at = 0.0
+_rules_lock = threading.Lock()
+
+# Global keyword -> category index
+_keyword_index = None
+
+# Classification counters for this process
+_stats = {'rule_hits': 0, 'model_calls': 0, 'keyword_hits': 0, 'abstentions': 0}
+_stats_lock = threading.Lock()
+
+# Stats key counted for each classification source
+STAT_KEYS = {
+    'rule': 'rule_hits',
+    'model': 'model_calls',
+    'keyword': 'keyword_hits',
+    'abstain': 'abstentions',
+}
+
+# Keywords consulted when the model's confidence is below
+# ML_CONFIDENCE_THRESHOLD (settings.ML_KEYWORD_RULES replaces this table)
+DEFAULT_KEYWORD_RULES = {
+    'food': ['swiggy', 'zomato', 'restaurant', 'cafe', 'dominos', 'pizza', 'mcdonalds', 'kfc', 'starbucks'],
+    'transport': ['uber', 'ola', 'rapido', 'metro', 'petrol', 'diesel', 'fuel', 'parking', 'fastag'],
+    'shopping': ['amazon', 'flipkart', 'myntra', 'ajio', 'nykaa', 'meesho'],
+    'entertainment': ['netflix', 'hotstar', 'spotify', 'bookmyshow', 'pvr', 'inox'],
+    'bills': ['electricity', 'bescom', 'broadband', 'recharge', 'postpaid', 'dth', 'insurance'],
+    'healthcare': ['pharmacy', 'hospital', 'clinic', 'medplus', 'pharmeasy', 'diagnostics'],
+    'education': ['school', 'college', 'tuition', 'udemy', 'coursera'],
+    'groceries': ['bigbasket', 'blinkit', 'zepto', 'dmart', 'grocery', 'supermarket'],
+    'travel': ['irctc', 'makemytrip', 'goibibo', 'indigo', 'airlines', 'hotel', 'oyo', 'redbus'],
+}
+
+
+def build_merchant_rules():
+    """
+    Build the merchant -> category mapping
+    
+    Explicit Merchant.default_category values win. Otherwise a merchant is
+    mapped when enough of its expenses were saved under one category by
+    their users. Expenses whose category is the model's own suggestion are
+    left out, so a wrong prediction can't become a rule that repeats it.
+    
+    Returns:
+        tuple: (dict of merchant id -> category index, tuple of category names)
+    """
+    from expenses.models import Expense, Merchant
+    
+    min_count = getattr(settings, 'ML_MERCHANT_RULE_MIN_COUNT', 5)
+    min_share = getattr(settings, 'ML_MERCHANT_RULE_MIN_SHARE', 0.9)
+    
+    categories = tuple(code for code, _ in Expense.CATEGORY_CHOICES)
+    category_index = {code: idx for idx, code in enumerate(categories)}
+    
+    # Tally user-chosen categories per merchant: entered without a
+    # suggestion, or corrected from one
+    totals = {}
+    best = {}
+    counts = (
+        Expense.objects.filter(canonical_merchant__isnull=False)
+        .exclude(category=F('predicted_category'))
+        .order_by()
+        .values_list('canonical_merchant', 'category')
+        .annotate(count=Count('id'))
+    )
+    for merchant_id, category, count in counts:
+        totals[merchant_id] = totals.get(merchant_id, 0) + count
+        if count > best.get(merchant_id, (None, 0))[1]:
+            best[merchant_id] = (category, count)
+    
+    rules = {}
+    for merchant_id, (category, count) in best.items():
+        if count >= min_count and count / totals[merchant_id] >= min_share:
+            rules[merchant_id] = category_index[category]
+    
+    explicit = Merchant.objects.exclude(default_category='').values_list('id', 'default_category')
+    for merchant_id, category in explicit:
+        rules[merchant_id] = category_index[category]
+    
+    return rules, categories
+
+
+def get_merchant_rules():
+    """
+    Get the cached rules (singleton pattern)
+    Rebuilt every ML_MERCHANT_RULE_TTL seconds
+    """
+    global _rules, _categories, _rules_loaded_at
+    
+    ttl = getattr(settings, 'ML_MERCHANT_RULE_TTL', 600)
+    
+    if _rules is not None and time.monotonic() - _rules_loaded_at < ttl:
+        return _rules, _categories
+    
+    with _rules_lock:
+        if _rules is None or time.monotonic() - _rules_loaded_at >= ttl:
+            _rules, _categories = build_merchant_rules()
+            _rules_loaded_at = time.monotonic()
+    
+    return _rules, _categories
+
+
+def invalidate_merchant_rules(**kwargs):
+    """Drop the cached rules so they are rebuilt on next lookup"""
+    global _rules
+    _rules = None
+
+
+def lookup_merchant_category(sms_text):
+    """
+    Find the rule category for the merchant mentioned in an SMS
+    
+    Returns:
+        tuple: (category, merchant_id) or (None, None) when no rule applies
+    """
+    from expenses.merchants import resolve_merchant_id
+    
+    merchant_id = resolve_merchant_id(sms_text)
+    if merchant_id is None:
+        return None, None
+    
+    rules, categories = get_merchant_rules()
+    category_idx = rules.get(merchant_id)
+    if category_idx is None:
+        return None, merchant_id
+    
+    return categories[category_idx], merchant_id
+
+
+def get_keyword_index():
+    """Get the keyword -> category index (singleton pattern)"""
+    global _keyword_index
+    
+    if _keyword_index is None:
+        rules = getattr(settings, 'ML_KEYWORD_RULES', None) or DEFAULT_KEYWORD_RULES
+        _keyword_index = {
+            keyword.lower(): category
+            for category, keywords in rules.items()
+            for keyword in keywords
+        }
+    
+    return _keyword_index
+
+
+def lookup_keyword_category(processed_text):
+    """
+    Find the category named by keywords in a preprocessed SMS
+    
+    Returns:
+        str or None: The category, None when no keyword matches or keywords
+        of different categories do
+    """
+    index = get_keyword_index()
+    categories = {index[word] for word in re.findall(r'[a-z0-9]+', processed_text) if word in index}
+    
+    return categories.pop() if len(categories) == 1 else None
+
+
+def record_classification(source):
+    """Count a classification event: 'rule', 'model', 'keyword' or 'abstain'"""
+    with _stats_lock:
+        _stats[STAT_KEYS[source]] += 1
+
+
+def get_classification_stats():
+    """
+    Get classification counters for this process
+    
+    Returns:
+        dict: rule hits, model calls, the fraction that skipped the model,
+        and low-confidence predictions answered by keywords or abstained on
+    """
+    with _stats_lock:
+        rule_hits = _stats['rule_hits']
+        model_calls = _stats['model_calls']
+        keyword_hits = _stats['keyword_hits']
+        abstentions = _stats['abstentions']
+    
+    total = rule_hits + model_calls
+    rules = _rules or {}
+    
+    return {
+        'total': total,
+        'rule_hits': rule_hits,
+        'model_calls': model_calls,
+        'model_skip_ratio': round(rule_hits / total, 4) if total else 0.0,
+        'keyword_hits': keyword_hits,
+        'abstentions': abstentions,
+        'rules_loaded': len(rules),
+    }
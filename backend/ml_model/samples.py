@@ -0,0 +1,42 @@
+"""
+Sample SMS texts for inference benchmarks and export checks
+"""
+import random
+
+from expenses.models import Expense
+from .predict import preprocess_sms_text
+
+# Used when the database has no SMS text to sample
+SAMPLE_TEMPLATES = [
+    "Rs {amount} debited from A/c XX{account} on {day}-10-24 for UPI txn to {merchant} Ref {ref}",
+    "Your A/c XX{account} is debited with INR {amount} on {day}-Oct-24 at {merchant}. Avl Bal INR {balance}",
+    "Spent Rs {amount} at {merchant} using your card ending {account} on {day}/10/24",
+    "Dear customer, INR {amount} has been paid to {merchant} via NetBanking. Txn ID {ref}. Not you? Call 1800",
+    "Paid Rs.{amount} to {merchant}",
+]
+SAMPLE_MERCHANTS = ['SWIGGY', 'UBER INDIA', 'BigBasket', 'Apollo Pharmacy', 'BESCOM', 'PVR Cinemas', 'IRCTC']
+
+
+def sample_texts(count, synthetic=False):
+    """
+    Preprocessed SMS texts from stored expenses, topped up with generated
+    bank SMS when there are fewer than count (or synthetic is set)
+    """
+    texts = [] if synthetic else list(
+        Expense.objects.exclude(sms_raw_text__isnull=True)
+        .exclude(sms_raw_text='')
+        .values_list('sms_raw_text', flat=True)[:count]
+    )
+    
+    rng = random.Random(0)
+    while len(texts) < count:
+        texts.append(rng.choice(SAMPLE_TEMPLATES).format(
+            amount=rng.randint(10, 5000),
+            account=rng.randint(1000, 9999),
+            day=rng.randint(1, 28),
+            merchant=rng.choice(SAMPLE_MERCHANTS),
+            ref=rng.randint(10 ** 9, 10 ** 10),
+            balance=rng.randint(1000, 90000),
+        ))
+    
+    return [preprocess_sms_text(text) for text in texts]
@@ -4,6 +4,8 @@ from rest_framework import serializers
 class ClassifyExpenseSerializer(serializers.Serializer):
     """Serializer for expense classification input"""
     sms_text = serializers.CharField(required=True, max_length=1000)
+    top_k = serializers.IntegerField(required=False, min_value=1, max_value=100)
+    lite = serializers.BooleanField(required=False, default=False)
     
     def validate_sms_text(self, value):
         if not value or not value.strip():
@@ -11,10 +13,21 @@ class ClassifyExpenseSerializer(serializers.Serializer):
         return value.strip()
 
 
+class ReloadModelSerializer(serializers.Serializer):
+    """Serializer for model reload input"""
+    force = serializers.BooleanField(required=False, default=False)
+
+
 class ClassifyExpenseResponseSerializer(serializers.Serializer):
     """Serializer for expense classification response"""
     category = serializers.CharField()
     confidence = serializers.FloatField()
-    all_probabilities = serializers.DictField(child=serializers.FloatField())
+    all_probabilities = serializers.DictField(child=serializers.FloatField(), required=False)
+    top_probabilities = serializers.DictField(child=serializers.FloatField(), required=False)
     preprocessed_text = serializers.CharField(required=False)
+    source = serializers.CharField(required=False)
+    merchant_id = serializers.IntegerField(required=False)
+    model_version = serializers.CharField(required=False)
+    abstain = serializers.BooleanField(required=False)
+    model_category = serializers.CharField(required=False)
     error = serializers.CharField(required=False)
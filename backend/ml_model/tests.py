@@ -0,0 +1,157 @@
+from datetime import datetime, timezone as dt_timezone
+from importlib.util import find_spec
+from unittest import skipUnless
+
+import numpy as np
+import torch
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from expenses.models import Expense
+
+from .backends import NumpyBackend, OnnxBackend, TorchBackend
+from .cnn import ExpenseCNN
+from .load_model import ModelBundle
+from .management.commands.benchmark_inference import pad_full
+from .management.commands.export_model import Command as ExportModelCommand
+from .management.commands.reclassify_expenses import chunk_queryset, plan_updates, write_updates
+from .predict import MAX_SEQUENCE_LENGTH, length_buckets, pad_sequences
+from .training_data import ExpenseSource
+
+
+class ReclassifyBackfillTests(TestCase):
+    """reclassify_expenses decisions, without the worker pool"""
+    
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='backfill@example.com',
+            username='backfill',
+            password='Passw0rd!x'
+        )
+    
+    def create_expense(self, category, predicted_category=''):
+        return Expense.objects.create(
+            user=self.user,
+            amount=100,
+            category=category,
+            predicted_category=predicted_category,
+            prediction_model_version='v1' if predicted_category else '',
+            payment_mode='upi',
+            date=datetime(2026, 10, 1, tzinfo=dt_timezone.utc),
+            sms_raw_text='Rs 100 paid at store'
+        )
+    
+    def backfill(self, category, confidence=0.9):
+        chunk = {row['id']: row for row in chunk_queryset()}
+        results = [(expense_id, category, confidence, 'v2') for expense_id in chunk]
+        write_updates(*plan_updates(chunk, results))
+    
+    def test_only_model_assigned_categories_are_replaced(self):
+        manual = self.create_expense('food')
+        corrected = self.create_expense('bills', predicted_category='travel')
+        suggested = self.create_expense('travel', predicted_category='travel')
+        
+        self.backfill('shopping')
+        
+        for expense in (manual, corrected, suggested):
+            expense.refresh_from_db()
+            self.assertEqual(expense.predicted_category, 'shopping')
+            self.assertEqual(expense.prediction_model_version, 'v2')
+        
+        self.assertEqual(manual.category, 'food')
+        self.assertEqual(corrected.category, 'bills')
+        self.assertEqual(suggested.category, 'shopping')
+
+
+
+class ExpenseSourceTests(TestCase):
+    """Training rows read from the expenses table"""
+    
+    def test_model_assigned_categories_are_left_out(self):
+        user = get_user_model().objects.create_user(
+            email='training@example.com',
+            username='training',
+            password='Passw0rd!x'
+        )
+        for category, predicted_category in (('food', ''), ('bills', 'travel'), ('travel', 'travel')):
+            Expense.objects.create(
+                user=user,
+                amount=100,
+                category=category,
+                predicted_category=predicted_category,
+                payment_mode='upi',
+                date=datetime(2026, 10, 1, tzinfo=dt_timezone.utc),
+                sms_raw_text='Rs 100 paid at store'
+            )
+        
+        categories = sorted(category for _, category in ExpenseSource().rows())
+        
+        self.assertEqual(categories, ['bills', 'food'])
+
+
+def random_model(vocab_size=50, num_classes=5, seed=0):
+    """Small untrained ExpenseCNN in eval mode"""
+    torch.manual_seed(seed)
+    model = ExpenseCNN(vocab_size=vocab_size, embedding_dim=128, num_classes=num_classes)
+    model.eval()
+    return model
+
+
+class VariableLengthPaddingTests(TestCase):
+    """pad_sequences gives the same outputs as padding to MAX_SEQUENCE_LENGTH"""
+    
+    def forward(self, model, batch):
+        with torch.inference_mode():
+            return torch.softmax(model(torch.from_numpy(batch)), dim=1).numpy()
+    
+    def test_matches_full_padding(self):
+        model = random_model()
+        # padding_idx keeps row 0 at zero during training; the equivalence
+        # shouldn't depend on that
+        with torch.no_grad():
+            model.embedding.weight[0].normal_()
+        
+        rng = np.random.default_rng(0)
+        lengths = [0, 1, 2, 5, 17, 30, MAX_SEQUENCE_LENGTH - 3, MAX_SEQUENCE_LENGTH]
+        sequences = [rng.integers(1, 50, size=length).tolist() for length in lengths]
+        
+        reference = np.concatenate([self.forward(model, pad_full([seq])) for seq in sequences])
+        single = np.concatenate([self.forward(model, pad_sequences([seq])) for seq in sequences])
+        
+        bucketed = np.zeros_like(reference)
+        for bucket in length_buckets(sequences, 3):
+            bucketed[bucket] = self.forward(model, pad_sequences([sequences[idx] for idx in bucket]))
+        
+        np.testing.assert_allclose(single, reference, atol=1e-6)
+        np.testing.assert_allclose(bucketed, reference, atol=1e-6)
+
+
+class ExportedBackendParityTests(TestCase):
+    """Exported backends return the torch model's probabilities"""
+    
+    def setUp(self):
+        model = random_model()
+        self.bundle = ModelBundle(TorchBackend(model), None, {idx: str(idx) for idx in range(5)}, version='test')
+        
+        rng = np.random.default_rng(0)
+        sequences = [rng.integers(1, 50, size=length).tolist() for length in (1, 4, 12, 40, MAX_SEQUENCE_LENGTH)]
+        self.batches = [pad_sequences([seq]) for seq in sequences] + [pad_sequences(sequences)]
+    
+    def assert_matches_torch(self, backend, tolerance):
+        for batch in self.batches:
+            with torch.inference_mode():
+                expected = torch.softmax(self.bundle.trained_model(torch.from_numpy(batch)), dim=1).numpy()
+            np.testing.assert_allclose(backend.predict_proba(batch), expected, atol=tolerance)
+    
+    def test_numpy_backend(self):
+        backend = NumpyBackend(ExportModelCommand().export_numpy(self.bundle, {}))
+        
+        self.assertEqual(backend.metadata['model_version'], 'test')
+        self.assert_matches_torch(backend, 1e-6)
+    
+    @skipUnless(find_spec('onnx') and find_spec('onnxruntime'), 'onnx and onnxruntime not installed')
+    def test_onnx_backend(self):
+        backend = OnnxBackend(ExportModelCommand().export_onnx(self.bundle, {'opset': 17}))
+        
+        self.assertEqual(backend.metadata['model_version'], 'test')
+        self.assert_matches_torch(backend, 1e-5)
@@ -4,24 +4,41 @@ Training Script for Expense CNN Model on Apple Silicon (MPS)
 This script trains a CNN model on SMS expense data for category classification.
 It uses PyTorch with MPS (Metal Performance Shaders) acceleration for Apple Silicon.
 
+Training data comes from the built-in samples, the expenses table (labeled
+with the category users saved) or a CSV/Parquet file. It is tokenized once
+into a memory-mapped cache under data_cache/, reused while the data is
+unchanged, and streamed to DataLoader workers.
+
 Usage:
-    python train_model.py
+    python train_model.py [--data sample|db|path.csv|path.parquet]
+        [--text-column sms_text] [--label-column category]
+        [--epochs 50] [--batch-size 16] [--lr 0.001] [--workers 2] [--rebuild-cache]
 
 The trained model will be saved as 'expense_cnn_model.pt'
 """
 
+import argparse
+import os
+import sys
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from torch.utils.data import Dataset, DataLoader
-import numpy as np
-import pandas as pd
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
-from collections import Counter
+from torch.utils.data import DataLoader
 import re
 from pathlib import Path
 
+try:
+    from ml_model.checkpoints import new_model_version, save_checkpoint
+    from ml_model.cnn import ExpenseCNN
+    from ml_model.training_data import ExpenseSource, FileSource, SampleSource, TokenDataset, prepare_cache
+except ImportError:
+    # Run as a script from the ml_model directory
+    from checkpoints import new_model_version, save_checkpoint
+    from cnn import ExpenseCNN
+    from training_data import ExpenseSource, FileSource, SampleSource, TokenDataset, prepare_cache
+
+DATA_CACHE_DIR = Path(__file__).parent / 'data_cache'
+
 
 # Check for MPS (Apple Silicon)
 if torch.backends.mps.is_available():
@@ -35,81 +52,6 @@ else:
     print("✓ Using CPU")
 
 
-class ExpenseCNN(nn.Module):
-    """CNN Model for SMS expense classification"""
-    
-    def __init__(self, vocab_size=10000, embedding_dim=128, num_classes=10, max_length=100):
-        super(ExpenseCNN, self).__init__()
-        
-        self.embedding = nn.Embedding(vocab_size, embedding_dim, padding_idx=0)
-        
-        # Multiple conv layers with different kernel sizes
-        self.conv1 = nn.Conv1d(embedding_dim, 128, kernel_size=3, padding=1)
-        self.conv2 = nn.Conv1d(128, 128, kernel_size=4, padding=1)
-        self.conv3 = nn.Conv1d(128, 128, kernel_size=5, padding=2)
-        
-        self.relu = nn.ReLU()
-        self.dropout = nn.Dropout(0.5)
-        
-        fc_input_size = 128 * 3
-        self.fc1 = nn.Linear(fc_input_size, 64)
-        self.fc2 = nn.Linear(64, num_classes)
-    
-    def forward(self, x):
-        x = self.embedding(x)
-        x = x.permute(0, 2, 1)
-        
-        x1 = self.relu(self.conv1(x))
-        x1 = torch.max(x1, dim=2)[0]
-        
-        x2 = self.relu(self.conv2(x))
-        x2 = torch.max(x2, dim=2)[0]
-        
-        x3 = self.relu(self.conv3(x))
-        x3 = torch.max(x3, dim=2)[0]
-        
-        x = torch.cat([x1, x2, x3], dim=1)
-        x = self.dropout(x)
-        x = self.relu(self.fc1(x))
-        x = self.dropout(x)
-        x = self.fc2(x)
-        
-        return x
-
-
-class ExpenseDataset(Dataset):
-    """Dataset for expense SMS data"""
-    
-    def __init__(self, texts, labels, vocab, max_length=100):
-        self.texts = texts
-        self.labels = labels
-        self.vocab = vocab
-        self.max_length = max_length
-    
-    def __len__(self):
-        return len(self.texts)
-    
-    def __getitem__(self, idx):
-        text = self.texts[idx]
-        label = self.labels[idx]
-        
-        # Convert text to sequence
-        sequence = self.text_to_sequence(text)
-        
-        return torch.LongTensor(sequence), torch.LongTensor([label])
-    
-    def text_to_sequence(self, text):
-        """Convert text to sequence of integers"""
-        words = text.split()
-        sequence = [self.vocab.get(word, 0) for word in words[:self.max_length]]
-        
-        # Pad sequence
-        if len(sequence) < self.max_length:
-            sequence = sequence + [0] * (self.max_length - len(sequence))
-        
-        return sequence
-
-
 def preprocess_text(text):
     """Preprocess SMS text"""
     text = text.lower()
@@ -118,23 +60,6 @@ def preprocess_text(text):
     return text
 
 
-def build_vocab(texts, vocab_size=10000):
-    """Build vocabulary from texts"""
-    word_counts = Counter()
-    
-    for text in texts:
-        words = text.split()
-        word_counts.update(words)
-    
-    # Get most common words
-    most_common = word_counts.most_common(vocab_size - 1)
-    
-    # Create vocab dict (0 is reserved for padding)
-    vocab = {word: idx + 1 for idx, (word, _) in enumerate(most_common)}
-    
-    return vocab
-
-
 def generate_sample_data():
     """Generate sample training data"""
     
@@ -205,47 +130,74 @@ def generate_sample_data():
     return texts, labels
 
 
-def train_model(num_epochs=50, batch_size=16, learning_rate=0.001):
+def setup_django():
+    """Set up Django so the expenses table can be read from this script"""
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'expensesense_backend.settings')
+    
+    import django
+    django.setup()
+
+
+def get_data_source(data, text_column='sms_text', label_column='category'):
+    """Training data source for --data: 'sample', 'db' or a .csv/.parquet path"""
+    if data == 'sample':
+        texts, labels = generate_sample_data()
+        return SampleSource(zip(texts, labels))
+    
+    if data == 'db':
+        setup_django()
+        return ExpenseSource()
+    
+    return FileSource(data, text_column=text_column, label_column=label_column)
+
+
+def train_model(num_epochs=50, batch_size=16, learning_rate=0.001, data='sample',
+                text_column='sms_text', label_column='category', workers=2, rebuild_cache=False):
     """Train the expense CNN model"""
     
     print("\n=== Training Expense CNN Model ===\n")
     
-    # Generate or load data
+    # Tokenize the data once, or reuse the cache if the data is unchanged
     print("Loading data...")
-    texts, labels = generate_sample_data()
-    
-    print(f"Total samples: {len(texts)}")
-    print(f"Categories: {set(labels)}")
-    
-    # Encode labels
-    label_encoder = LabelEncoder()
-    encoded_labels = label_encoder.fit_transform(labels)
-    label_dict = {idx: label for idx, label in enumerate(label_encoder.classes_)}
+    source = get_data_source(data, text_column, label_column)
+    cache = prepare_cache(
+        source,
+        DATA_CACHE_DIR / source.name,
+        preprocess_text,
+        vocab_size=10000,
+        rebuild=rebuild_cache
+    )
+    vocab = cache.vocab
+    label_dict = {idx: label for idx, label in enumerate(cache.classes)}
     
+    print(f"Total samples: {cache.count} (cached in {cache.path})")
+    print(f"Categories: {cache.class_counts}")
     print(f"\nLabel mapping: {label_dict}")
-    
-    # Build vocabulary
-    print("\nBuilding vocabulary...")
-    vocab = build_vocab(texts, vocab_size=10000)
     print(f"Vocabulary size: {len(vocab)}")
     
     # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        texts, encoded_labels, test_size=0.2, random_state=42, stratify=encoded_labels
-    )
+    train_indices, test_indices = cache.split(test_size=0.2, seed=42)
     
-    print(f"\nTraining samples: {len(X_train)}")
-    print(f"Testing samples: {len(X_test)}")
+    print(f"\nTraining samples: {len(train_indices)}")
+    print(f"Testing samples: {len(test_indices)}")
+    if len(test_indices) == 0:
+        print("✗ Too few samples per category for a test split, accuracy won't be measured")
     
-    # Create datasets
-    train_dataset = ExpenseDataset(X_train, y_train, vocab)
-    test_dataset = ExpenseDataset(X_test, y_test, vocab)
+    # Datasets yield whole batches read from the memory-mapped cache
+    train_dataset = TokenDataset(cache.path, train_indices, batch_size, shuffle=True)
+    test_dataset = TokenDataset(cache.path, test_indices, batch_size)
     
-    train_loader = DataLoader(train_dataset, batch_size=batch_size, shuffle=True)
-    test_loader = DataLoader(test_dataset, batch_size=batch_size)
+    loader_options = {
+        'batch_size': None,
+        'num_workers': workers,
+        'pin_memory': device.type == 'cuda',
+    }
+    train_loader = DataLoader(train_dataset, **loader_options)
+    test_loader = DataLoader(test_dataset, **loader_options)
     
     # Initialize model
-    num_classes = len(label_encoder.classes_)
+    num_classes = len(cache.classes)
     model = ExpenseCNN(
         vocab_size=len(vocab) + 1,
         embedding_dim=128,
@@ -253,7 +205,7 @@ def train_model(num_epochs=50, batch_size=16, learning_rate=0.001):
     ).to(device)
     
     print(f"\nModel architecture:\n{model}")
-    print(f"\nTraining on: {device}")
+    print(f"\nTraining on: {device} with {workers} data loader workers")
     
     # Loss and optimizer
     criterion = nn.CrossEntropyLoss()
@@ -266,10 +218,12 @@ def train_model(num_epochs=50, batch_size=16, learning_rate=0.001):
     for epoch in range(num_epochs):
         model.train()
         train_loss = 0.0
+        train_batches = 0
+        train_dataset.set_epoch(epoch)
         
         for batch_texts, batch_labels in train_loader:
             batch_texts = batch_texts.to(device)
-            batch_labels = batch_labels.squeeze().to(device)
+            batch_labels = batch_labels.to(device)
             
             # Forward pass
             outputs = model(batch_texts)
@@ -281,6 +235,7 @@ def train_model(num_epochs=50, batch_size=16, learning_rate=0.001):
             optimizer.step()
             
             train_loss += loss.item()
+            train_batches += 1
         
         # Evaluation
         model.eval()
@@ -290,7 +245,7 @@ def train_model(num_epochs=50, batch_size=16, learning_rate=0.001):
         with torch.no_grad():
             for batch_texts, batch_labels in test_loader:
                 batch_texts = batch_texts.to(device)
-                batch_labels = batch_labels.squeeze().to(device)
+                batch_labels = batch_labels.to(device)
                 
                 outputs = model(batch_texts)
                 _, predicted = torch.max(outputs.data, 1)
@@ -298,8 +253,8 @@ def train_model(num_epochs=50, batch_size=16, learning_rate=0.001):
                 total += batch_labels.size(0)
                 correct += (predicted == batch_labels).sum().item()
         
-        accuracy = 100 * correct / total
-        avg_loss = train_loss / len(train_loader)
+        accuracy = 100 * correct / total if total else 0.0
+        avg_loss = train_loss / max(train_batches, 1)
         
         if accuracy > best_accuracy:
             best_accuracy = accuracy
@@ -310,32 +265,51 @@ def train_model(num_epochs=50, batch_size=16, learning_rate=0.001):
     print(f"\n✓ Training completed!")
     print(f"Best accuracy: {best_accuracy:.2f}%")
     
-    # Save model
+    # Save model as a versioned artifact, then point expense_cnn_model.pt at it
+    model_version = new_model_version()
     save_path = Path(__file__).parent / 'expense_cnn_model.pt'
     
     # Move model to CPU before saving
     model = model.to('cpu')
     
-    torch.save({
+    versioned_path = save_checkpoint({
         'model_state_dict': model.state_dict(),
         'vocab': vocab,
         'label_encoder': label_dict,
         'vocab_size': len(vocab) + 1,
         'embedding_dim': 128,
         'num_classes': num_classes,
+        'model_version': model_version,
     }, save_path)
     
-    print(f"\n✓ Model saved to: {save_path}")
+    print(f"\n✓ Model {model_version} saved to: {versioned_path}")
+    print(f"✓ Active model: {save_path}")
     
     return model, vocab, label_dict
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Train the expense CNN model')
+    parser.add_argument('--data', default='sample', help="'sample', 'db' (the expenses table) or a .csv/.parquet file")
+    parser.add_argument('--text-column', default='sms_text', help='SMS text column of a data file')
+    parser.add_argument('--label-column', default='category', help='Category column of a data file')
+    parser.add_argument('--epochs', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--lr', type=float, default=0.001)
+    parser.add_argument('--workers', type=int, default=2, help='DataLoader worker processes')
+    parser.add_argument('--rebuild-cache', action='store_true', help='Tokenize the data again even if cached')
+    args = parser.parse_args()
+    
     # Train the model
     model, vocab, label_encoder = train_model(
-        num_epochs=50,
-        batch_size=16,
-        learning_rate=0.001
+        num_epochs=args.epochs,
+        batch_size=args.batch_size,
+        learning_rate=args.lr,
+        data=args.data,
+        text_column=args.text_column,
+        label_column=args.label_column,
+        workers=args.workers,
+        rebuild_cache=args.rebuild_cache
     )
     
     print("\n=== Training Complete ===")
@@ -0,0 +1,347 @@
+"""
+Training Data Pipeline
+Streams labeled SMS from the built-in samples, the expenses table or a
+CSV/Parquet file, and tokenizes them once into memory-mapped int32 arrays
+cached on disk, so training never holds the texts in memory and epochs
+don't re-tokenize
+
+Kept free of Django imports so train_model.py can use it as a plain script;
+ExpenseSource needs Django set up first.
+"""
+import csv
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import torch
+from torch.utils.data import IterableDataset, get_worker_info
+
+# Bumped when the cache layout changes, so old caches are rebuilt
+CACHE_FORMAT = 1
+
+# Like predict.pad_sequences, batches are padded to their longest sequence
+# plus this margin, so training sees the padding served requests get
+SEQUENCE_PAD_MARGIN = 5
+
+# Rows tokenized and written to the memory-mapped arrays at a time
+WRITE_CHUNK_ROWS = 8192
+
+
+class SampleSource:
+    """In-memory (text, label) pairs, used for the built-in sample data"""
+    
+    name = 'sample'
+    
+    def __init__(self, rows):
+        self.data = list(rows)
+    
+    def fingerprint(self):
+        return hashlib.sha256(repr(self.data).encode('utf-8')).hexdigest()
+    
+    def rows(self):
+        return iter(self.data)
+
+
+class FileSource:
+    """
+    CSV or Parquet file with a text and a label column
+    Parquet is read in record batches and needs pyarrow
+    """
+    
+    def __init__(self, path, text_column='sms_text', label_column='category', batch_rows=10000):
+        self.path = Path(path)
+        self.name = self.path.stem
+        self.text_column = text_column
+        self.label_column = label_column
+        self.batch_rows = batch_rows
+        
+        if self.path.suffix not in ('.csv', '.parquet'):
+            raise ValueError(f"Unsupported training data file {self.path}, expected .csv or .parquet")
+    
+    def fingerprint(self):
+        stat = self.path.stat()
+        return f"{self.path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{self.text_column}:{self.label_column}"
+    
+    def rows(self):
+        if self.path.suffix == '.parquet':
+            yield from self.parquet_rows()
+            return
+        
+        with open(self.path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            missing = {self.text_column, self.label_column} - set(reader.fieldnames or [])
+            if missing:
+                raise ValueError(f"{self.path} has no column {', '.join(sorted(missing))}")
+            
+            for row in reader:
+                yield row[self.text_column], row[self.label_column]
+    
+    def parquet_rows(self):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError('Reading Parquet training data needs pyarrow (pip install pyarrow)')
+        
+        parquet_file = pq.ParquetFile(self.path)
+        for batch in parquet_file.iter_batches(
+            batch_size=self.batch_rows,
+            columns=[self.text_column, self.label_column]
+        ):
+            yield from zip(batch.column(0).to_pylist(), batch.column(1).to_pylist())
+
+
+class ExpenseSource:
+    """
+    Expenses with SMS text, labeled with the category the user saved
+    Categories still equal to the model's prediction are left out, so the
+    model isn't trained on its own output
+    Read in id-ordered chunks, one query per chunk
+    """
+    
+    name = 'expenses'
+    
+    def __init__(self, chunk_size=5000):
+        self.chunk_size = chunk_size
+    
+    def queryset(self):
+        from django.db.models import F
+        from expenses.models import Expense
+        
+        return (
+            Expense.objects
+            .exclude(sms_raw_text__isnull=True)
+            .exclude(sms_raw_text='')
+            .exclude(category=F('predicted_category'))
+        )
+    
+    def fingerprint(self):
+        from django.db.models import Count, Max
+        
+        stats = self.queryset().aggregate(count=Count('id'), last_id=Max('id'), last_update=Max('updated_at'))
+        return f"{stats['count']}:{stats['last_id']}:{stats['last_update']}"
+    
+    def rows(self):
+        queryset = self.queryset().order_by('id').values_list('id', 'sms_raw_text', 'category')
+        cursor_id = 0
+        
+        while True:
+            chunk = list(queryset.filter(id__gt=cursor_id)[:self.chunk_size])
+            if not chunk:
+                return
+            cursor_id = chunk[-1][0]
+            
+            for _, text, category in chunk:
+                yield text, category
+
+
+class TokenCache:
+    """
+    Tokenized training data in a cache directory:
+        tokens.npy: (rows, max_length) int32 token ids, zero padded
+        lengths.npy: (rows,) int32 token count per row
+        labels.npy: (rows,) int32 class index per row
+        meta.json: vocabulary, classes and the key the cache was built for
+    """
+    
+    ARRAYS = ('tokens', 'lengths', 'labels')
+    
+    def __init__(self, path):
+        self.path = Path(path)
+        meta = json.loads((self.path / 'meta.json').read_text(encoding='utf-8'))
+        
+        self.key = meta['key']
+        self.count = meta['count']
+        self.vocab = meta['vocab']
+        self.classes = meta['classes']
+        self.class_counts = meta['class_counts']
+    
+    def arrays(self):
+        """Memory-mapped (tokens, lengths, labels), read only"""
+        return tuple(np.load(self.path / f'{name}.npy', mmap_mode='r') for name in self.ARRAYS)
+    
+    def split(self, test_size=0.2, seed=42):
+        """
+        Stratified train/test split of the row indices
+        
+        Returns:
+            tuple: (train indices, test indices), sorted int64 arrays
+        """
+        _, _, labels = self.arrays()
+        rng = np.random.default_rng(seed)
+        train, test = [], []
+        
+        for class_idx in range(len(self.classes)):
+            rows = rng.permutation(np.flatnonzero(labels == class_idx))
+            test_rows = int(round(len(rows) * test_size))
+            test.append(rows[:test_rows])
+            train.append(rows[test_rows:])
+        
+        return np.sort(np.concatenate(train)), np.sort(np.concatenate(test))
+
+
+def prepare_cache(source, cache_dir, preprocess, vocab_size=10000, max_length=100, rebuild=False):
+    """
+    Tokenize a source into a TokenCache, reusing the cache when it was built
+    from the same data with the same settings
+    
+    Rows are preprocessed once and spilled to a text file while words and
+    labels are counted, then tokenized from that file, so the source is
+    read a single time and memory holds only the counts. The cache is built
+    next to cache_dir and swapped in when complete.
+    """
+    cache_dir = Path(cache_dir)
+    key = {
+        'format': CACHE_FORMAT,
+        'source': source.fingerprint(),
+        'vocab_size': vocab_size,
+        'max_length': max_length,
+    }
+    
+    if not rebuild and (cache_dir / 'meta.json').exists():
+        cache = TokenCache(cache_dir)
+        if cache.key == key:
+            return cache
+    
+    cache_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f'.{cache_dir.name}-', dir=cache_dir.parent))
+    
+    try:
+        word_counts, label_counts = Counter(), Counter()
+        count = 0
+        spill_path = tmp_dir / 'texts.tsv'
+        
+        with open(spill_path, 'w', encoding='utf-8') as spill:
+            for text, label in source.rows():
+                words = preprocess(text or '').split()[:max_length]
+                label = str(label or '').strip()
+                if not words or not label:
+                    continue
+                
+                word_counts.update(words)
+                label_counts[label] += 1
+                spill.write(f"{' '.join(words)}\t{label}\n")
+                count += 1
+        
+        if not count:
+            raise ValueError(f"No labeled rows in the {source.name} training data")
+        
+        # 0 is reserved for padding and unknown words
+        most_common = word_counts.most_common(vocab_size - 1)
+        vocab = {word: idx + 1 for idx, (word, _) in enumerate(most_common)}
+        del word_counts
+        
+        classes = sorted(label_counts)
+        class_ids = {label: idx for idx, label in enumerate(classes)}
+        
+        tokens = np.lib.format.open_memmap(tmp_dir / 'tokens.npy', mode='w+', dtype=np.int32, shape=(count, max_length))
+        lengths = np.lib.format.open_memmap(tmp_dir / 'lengths.npy', mode='w+', dtype=np.int32, shape=(count,))
+        labels = np.lib.format.open_memmap(tmp_dir / 'labels.npy', mode='w+', dtype=np.int32, shape=(count,))
+        
+        with open(spill_path, encoding='utf-8') as spill:
+            start = 0
+            block = np.zeros((WRITE_CHUNK_ROWS, max_length), dtype=np.int32)
+            
+            while start < count:
+                rows = min(WRITE_CHUNK_ROWS, count - start)
+                block[:rows] = 0
+                
+                for row in range(rows):
+                    text, _, label = spill.readline().rstrip('\n').partition('\t')
+                    sequence = [vocab.get(word, 0) for word in text.split()]
+                    block[row, :len(sequence)] = sequence
+                    lengths[start + row] = len(sequence)
+                    labels[start + row] = class_ids[label]
+                
+                tokens[start:start + rows] = block[:rows]
+                start += rows
+        
+        for array in (tokens, lengths, labels):
+            array.flush()
+        del tokens, lengths, labels
+        spill_path.unlink()
+        
+        meta = {
+            'key': key,
+            'count': count,
+            'vocab': vocab,
+            'classes': classes,
+            'class_counts': dict(label_counts),
+        }
+        (tmp_dir / 'meta.json').write_text(json.dumps(meta), encoding='utf-8')
+        
+        if cache_dir.exists():
+            shutil.rmtree(cache_dir)
+        os.replace(tmp_dir, cache_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    
+    return TokenCache(cache_dir)
+
+
+class TokenDataset(IterableDataset):
+    """
+    Streams (tokens, labels) int64 batches of the given cache rows
+    Use with DataLoader(batch_size=None)
+    
+    Each DataLoader worker memory-maps the cache itself and takes every
+    num_workers'th block of rows. With shuffle on, blocks are visited in a
+    random order and shuffled within, which keeps reads local while giving
+    a different order every epoch (see set_epoch).
+    """
+    
+    def __init__(self, cache_path, indices, batch_size, shuffle=False, block_size=4096, seed=0):
+        self.cache_path = Path(cache_path)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.seed = seed
+        self.epoch = 0
+        
+        # Whole batches per block, so only a worker's last batch is partial
+        self.block_size = max(batch_size, block_size // batch_size * batch_size)
+    
+    def set_epoch(self, epoch):
+        """Call before iterating; workers get a copy of the dataset per epoch"""
+        self.epoch = epoch
+    
+    def __iter__(self):
+        tokens, lengths, labels = TokenCache(self.cache_path).arrays()
+        rng = np.random.default_rng((self.seed, self.epoch))
+        
+        blocks = [self.indices[start:start + self.block_size] for start in range(0, len(self.indices), self.block_size)]
+        if self.shuffle:
+            blocks = [blocks[idx] for idx in rng.permutation(len(blocks))]
+        
+        worker = get_worker_info()
+        if worker is not None:
+            blocks = blocks[worker.id::worker.num_workers]
+        
+        # Rows left over from a block are carried into the next batch
+        pending = np.empty(0, dtype=np.int64)
+        for block in blocks:
+            if self.shuffle:
+                block = rng.permutation(block)
+            pending = np.concatenate([pending, block])
+            
+            while len(pending) >= self.batch_size:
+                rows, pending = pending[:self.batch_size], pending[self.batch_size:]
+                yield self.make_batch(tokens, lengths, labels, rows)
+        
+        if len(pending):
+            yield self.make_batch(tokens, lengths, labels, pending)
+    
+    def make_batch(self, tokens, lengths, labels, rows):
+        # Sorted rows read the memory map front to back
+        rows = np.sort(rows)
+        width = min(tokens.shape[1], int(lengths[rows].max()) + SEQUENCE_PAD_MARGIN)
+        
+        return (
+            torch.from_numpy(tokens[rows, :width].astype(np.int64)),
+            torch.from_numpy(labels[rows].astype(np.int64))
+        )
@@ -1,6 +1,10 @@
 from django.urls import path
-from .views import classify_expense
+from .async_views import classify_expense_async
+from .views import classify_expense, classification_stats, reload_model_view
 
 urlpatterns = [
     path('classify/', classify_expense, name='classify-expense'),
+    path('classify/async/', classify_expense_async, name='classify-expense-async'),
+    path('stats/', classification_stats, name='classification-stats'),
+    path('model/reload/', reload_model_view, name='reload-model'),
 ]
@@ -1,9 +1,11 @@
+from django.conf import settings
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from .predict import predict_category
-from .serializers import ClassifyExpenseSerializer, ClassifyExpenseResponseSerializer
+from .rules import get_classification_stats
+from .serializers import ClassifyExpenseSerializer, ClassifyExpenseResponseSerializer, ReloadModelSerializer
 
 
 @api_view(['POST'])
@@ -16,7 +18,10 @@ def classify_expense(request):
     
     Request body:
     {
-        "sms_text": "Spent Rs 500 at Cafe Coffee Day"
+        "sms_text": "Spent Rs 500 at Cafe Coffee Day",
+        "top_k": 3,       (optional) top_probabilities for the 3 likeliest
+                          categories instead of all_probabilities
+        "lite": false     (optional) only category, confidence and source
     }
     
     Response:
@@ -38,7 +43,11 @@ def classify_expense(request):
     sms_text = serializer.validated_data['sms_text']
     
     # Get prediction
-    result = predict_category(sms_text)
+    result = predict_category(
+        sms_text,
+        top_k=serializer.validated_data.get('top_k'),
+        lite=serializer.validated_data['lite']
+    )
     
     # Check for errors
     if 'error' in result:
@@ -54,3 +63,61 @@ def classify_expense(request):
         response_serializer.data,
         status=status.HTTP_200_OK
     )
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def classification_stats(request):
+    """
+    GET /ml/stats/
+    
+    Classification counters for the serving worker, including the fraction
+    of requests answered by merchant rules without running the CNN
+    """
+    stats = get_classification_stats()
+    
+    if settings.ML_INFERENCE_SOCKET:
+        from .inference_server import get_inference_client
+        stats['model_version'] = get_inference_client().version
+    else:
+        from .load_model import get_model_info
+        stats.update(get_model_info())
+    
+    return Response(stats, status=status.HTTP_200_OK)
+
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def reload_model_view(request):
+    """
+    POST /ml/model/reload/
+    
+    Reload the checkpoint in the worker serving this request. Other workers
+    pick it up through the file watcher or the reload signal.
+    
+    Request body:
+    {
+        "force": false
+    }
+    """
+    if settings.ML_INFERENCE_SOCKET:
+        return Response(
+            {'error': 'The model is served by the inference server, send it the reload signal'},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    serializer = ReloadModelSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    from .load_model import get_model_info, reload_model
+    
+    try:
+        _, reloaded = reload_model(force=serializer.validated_data['force'])
+    except Exception as e:
+        return Response(
+            {'error': f'Reload failed, keeping current model: {e}'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    
+    return Response({'reloaded': reloaded, **get_model_info()}, status=status.HTTP_200_OK)
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+    
+    def ready(self):
+        """Keep the stateless authentication user cache in step with edits"""
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_save, post_delete
+        from .authentication import evict_cached_user
+        
+        User = get_user_model()
+        post_save.connect(evict_cached_user, sender=User)
+        post_delete.connect(evict_cached_user, sender=User)
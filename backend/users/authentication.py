@@ -0,0 +1,127 @@
+"""
+Stateless JWT authentication backed by token claims
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+
+# Short-lived per-process cache of full user rows: user id -> (expires at, user)
+_user_cache = {}
+_user_cache_lock = threading.Lock()
+
+
+def get_cached_user(user_id):
+    """
+    Load a user by id, reusing rows fetched in the last AUTH_USER_CACHE_TTL seconds
+    Cached instances are shared between requests, so treat them as read-only
+    
+    Raises:
+        AuthenticationFailed: If the user no longer exists
+    """
+    ttl = getattr(settings, 'AUTH_USER_CACHE_TTL', 30)
+    now = time.monotonic()
+    
+    entry = _user_cache.get(user_id)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    
+    try:
+        user = get_user_model().objects.get(pk=user_id)
+    except get_user_model().DoesNotExist:
+        # Deleted after the access token was issued
+        raise AuthenticationFailed(_("User not found"), code="user_not_found")
+    
+    with _user_cache_lock:
+        # Drop expired entries so the cache can't grow without bound
+        if len(_user_cache) >= getattr(settings, 'AUTH_USER_CACHE_SIZE', 10000):
+            for key in [key for key, (expires, _) in _user_cache.items() if expires <= now]:
+                del _user_cache[key]
+            if len(_user_cache) >= getattr(settings, 'AUTH_USER_CACHE_SIZE', 10000):
+                _user_cache.clear()
+        _user_cache[user_id] = (now + ttl, user)
+    
+    return user
+
+
+def evict_cached_user(sender, instance, **kwargs):
+    """Signal receiver dropping a saved or deleted user from this process' cache"""
+    _user_cache.pop(instance.pk, None)
+
+
+def get_full_user(user):
+    """Return a User model instance for request.user, loading it if stateless"""
+    if isinstance(user, ClaimsUser):
+        return user.user
+    return user
+
+
+class ClaimsUser(TokenUser):
+    """
+    request.user built from access token claims (id, email, is_active, ...)
+    
+    Attributes not carried in the token, e.g. time_zone, are read from the
+    full user row, which is loaded on first use through get_cached_user.
+    """
+    
+    @cached_property
+    def email(self):
+        return self.token.get('email', '')
+    
+    @cached_property
+    def is_active(self):
+        return self.token.get('is_active', True)
+    
+    @cached_property
+    def user(self):
+        return get_cached_user(self.id)
+    
+    def __getattr__(self, name):
+        if name.startswith('_') or name == 'token':
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    JWT authentication that skips the per-request users table lookup
+    Enable with JWT_STATELESS_AUTH=True
+    """
+    
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        
+        return user
+
+
+async def aauthenticate(request):
+    """
+    Authenticate a plain Django request for async views
+    
+    Runs the configured DRF authentication classes in a worker thread,
+    since they may hit the users table.
+    
+    Returns:
+        user or None: None when no credentials were sent
+    
+    Raises:
+        AuthenticationFailed: If the credentials are invalid
+    """
+    from asgiref.sync import sync_to_async
+    from rest_framework.settings import api_settings
+    
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        result = await sync_to_async(authentication_class().authenticate)(request)
+        if result is not None:
+            return result[0]
+    
+    return None
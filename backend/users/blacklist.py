@@ -0,0 +1,79 @@
+"""
+Refresh token blacklist backends
+
+JWT_BLACKLIST_BACKEND selects where rotated refresh tokens are recorded:
+    'cache' - Django cache entry per jti, expiring with the token (default)
+    'db'    - simplejwt's token_blacklist tables, pruned by prune_token_blacklist
+    'none'  - rotated tokens are not blacklisted
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.settings import api_settings
+
+
+class CacheBlacklistBackend:
+    """
+    O(1) blacklist in the shared cache
+    Each entry lives only until the token would have expired anyway, so
+    nothing accumulates and no database rows are written on refresh.
+    """
+    
+    key_prefix = 'jwt_blacklist:'
+    
+    def _key(self, token):
+        return self.key_prefix + token.payload[api_settings.JTI_CLAIM]
+    
+    def is_blacklisted(self, token):
+        return cache.get(self._key(token)) is not None
+    
+    def blacklist(self, token):
+        remaining = int(token.payload['exp'] - time.time())
+        if remaining > 0:
+            cache.set(self._key(token), 1, timeout=remaining)
+
+
+class DatabaseBlacklistBackend:
+    """Blacklist in simplejwt's OutstandingToken/BlacklistedToken tables"""
+    
+    def is_blacklisted(self, token):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+        
+        jti = token.payload[api_settings.JTI_CLAIM]
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+    
+    def blacklist(self, token):
+        from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+        from rest_framework_simplejwt.utils import datetime_from_epoch
+        
+        outstanding, _ = OutstandingToken.objects.get_or_create(
+            jti=token.payload[api_settings.JTI_CLAIM],
+            defaults={
+                'token': str(token),
+                'expires_at': datetime_from_epoch(token.payload['exp']),
+            },
+        )
+        BlacklistedToken.objects.get_or_create(token=outstanding)
+
+
+class NullBlacklistBackend:
+    """Blacklisting disabled"""
+    
+    def is_blacklisted(self, token):
+        return False
+    
+    def blacklist(self, token):
+        pass
+
+
+BACKENDS = {
+    'cache': CacheBlacklistBackend,
+    'db': DatabaseBlacklistBackend,
+    'none': NullBlacklistBackend,
+}
+
+
+def get_blacklist_backend():
+    """Return the backend selected by settings.JWT_BLACKLIST_BACKEND"""
+    return BACKENDS[getattr(settings, 'JWT_BLACKLIST_BACKEND', 'cache')]()
@@ -0,0 +1,137 @@
+"""
+Google ID token verification with cached public certificates
+"""
+import json
+import re
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token
+
+GOOGLE_OAUTH2_CERTS_URL = 'https://www.googleapis.com/oauth2/v1/certs'
+
+CERTS_CACHE_KEY = 'google_oauth2_certs'
+
+# Used when the certs response carries no usable Cache-Control header
+DEFAULT_CERTS_MAX_AGE = 3600
+
+# Global pooled transport shared by every request in this worker
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """
+    Get the pooled HTTP transport (singleton pattern)
+    Reuses one requests.Session so TLS connections to Google stay open
+    """
+    global _transport
+    
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                import requests
+                _transport = google_requests.Request(session=requests.Session())
+    
+    return _transport
+
+
+def parse_max_age(cache_control):
+    """Extract max-age seconds from a Cache-Control header value"""
+    match = re.search(r'max-age=(\d+)', cache_control or '')
+    return int(match.group(1)) if match else None
+
+
+class HttpCertSource:
+    """Fetch Google's certificates over HTTP, honoring Cache-Control"""
+    
+    def fetch(self, url):
+        """
+        Returns:
+            tuple: (raw JSON bytes, max age in seconds)
+        """
+        response = get_transport()(url, method='GET')
+        
+        if response.status != 200:
+            raise ValueError(f"Could not fetch certificates at {url}")
+        
+        max_age = parse_max_age(response.headers.get('cache-control'))
+        return response.data, max_age or DEFAULT_CERTS_MAX_AGE
+
+
+class FileCertSource:
+    """
+    Serve certificates from a local JSON file of {key id: x509 PEM}
+    Lets development and tests sign ID tokens with a stand-in key set
+    """
+    
+    def fetch(self, url):
+        with open(settings.GOOGLE_CERTS_FILE, 'rb') as f:
+            return f.read(), DEFAULT_CERTS_MAX_AGE
+
+
+class _CertsResponse:
+    """Minimal google.auth.transport.Response for cached cert bodies"""
+    
+    status = 200
+    headers = {}
+    
+    def __init__(self, data):
+        self.data = data
+
+
+class CachedCertRequest:
+    """
+    google.auth.transport.Request that serves the certs endpoint from cache
+    
+    The certs body is stored in the Django cache for the advertised max-age,
+    so with a shared cache backend one worker's fetch serves all of them.
+    Every other URL goes through the pooled transport.
+    """
+    
+    def __init__(self, cert_source):
+        self.cert_source = cert_source
+    
+    def __call__(self, url, method='GET', **kwargs):
+        if method == 'GET' and url == GOOGLE_OAUTH2_CERTS_URL:
+            data = cache.get(CERTS_CACHE_KEY)
+            if data is None:
+                data, max_age = self.cert_source.fetch(url)
+                # Fail here rather than caching a body verification can't use
+                json.loads(data)
+                cache.set(CERTS_CACHE_KEY, data, max_age)
+            return _CertsResponse(data)
+        
+        return get_transport()(url, method=method, **kwargs)
+
+
+def get_cert_source():
+    """Instantiate the cert source named by settings.GOOGLE_CERT_SOURCE"""
+    return import_string(settings.GOOGLE_CERT_SOURCE)()
+
+
+def verify_google_token(token):
+    """
+    Verify a Google ID token against the cached certificates
+    
+    If the signing key is missing from the cached set (Google rotated keys
+    before max-age expired) the cache is dropped and verification retried once.
+    
+    Returns:
+        dict: Decoded token claims
+    
+    Raises:
+        ValueError: If the token is invalid
+    """
+    request = CachedCertRequest(get_cert_source())
+    
+    try:
+        return id_token.verify_oauth2_token(token, request, settings.GOOGLE_CLIENT_ID)
+    except ValueError as e:
+        if 'Certificate for key id' not in str(e):
+            raise
+        cache.delete(CERTS_CACHE_KEY)
+        return id_token.verify_oauth2_token(token, request, settings.GOOGLE_CLIENT_ID)
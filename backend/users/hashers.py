@@ -0,0 +1,59 @@
+"""
+Password hashers with work factors tuned from settings
+
+PASSWORD_HASH_POLICY picks which one hashes new passwords; the others stay
+in PASSWORD_HASHERS so existing hashes still verify and are transparently
+rehashed with the preferred policy on the user's next successful login.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with PASSWORD_PBKDF2_ITERATIONS iterations"""
+    
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """scrypt with PASSWORD_SCRYPT_WORK_FACTOR (N), block size r and parallelism p"""
+    
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
+    
+    @property
+    def block_size(self):
+        return settings.PASSWORD_SCRYPT_BLOCK_SIZE
+    
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_SCRYPT_PARALLELISM
+    
+    @property
+    def maxmem(self):
+        # scrypt needs 128 * N * r * p bytes; leave headroom over OpenSSL's 32MB default
+        return 2 * 128 * self.work_factor * self.block_size * self.parallelism
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """argon2id with PASSWORD_ARGON2_TIME_COST, MEMORY_COST (KiB) and PARALLELISM"""
+    
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+    
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+    
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
@@ -0,0 +1,105 @@
+"""
+Coalesced last_login tracking
+
+Logins are recorded in memory and written to the users table in batches
+every LAST_LOGIN_FLUSH_INTERVAL seconds, instead of one UPDATE per login.
+A user is only recorded again once their last_login is older than
+LAST_LOGIN_GRANULARITY seconds.
+"""
+import atexit
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils import timezone
+
+# Pending writes: user id -> login time
+_pending = {}
+# Last login time seen per user in this process, to apply the granularity
+# without reading the users table
+_recorded = {}
+_lock = threading.Lock()
+_flusher = None
+
+
+def get_granularity():
+    return timedelta(seconds=getattr(settings, 'LAST_LOGIN_GRANULARITY', 3600))
+
+
+def record_login(user_id, last_login=None):
+    """
+    Record a login for user_id
+    
+    Args:
+        user_id: Primary key of the user
+        last_login: The user's stored last_login when already loaded
+    """
+    now = timezone.now()
+    granularity = get_granularity()
+    
+    with _lock:
+        known = _recorded.get(user_id)
+        if last_login is not None and (known is None or last_login > known):
+            known = last_login
+        if known is not None and now - known < granularity:
+            return
+        
+        _recorded[user_id] = now
+        _pending[user_id] = now
+    
+    _ensure_flusher()
+
+
+def flush_last_logins():
+    """
+    Write pending logins to the users table in batches
+    
+    Returns:
+        int: Number of users updated
+    """
+    with _lock:
+        if not _pending:
+            return 0
+        pending = dict(_pending)
+        _pending.clear()
+        
+        # Forget users whose next login would be recorded anyway
+        cutoff = timezone.now() - get_granularity()
+        for user_id in [user_id for user_id, seen in _recorded.items() if seen < cutoff]:
+            del _recorded[user_id]
+    
+    User = get_user_model()
+    users = [User(pk=user_id, last_login=login_time) for user_id, login_time in pending.items()]
+    User.objects.bulk_update(users, ['last_login'], batch_size=500)
+    
+    return len(users)
+
+
+def _flush_loop():
+    interval = getattr(settings, 'LAST_LOGIN_FLUSH_INTERVAL', 60)
+    while True:
+        time.sleep(interval)
+        try:
+            flush_last_logins()
+        except Exception as e:
+            print(f"✗ Failed to flush last_login updates: {e}")
+        finally:
+            # This thread's connection would otherwise stay open between flushes
+            connection.close()
+
+
+def _ensure_flusher():
+    """Start the background flush thread on first use in this process"""
+    global _flusher
+    
+    if _flusher is not None:
+        return
+    
+    with _lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, name='last-login-flusher', daemon=True)
+            _flusher.start()
+            atexit.register(flush_last_logins)
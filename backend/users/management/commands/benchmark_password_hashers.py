@@ -0,0 +1,57 @@
+"""
+Benchmark login throughput under each password hashing policy
+
+Times check_password (what LoginView's authenticate spends its CPU on)
+for every policy with the parameters from settings, and reports the
+logins per second a single core can sustain.
+
+Usage:
+    python manage.py benchmark_password_hashers [--rounds 10] [--policy scrypt]
+"""
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+
+class Command(BaseCommand):
+    help = 'Measure password verification cost and logins/sec per core for each hasher policy'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=10)
+        parser.add_argument('--policy', choices=sorted(settings.PASSWORD_POLICY_HASHERS), action='append')
+    
+    def handle(self, *args, **options):
+        rounds = options['rounds']
+        policies = options['policy'] or list(settings.PASSWORD_POLICY_HASHERS)
+        password = 'correct horse battery staple'
+        
+        self.stdout.write(f"Active policy: {settings.PASSWORD_HASH_POLICY}, CPU cores: {os.cpu_count()}\n")
+        self.stdout.write(f"{'policy':<8} {'ms/login':>10} {'logins/s/core':>14}  params")
+        
+        for policy in policies:
+            hasher = import_string(settings.PASSWORD_POLICY_HASHERS[policy])()
+            
+            try:
+                encoded = make_password(password, hasher=hasher)
+            except ValueError as e:
+                self.stdout.write(self.style.WARNING(f"{policy:<8} skipped: {e}"))
+                continue
+            
+            # Warm up, then time verifications only
+            check_password(password, encoded)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                check_password(password, encoded)
+            elapsed = (time.perf_counter() - start) / rounds
+            
+            params = {
+                key: value for key, value in hasher.decode(encoded).items()
+                if key not in ('algorithm', 'salt', 'hash', 'params')
+            }
+            self.stdout.write(
+                f"{policy:<8} {elapsed * 1000:>10.1f} {1 / elapsed:>14.1f}  {params}"
+            )
@@ -0,0 +1,44 @@
+"""
+Delete expired refresh tokens from the database blacklist tables
+
+Only needed with JWT_BLACKLIST_BACKEND=db; the cache backend expires
+entries on its own. Deletes in small batches so it can run from cron
+during traffic without long table locks.
+
+Usage:
+    python manage.py prune_token_blacklist [--batch-size 1000]
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Prune expired outstanding and blacklisted refresh tokens in batches'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+    
+    def handle(self, *args, **options):
+        if not apps.is_installed('rest_framework_simplejwt.token_blacklist'):
+            raise CommandError('Token blacklist tables are not in use (JWT_BLACKLIST_BACKEND != db)')
+        
+        from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+        
+        batch_size = options['batch_size']
+        now = timezone.now()
+        deleted = 0
+        
+        while True:
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=now)
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            
+            # BlacklistedToken rows go with their OutstandingToken (CASCADE)
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
+        
+        self.stdout.write(self.style.SUCCESS(f'✓ Pruned {deleted} expired tokens'))
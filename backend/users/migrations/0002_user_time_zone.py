@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 09:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='time_zone',
+            field=models.CharField(default='UTC', help_text="IANA time zone used to bucket this user's expenses by day", max_length=64),
+        ),
+    ]
@@ -40,6 +40,11 @@ class User(AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(max_length=255, unique=True, db_index=True)
     username = models.CharField(max_length=150, unique=True)
     google_id = models.CharField(max_length=255, blank=True, null=True, unique=True)
+    time_zone = models.CharField(
+        max_length=64,
+        default='UTC',
+        help_text='IANA time zone used to bucket this user\'s expenses by day'
+    )
     
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
@@ -1,6 +1,7 @@
 """
 Serializers for User authentication
 """
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
@@ -13,8 +14,16 @@ class UserSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = User
-        fields = ('id', 'email', 'username', 'date_joined')
+        fields = ('id', 'email', 'username', 'time_zone', 'date_joined')
         read_only_fields = ('id', 'date_joined')
+    
+    def validate_time_zone(self, value):
+        """Validate timezone is a known IANA zone"""
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise serializers.ValidationError("Unknown time zone")
+        return value
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -0,0 +1,91 @@
+"""
+JWT token classes for ExpenseSense
+"""
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+
+from .blacklist import get_blacklist_backend
+from .last_login import record_login
+
+
+class UserClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token that embeds the user fields requests need
+    
+    Access tokens copy these claims, so the stateless authentication class
+    can build request.user without querying the users table.
+    """
+    
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token.set_user_claims(user)
+        return token
+    
+    def set_user_claims(self, user):
+        """Copy the user's current fields into the token claims"""
+        self['email'] = user.email
+        self['username'] = user.username
+        self['is_active'] = user.is_active
+        self['is_staff'] = user.is_staff
+        self['is_superuser'] = user.is_superuser
+    
+    def verify(self, *args, **kwargs):
+        # Skip simplejwt's BlacklistMixin.verify, which would query its
+        # tables a second time when the db backend installs the app
+        Token.verify(self, *args, **kwargs)
+        self.check_blacklist()
+    
+    def check_blacklist(self):
+        """Raise TokenError if this token was rotated away"""
+        if get_blacklist_backend().is_blacklisted(self):
+            raise TokenError(_("Token is blacklisted"))
+    
+    def blacklist(self):
+        """Record this token in the configured blacklist backend"""
+        get_blacklist_backend().blacklist(self)
+
+
+class UserClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer that rotates and blacklists UserClaimsRefreshToken
+    
+    Rotation would otherwise carry the claims from login forward for as long
+    as the client keeps refreshing, so the user row is read on every
+    refresh: missing or inactive users are refused, and the new tokens get
+    the current email, is_active and is_staff.
+    """
+    
+    token_class = UserClaimsRefreshToken
+    
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        
+        user_id = refresh.get(api_settings.USER_ID_CLAIM)
+        user = get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        
+        refresh.set_user_claims(user)
+        data = {'access': str(refresh.access_token)}
+        
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            
+            data['refresh'] = str(refresh)
+        
+        # A refresh counts as activity; coalesced, so usually no write at all
+        record_login(user.pk)
+        
+        return data
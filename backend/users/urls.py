@@ -2,8 +2,7 @@
 URL Configuration for users app
 """
 from django.urls import path
-from rest_framework_simplejwt.views import TokenRefreshView
-from .views import RegisterView, LoginView, GoogleAuthView, UserProfileView
+from .views import RegisterView, LoginView, GoogleAuthView, UserProfileView, TokenRefreshView
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
@@ -5,25 +5,28 @@ from rest_framework import status, generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.views import TokenRefreshView as BaseTokenRefreshView
 from django.contrib.auth import authenticate, get_user_model
-from google.oauth2 import id_token
-from google.auth.transport import requests
-from django.conf import settings
+from django.utils.translation import gettext_lazy as _
 
+from .authentication import get_full_user
+from .google_auth import verify_google_token
+from .last_login import record_login
 from .serializers import (
     RegisterSerializer, 
     LoginSerializer, 
     GoogleAuthSerializer,
     UserSerializer
 )
+from .tokens import UserClaimsRefreshToken, UserClaimsTokenRefreshSerializer
 
 User = get_user_model()
 
 
 def get_tokens_for_user(user):
     """Generate JWT tokens for user"""
-    refresh = RefreshToken.for_user(user)
+    refresh = UserClaimsRefreshToken.for_user(user)
     return {
         'refresh': str(refresh),
         'access': str(refresh.access_token),
@@ -72,6 +75,7 @@ class LoginView(APIView):
         user = authenticate(request, email=email, password=password)
         
         if user is not None:
+            record_login(user.pk, user.last_login)
             tokens = get_tokens_for_user(user)
             user_data = UserSerializer(user).data
             
@@ -101,12 +105,8 @@ class GoogleAuthView(APIView):
         token = serializer.validated_data['token']
         
         try:
-            # Verify the token with Google
-            idinfo = id_token.verify_oauth2_token(
-                token, 
-                requests.Request(), 
-                settings.GOOGLE_CLIENT_ID
-            )
+            # Verify the token against Google's cached public certificates
+            idinfo = verify_google_token(token)
             
             # Extract user info from Google
             google_id = idinfo['sub']
@@ -127,6 +127,7 @@ class GoogleAuthView(APIView):
                 user.google_id = google_id
                 user.save()
             
+            record_login(user.pk, user.last_login)
             tokens = get_tokens_for_user(user)
             user_data = UserSerializer(user).data
             
@@ -153,4 +154,18 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     
     def get_object(self):
-        return self.request.user
+        if self.request.method == 'GET':
+            return get_full_user(self.request.user)
+        # Never mutate a user instance shared through the stateless auth cache
+        try:
+            return User.objects.get(pk=self.request.user.pk)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+
+class TokenRefreshView(BaseTokenRefreshView):
+    """
+    API endpoint to rotate a refresh token
+    POST /auth/token/refresh/
+    """
+    serializer_class = UserClaimsTokenRefreshSerializer